@@ -2,17 +2,25 @@ from __future__ import annotations
 from flask import Flask, render_template, request, jsonify, session
 from flask import redirect, url_for
 from dataclasses import asdict
-import json, os, random
+import json, os, random, uuid
+from contextlib import nullcontext
 
 from cantstop.state import new_game, GameState
 from cantstop.engine import roll_dice, legal_pairings, apply_pairing, stop_and_bank, compute_turn_gain, finished_columns_this_turn
 from cantstop.odds import bust_prob, adv_prob_by_column
-from cantstop.mcts import recommend_press_or_park, recommend_pairing_after_roll
+from cantstop.cache import ODDS_CACHE
+from cantstop.solver import recommend_press_or_park, recommend_after_roll
+from cantstop.sessions import SearchStore
 from cantstop.constants import COLUMNS, COLUMN_HEIGHTS
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "dev-secret")
 
+COACH_MAX_TIME_MS = 10000.0
+COACH_DEFAULT_TIME_MS = 300.0
+# Per-session MCTS trees, reused across coach requests within a turn
+SEARCH_STORE = SearchStore()
+
 def get_state() -> GameState:
     gs = session.get("state")
     if not gs:
@@ -35,7 +43,8 @@ def get_state() -> GameState:
     active_runners = turn_data.get("active_runners", {})
     tr = TurnState(
         active_runners={int(k): int(v) for k, v in active_runners.items()} if active_runners else {},
-        last_roll=tuple(turn_data["last_roll"]) if turn_data.get("last_roll") else None
+        last_roll=tuple(turn_data["last_roll"]) if turn_data.get("last_roll") else None,
+        roll_pending=bool(turn_data.get("roll_pending", False))
     )
     s.turn = tr
     return s
@@ -60,6 +69,9 @@ def api_new_game():
         
         s = new_game(num_players)
         save_state(s)
+        # The old game's search tree can never be reused
+        if "search_id" in session:
+            SEARCH_STORE.drop(session["search_id"])
         return jsonify({"ok": True, "state": s.to_dict()})
     except (ValueError, TypeError):
         return jsonify({"ok": False, "error": "Invalid number of players"}), 400
@@ -129,6 +141,7 @@ def api_roll():
         rng = random.Random()
         r = roll_dice(rng)
         s.turn.last_roll = r
+        s.turn.roll_pending = True
         save_state(s)
         pairs = legal_pairings(s, r)
         
@@ -216,7 +229,7 @@ def api_odds():
         s = get_state()
         p_b = bust_prob(s)
         adv = adv_prob_by_column(s)
-        return jsonify({"p_bust": p_b, "adv_by_col": adv})
+        return jsonify({"p_bust": p_b, "adv_by_col": adv, "cache": ODDS_CACHE.stats()})
     except Exception as e:
         return jsonify({"ok": False, "error": f"Odds calculation failed: {str(e)}"}), 500
 
@@ -235,12 +248,33 @@ def api_coach_recommend():
         # Validate iterations
         iters = max(100, min(10000, iters))  # Clamp between 100 and 10000
         
-        rec = recommend_press_or_park(s, iters=iters, seed=0, risk=risk)
-        # If there's a last roll pending, also suggest a pairing
-        pairing_suggestion = None
-        if s.turn.last_roll:
-            pairing_suggestion = recommend_pairing_after_roll(s, tuple(s.turn.last_roll), iters=max(500, iters//2), seed=1, risk=risk)
-        return jsonify({"recommendation": rec, "pairing": pairing_suggestion})
+        # The MCTS fallback runs on a wall-clock budget (ms) unless an explicit
+        # iteration count is asked for. "parallel" spreads it over every core.
+        search = {}
+        if data.get("time_ms") is not None or "iters" not in data:
+            search["time_ms"] = max(10.0, min(COACH_MAX_TIME_MS, float(data.get("time_ms", COACH_DEFAULT_TIME_MS))))
+        lease = nullcontext()
+        if data.get("parallel") in ("root", "tree"):
+            search.update(workers=None, mode=data["parallel"])
+        else:
+            # Serial searches continue this session's tree from earlier requests
+            sid = session.setdefault("search_id", uuid.uuid4().hex)
+            lease = SEARCH_STORE.checkout(sid, s, risk)
+
+        with lease as table:
+            if table is not None:
+                search["table"] = table
+            # With a roll still to play, one search picks the pairing and the press/park
+            # call after it. Once it is played, last_roll stays set but advice is for the board as it is.
+            if s.turn.last_roll and s.turn.roll_pending:
+                res = recommend_after_roll(s, tuple(s.turn.last_roll), iters=iters, seed=0, risk=risk, **search)
+                if res["pairing"] is not None:
+                    rec = {k: res[k] for k in ("action", "q_stop", "q_press", "p_bust", "method")}
+                    rec["search"] = res.get("search")
+                    pairing = {"pairing": res["pairing"], "q": res["q"], "method": res["method"]}
+                    return jsonify({"recommendation": rec, "pairing": pairing, "options": res["options"]})
+            rec = recommend_press_or_park(s, iters=iters, seed=0, risk=risk, **search)
+        return jsonify({"recommendation": rec, "pairing": None})
     except Exception as e:
         return jsonify({"ok": False, "error": f"Coach recommendation failed: {str(e)}"}), 500
 
@@ -0,0 +1,68 @@
+from __future__ import annotations
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+class OddsCache:
+    """Bounded LRU cache shared by the odds functions.
+
+    Keys are (namespace, turn key) pairs, e.g. ("bust", key) and ("adv", key),
+    so one size limit covers every kind of value while hits and misses are
+    still counted per namespace. Thread-safe for the dev server; the compute
+    callback runs outside the lock.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[str, Hashable], Any]" = OrderedDict()
+        self._lock = Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.evictions = 0
+
+    def get_or_compute(self, namespace: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+        full = (namespace, key)
+        with self._lock:
+            if full in self._data:
+                self._data.move_to_end(full)
+                self.hits[namespace] = self.hits.get(namespace, 0) + 1
+                return self._data[full]
+            self.misses[namespace] = self.misses.get(namespace, 0) + 1
+        value = compute()
+        with self._lock:
+            self._data[full] = value
+            self._data.move_to_end(full)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits.clear()
+            self.misses.clear()
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per = {}
+            for ns in sorted(set(self.hits) | set(self.misses)):
+                h, m = self.hits.get(ns, 0), self.misses.get(ns, 0)
+                per[ns] = {"hits": h, "misses": m, "hit_rate": h / (h + m) if h + m else 0.0}
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": hits,
+                "misses": misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "by_kind": per,
+            }
+
+# Process-wide instance used by odds.py by default (so /api/odds and the MCTS share it)
+ODDS_CACHE = OddsCache()
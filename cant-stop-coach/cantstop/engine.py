@@ -99,6 +99,7 @@ def apply_pairing(state: GameState, pairing: Pairing) -> Dict:
     before = dict(state.turn.active_runners)
     moved1 = apply_sum_once(state, s1)
     moved2 = apply_sum_once(state, s2)
+    state.turn.roll_pending = False
     after = state.turn.active_runners
     deltas = {}
     for c in set(list(before.keys()) + list(after.keys())):
@@ -125,6 +126,7 @@ def stop_and_bank(state: GameState) -> None:
     # Clear turn
     state.turn.active_runners.clear()
     state.turn.last_roll = None
+    state.turn.roll_pending = False
     # Check win
     if len(state.players[cur].claimed) >= 3:
         state.winner = cur
@@ -148,8 +150,12 @@ def finished_columns_this_turn(state: GameState) -> List[int]:
     return res
 
 def turn_key_for_odds(state: GameState) -> tuple:
+    """Everything next-roll odds depend on: open columns, each active runner's
+    steps left to the top capped at 2 (0 = topped out, 1 = a double sum only
+    moves it once), and free runners. Banked positions never matter, since a
+    new runner always has room to start."""
     open_cols = tuple(sorted([c for c in COLUMNS if state.claimed_by[c] is None]))
-    active = tuple(sorted([(c, state.turn.active_runners[c] >= COLUMN_HEIGHTS[c]) for c in state.turn.active_runners.keys()]))
+    active = tuple(sorted([(c, min(2, COLUMN_HEIGHTS[c] - at)) for c, at in state.turn.active_runners.items()]))
     free = state.turn.free_runners
     return (open_cols, active, free)
 
@@ -164,6 +170,7 @@ def handle_bust(state: GameState) -> None:
     # Clear all active runners (lose progress)
     state.turn.active_runners.clear()
     state.turn.last_roll = None
+    state.turn.roll_pending = False
     
     # Switch to next player
     state.current = (state.current + 1) % state.num_players
@@ -1,12 +1,15 @@
 from __future__ import annotations
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Dict, Optional, Tuple, List
-import math, random
+import math, random, time
+from threading import Lock
 
 from .constants import COLUMN_HEIGHTS, COLUMNS
 from .state import GameState
-from .engine import roll_dice, legal_pairings, apply_pairing, compute_turn_gain, finished_columns_this_turn, stop_and_bank
-from .odds import bust_prob
+from .engine import Roll
+from .odds import BUST_BY_MASK, ORDERED_PAIRS, PAIRING_GROUPS, bust_prob
+from .packed import PackedTurn, after_roll, apply_sum, finished_columns, pack, playable_mask, turn_gain
 
 # Risk utilities
 def utility(gain_steps: float, finished_cols: List[int], risk: str = "neutral") -> float:
@@ -33,156 +36,283 @@ def utility(gain_steps: float, finished_cols: List[int], risk: str = "neutral")
     else:
         return base
 
+# Nodes hold the turn as a packed int (see packed.py): the search never touches a GameState.
+#
+# The tree is a DAG: nodes live in a TranspositionTable keyed on
+# (node_type, packed state[, roll]), so different roll/pairing orders that
+# reach the same runner configuration share one node and its statistics.
+# Children are stored as keys rather than Node references, which lets the
+# table evict least-recently-used nodes to stay within its size limit; an
+# evicted node comes back empty the next time a path reaches it. Rewards are
+# backed up along the path actually walked, not through parent links.
+#
+# Chance nodes don't branch on raw rolls. Rolls are grouped by their effect,
+# the set of turn states their legal pairings reach (chance_outcomes), with
+# the exact probability of each group; every roll in a group shares one
+# pairing node. Visits go to the outcome furthest below its share of the
+# node's visits (stratified), restricted to the most likely
+# 1 + WIDEN_C * N ** WIDEN_ALPHA outcomes (progressive widening), so rare
+# outcomes join only once the likely ones have been sampled.
+
+DEFAULT_TABLE_SIZE = 200000
+WIDEN_C = 4.0
+WIDEN_ALPHA = 0.5
+
+NodeKey = Tuple
+
 @dataclass
 class Node:
-    state: GameState
-    node_type: str  # 'decision', 'chance', 'pairing'
-    parent: Optional['Node'] = None
-    action_from_parent: Optional[Tuple] = None
+    state: PackedTurn
+    node_type: str  # 'decision', 'chance', 'pairing', 'terminal_stop', 'terminal_bust'
     N: int = 0
     W: float = 0.0
-    children: Dict[Tuple, 'Node'] = field(default_factory=dict)
-    roll_cache: List[Tuple[int,int,int,int]] = field(default_factory=list)  # for chance nodes
+    children: Dict[Tuple, NodeKey] = field(default_factory=dict)  # action -> key in the table
+    options: Tuple[PackedTurn, ...] = ()  # for pairing nodes: the turn states the roll's pairings reach
+    outcomes: List[Tuple[float, float, NodeKey]] = field(default_factory=list)  # for chance nodes: prob, cumulative prob, key
+    outcome_visits: List[int] = field(default_factory=list)
+
+def node_key(node_type: str, state: PackedTurn, options: Optional[Tuple[PackedTurn, ...]] = None) -> NodeKey:
+    return (node_type, state) if options is None else (node_type, state, options)
+
+def chance_outcomes(p: PackedTurn) -> List[Tuple[float, Tuple[PackedTurn, ...]]]:
+    """(probability, options) for each distinct effect of the next roll from p, most
+    likely first. options are the sorted turn states reachable by a legal pairing; () is a bust."""
+    step = {s: apply_sum(p, s) for s in COLUMNS}
+    child = []
+    for s1, s2 in ORDERED_PAIRS:
+        q = step[s1]
+        child.append(step[s2] if q == p else apply_sum(q, s2))
+    weights: Dict[Tuple[PackedTurn, ...], int] = {}
+    for w, i, j, k in PAIRING_GROUPS:
+        reach = {child[i], child[j], child[k]}
+        reach.discard(p)
+        options = tuple(sorted(reach))
+        weights[options] = weights.get(options, 0) + w
+    return sorted(((w / 1296.0, options) for options, w in weights.items()), key=lambda t: -t[0])
+
+def outcome_key(p: PackedTurn, options: Tuple[PackedTurn, ...]) -> NodeKey:
+    return node_key('pairing', p, options) if options else node_key('terminal_bust', p)
+
+class TranspositionTable:
+    """LRU map from node keys to Nodes, with counts of nodes created, merged and evicted."""
+
+    def __init__(self, maxsize: int = DEFAULT_TABLE_SIZE):
+        self.maxsize = maxsize
+        self.nodes: "OrderedDict[NodeKey, Node]" = OrderedDict()
+        self.created = 0
+        self.merged = 0
+        self.evicted = 0
 
-def is_terminal_turn(state: GameState) -> bool:
-    # Terminal for the *turn* occurs when we choose to stop (handled in simulate),
-    # or when a bust would occur (if no legal pairings after a roll).
-    return False  # Non-absorbing; handled explicitly
+    def node(self, key: NodeKey) -> Node:
+        """The node for key, created empty if it is new or was evicted."""
+        node = self.nodes.get(key)
+        if node is not None:
+            self.nodes.move_to_end(key)
+            return node
+        node = self.nodes[key] = Node(state=key[1], node_type=key[0], options=key[2] if len(key) > 2 else ())
+        self.created += 1
+        while len(self.nodes) > self.maxsize:
+            self.nodes.popitem(last=False)
+            self.evicted += 1
+        return node
 
-def uct_select(node: Node, c: float = 1.0) -> Tuple:
+    def link(self, parent: Node, action: Tuple, key: NodeKey) -> Node:
+        """Add the edge parent --action--> key; a new edge onto an existing node is a merged duplicate."""
+        if action not in parent.children:
+            parent.children[action] = key
+            if key in self.nodes:
+                self.merged += 1
+        return self.node(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {"nodes": len(self.nodes), "created": self.created, "merged": self.merged, "evicted": self.evicted}
+
+def uct_select(node: Node, table: TranspositionTable, c: float = 1.0) -> Tuple:
+    # With transpositions a child's N and W include visits through its other
+    # parents; that only sharpens Q, and node.N still bounds the exploration term.
     best, best_score = None, -1e9
-    for action, child in node.children.items():
-        q = 0.0 if child.N == 0 else (child.W / child.N)
-        u = c * math.sqrt(math.log(max(1, node.N)) / (1 + child.N))
+    log_n = math.log(max(1, node.N))
+    # Utilities run well above 1, so explore in units of the node's own mean value
+    c *= max(1.0, node.W / node.N) if node.N else 1.0
+    for action, key in node.children.items():
+        child = table.nodes.get(key)
+        if child is None or child.N == 0:
+            # Unvisited children first: a 0.0 prior never beats an explored action worth more
+            return action
+        n = child.N
+        q = child.W / n
+        u = c * math.sqrt(log_n / (1 + n))
         score = q + u
         if score > best_score:
             best_score, best = score, action
     return best
 
-def expand_decision(node: Node):
+def expand_decision(node: Node, table: TranspositionTable):
     # Actions at decision node: 'STOP' or 'ROLL'
-    if ('STOP',) not in node.children:
-        # Create a terminal-ish child representing choosing to stop now
-        s2 = node.state.copy()
-        child_stop = Node(state=s2, node_type='terminal_stop', parent=node, action_from_parent=('STOP',))
-        node.children[('STOP',)] = child_stop
-    if ('ROLL',) not in node.children:
-        s3 = node.state.copy()
-        child_roll = Node(state=s3, node_type='chance', parent=node, action_from_parent=('ROLL',))
-        node.children[('ROLL',)] = child_roll
-
-def expand_chance(node: Node, rng: random.Random):
-    # Sample a new roll and create a pairing-choice node, or a bust terminal if no legal pairings
-    roll = roll_dice(rng)
-    node.roll_cache.append(roll)
-    s2 = node.state.copy()
-    s2.turn.last_roll = roll
-    legals = legal_pairings(s2, roll)
-    if not legals:
-        child = Node(state=s2, node_type='terminal_bust', parent=node, action_from_parent=('BUST', roll))
-        node.children[(roll, 'BUST')] = child
-    else:
-        # 'pairing' node where actions are the legal pairings
-        child = Node(state=s2, node_type='pairing', parent=node, action_from_parent=('ROLL_RESULT', roll))
-        # bootstrap children as empty; we'll add pairing children lazily in simulate
-        node.children[(roll,)] = child
-
-def expand_pairing(node: Node):
-    roll = node.state.turn.last_roll
-    legals = legal_pairings(node.state, roll)
-    for p in legals:
-        if ('PAIR', p) not in node.children:
-            s2 = node.state.copy()
-            apply_pairing(s2, p)
-            child = Node(state=s2, node_type='decision', parent=node, action_from_parent=('PAIR', p))
-            node.children[('PAIR', p)] = child
-
-def simulate(node: Node, rng: random.Random, risk: str, max_depth: int = 200) -> float:
+    table.link(node, ('STOP',), node_key('terminal_stop', node.state))
+    table.link(node, ('ROLL',), node_key('chance', node.state))
+
+def expand_chance(node: Node, table: TranspositionTable, rng: random.Random) -> Node:
+    # Pick the next roll outcome: the widened outcome furthest below its share, ties at random
+    if not node.outcomes:
+        cum = 0.0
+        for prob, options in chance_outcomes(node.state):
+            cum += prob
+            node.outcomes.append((prob, cum, outcome_key(node.state, options)))
+        node.outcome_visits = [0] * len(node.outcomes)
+    outcomes, visits = node.outcomes, node.outcome_visits
+    width = min(len(outcomes), 1 + int(WIDEN_C * node.N ** WIDEN_ALPHA))
+    # Outcomes past the width are unvisited, so this node's N visits all fell inside it
+    scale = (node.N + 1) / outcomes[width - 1][1]
+    best, best_deficit = [], -1e9
+    for i in range(width):
+        deficit = outcomes[i][0] * scale - visits[i]
+        if deficit > best_deficit + 1e-9:
+            best, best_deficit = [i], deficit
+        elif deficit > best_deficit - 1e-9:
+            best.append(i)
+    i = best[0] if len(best) == 1 else rng.choice(best)
+    visits[i] += 1
+    key = outcomes[i][2]
+    # A 'pairing' node's actions are the states its options reach; they are added lazily in simulate
+    return table.link(node, ('OUTCOME', key), key)
+
+def expand_pairing(node: Node, table: TranspositionTable):
+    for s2 in node.options:
+        table.link(node, ('PAIR', s2), node_key('decision', s2))
+
+def _descend(cur: Node, table: TranspositionTable, rng: random.Random) -> Node:
+    if cur.node_type == 'decision':
+        # Expand both options if not yet
+        if not cur.children:
+            expand_decision(cur, table)
+        # UCT select between STOP and ROLL; stopping doesn't advance to the next player,
+        # the terminal_stop node scores the turn gains so far
+        action = uct_select(cur, table, c=1.0)
+        return table.node(cur.children[action])
+    if cur.node_type == 'chance':
+        # Chance: sample a roll and descend into its outcome
+        return expand_chance(cur, table, rng)
+    # Pairing: ensure pairing children exist, then select one with UCT
+    if not cur.children:
+        expand_pairing(cur, table)
+    action = uct_select(cur, table, c=1.0)
+    return table.node(cur.children[action])
+
+def simulate(root: Node, table: TranspositionTable, rng: random.Random, risk: str, max_depth: int = 200,
+             lock: Optional[Lock] = None) -> float:
+    # With a lock (tree-parallel threads sharing one table) every step runs under
+    # it and visits are counted on the way down: a virtual loss that makes a path
+    # another thread is still exploring look worse until its reward arrives.
     depth = 0
-    cur = node
+    cur = root
+    path = [root]
+    if lock is not None:
+        with lock:
+            root.N += 1
     while depth < max_depth:
         depth += 1
         if cur.node_type == 'terminal_bust':
             # Bust => 0 utility (lost all turn gains)
             reward = 0.0
-            backpropagate(cur, reward)
-            return reward
+            break
         if cur.node_type == 'terminal_stop':
             # Stopping now: compute utility of what is already gained
-            gain = compute_turn_gain(cur.state)
-            fins = finished_columns_this_turn(cur.state)
-            reward = utility(gain, fins, risk)
-            backpropagate(cur, reward)
-            return reward
-
-        if cur.node_type == 'decision':
-            # Expand both options if not yet
-            if not cur.children:
-                expand_decision(cur)
-            # UCT select between STOP and ROLL
-            action = uct_select(cur, c=1.0)
-            child = cur.children[action]
-            if action == ('STOP',):
-                # Convert to terminal-stop by banking (for downstream consistency)
-                # Use a copy to not advance the real game yet
-                s2 = child.state.copy()
-                # Stopping would bank; we don't advance turn to next player in MCTS
-                # but we evaluate current turn gains at this point.
-                # The terminal_stop node already handles utility; simply move cursor there.
-                cur = child
-                continue
-            else:
-                # ROLL: go to chance node
-                cur = child
-                continue
-
-        if cur.node_type == 'chance':
-            # Chance: sample a roll and create downstream node lazily
-            expand_chance(cur, rng)
-            # Pick the just-sampled outcome to descend
-            # Prefer the newest child to avoid bias
-            action = list(cur.children.keys())[-1]
-            cur = cur.children[action]
-            continue
-
-        if cur.node_type == 'pairing':
-            # Ensure pairing children exist
-            if not cur.children:
-                expand_pairing(cur)
-            # Select a pairing with UCT
-            action = uct_select(cur, c=1.0)
-            cur = cur.children[action]
-            continue
-
-    # Depth cutoff: treat as stop now
-    gain = compute_turn_gain(cur.state)
-    fins = finished_columns_this_turn(cur.state)
-    reward = utility(gain, fins, risk)
-    backpropagate(cur, reward)
+            reward = utility(turn_gain(cur.state), finished_columns(cur.state), risk)
+            break
+        if lock is None:
+            cur = _descend(cur, table, rng)
+        else:
+            with lock:
+                cur = _descend(cur, table, rng)
+                cur.N += 1
+        path.append(cur)
+    else:
+        # Depth cutoff: treat as stop now
+        reward = utility(turn_gain(cur.state), finished_columns(cur.state), risk)
+
+    if lock is None:
+        backpropagate(path, reward)
+    else:
+        with lock:
+            backpropagate(path, reward, counted=True)
     return reward
 
-def backpropagate(node: Node, reward: float):
-    cur = node
-    while cur is not None:
-        cur.N += 1
-        cur.W += reward
-        cur = cur.parent
+def backpropagate(path: List[Node], reward: float, counted: bool = False):
+    # counted: the visits were already added on the way down (virtual loss)
+    for node in path:
+        if not counted:
+            node.N += 1
+        node.W += reward
 
-def recommend_press_or_park(state: GameState, iters: int = 2000, seed: int = 0, risk: str = "neutral"):
-    rng = random.Random(seed)
-    root = Node(state=state.copy(), node_type='decision')
-    # Pre-create children so we can read Q-values afterwards
-    expand_decision(root)
+def run_search(root: Node, table: TranspositionTable, rng: random.Random, risk: str, iters: int = 2000,
+               time_ms: Optional[float] = None, lock: Optional[Lock] = None) -> int:
+    """Simulate from root `iters` times or, when time_ms is given, until that many
+    milliseconds have passed. Returns the number of simulations run."""
+    if time_ms is None:
+        for _ in range(iters):
+            simulate(root, table, rng, risk, lock=lock)
+        return iters
+    deadline = time.perf_counter() + time_ms / 1000.0
+    done = 0
+    while True:
+        simulate(root, table, rng, risk, lock=lock)
+        done += 1
+        if time.perf_counter() >= deadline:
+            return done
+
+def expand_root(root: Node, table: TranspositionTable):
+    # Pre-create the root's children so we can read Q-values afterwards
+    if root.node_type == 'decision':
+        expand_decision(root, table)
+    elif root.node_type == 'pairing':
+        expand_pairing(root, table)
 
-    for _ in range(iters):
-        simulate(root, rng, risk)
+RootStats = Dict[Tuple, Tuple[int, float]]
 
-    def q_of(action_key):
-        child = root.children[action_key]
-        return 0.0 if child.N == 0 else child.W / child.N
+def root_stats(table: TranspositionTable, root: Node) -> RootStats:
+    """(visits, tree_value) for each action at the root. Below a pairing root the
+    follow-up STOP/ROLL edges of each pairing are included too, keyed
+    (('PAIR', s), ('STOP',)) and (('PAIR', s), ('ROLL',)), so one search answers both."""
+    memo: Dict[NodeKey, float] = {}
+    stats = {}
+
+    def edge(key: NodeKey) -> Tuple[int, float]:
+        child = table.nodes.get(key)
+        return (0 if child is None else child.N, tree_value(table, key, memo))
+
+    for action, key in root.children.items():
+        stats[action] = edge(key)
+        if root.node_type == 'pairing':
+            stats[(action, ('STOP',))] = edge(node_key('terminal_stop', key[1]))
+            stats[(action, ('ROLL',))] = edge(node_key('chance', key[1]))
+    return stats
+
+def search(root_key: NodeKey, risk: str = "neutral", iters: int = 2000, seed: int = 0, time_ms: Optional[float] = None,
+           table_size: int = DEFAULT_TABLE_SIZE, workers: int = 1, mode: str = "root",
+           table: Optional[TranspositionTable] = None) -> Tuple[RootStats, Dict[str, int]]:
+    """Search from the node root_key; returns root_stats and the search counters.
+    workers > 1 (or None for every core) hands off to parallel.parallel_search in `mode`.
+    Passing a table from an earlier search of the same turn and risk profile re-roots
+    it at root_key, keeping what that search learned ('reused' simulations)."""
+    if workers != 1:
+        from .parallel import parallel_search
+        return parallel_search(root_key, risk, iters, seed, time_ms, table_size, workers, mode)
+    rng = random.Random(seed)
+    if table is None:
+        table = TranspositionTable(table_size)
+    root = table.node(root_key)
+    reused = root.N
+    expand_root(root, table)
+    done = run_search(root, table, rng, risk, iters, time_ms)
+    return root_stats(table, root), dict(table.stats(), simulations=done, reused=reused)
 
-    q_stop = q_of(('STOP',))
-    q_roll = q_of(('ROLL',))
+def recommend_press_or_park(state: GameState, iters: int = 2000, seed: int = 0, risk: str = "neutral",
+                            table_size: int = DEFAULT_TABLE_SIZE, time_ms: Optional[float] = None,
+                            workers: int = 1, mode: str = "root", table: Optional[TranspositionTable] = None):
+    stats, counters = search(node_key('decision', pack(state)), risk, iters, seed, time_ms, table_size, workers, mode, table)
+    q_stop = stats[('STOP',)][1]
+    q_roll = stats[('ROLL',)][1]
     
     # Fix: Handle edge cases and provide better decision logic
     if q_roll == q_stop:
@@ -193,7 +323,7 @@ def recommend_press_or_park(state: GameState, iters: int = 2000, seed: int = 0,
     
     # Also compute exact bust probability for UI
     try:
-        p_bust = bust_prob(state.copy())
+        p_bust = bust_prob(state)
     except Exception:
         # Fallback if odds calculation fails
         p_bust = 0.5
@@ -202,38 +332,93 @@ def recommend_press_or_park(state: GameState, iters: int = 2000, seed: int = 0,
         "action": action,
         "q_stop": q_stop,
         "q_press": q_roll,
-        "p_bust": p_bust
+        "p_bust": p_bust,
+        "search": counters,
     }
 
-def recommend_pairing_after_roll(state: GameState, roll: Tuple[int,int,int,int], iters: int = 2000, seed: int = 0, risk: str = "neutral"):
-    rng = random.Random(seed)
-    s2 = state.copy()
-    s2.turn.last_roll = roll
-    legals = legal_pairings(s2, roll)
-    if not legals:
+def recommend_pairing_after_roll(state: GameState, roll: Tuple[int,int,int,int], iters: int = 2000, seed: int = 0, risk: str = "neutral",
+                                 table_size: int = DEFAULT_TABLE_SIZE, time_ms: Optional[float] = None,
+                                 workers: int = 1, mode: str = "root", table: Optional[TranspositionTable] = None):
+    packed = pack(state)
+    moves = after_roll(packed, roll)
+    if not moves:
         return {"pairing": None, "note": "No legal pairings; bust."}
-    root = Node(state=s2, node_type='pairing')
-    expand_pairing(root)
-
-    for _ in range(iters):
-        simulate(root, rng, risk)
+    root_key = node_key('pairing', packed, tuple(sorted({q for _, q in moves})))
+    stats, counters = search(root_key, risk, iters, seed, time_ms, table_size, workers, mode, table)
 
-    # Fix: Handle case where no children exist
-    if not root.children:
-        return {"pairing": None, "note": "No legal pairings available"}
-
-    # Choose child with highest Q
+    # Choose the pairing whose resulting state has the highest Q (the first such, in engine order)
     best_p, best_q = None, -1e9
-    for k, child in root.children.items():
-        q = 0.0 if child.N == 0 else child.W / child.N
+    for pairing, s2 in moves:
+        q = stats[('PAIR', s2)][1]
         if q > best_q:
             best_q = q
-            best_p = k[1]  # ('PAIR', p)
+            best_p = pairing
     
     if best_p is None:
         return {"pairing": None, "note": "No valid pairing found"}
     
     return {
         "pairing": best_p,
-        "q": best_q
+        "q": best_q,
+        "search": counters,
     }
+
+def recommend_after_roll(state: GameState, roll: Tuple[int,int,int,int], iters: int = 2000, seed: int = 0, risk: str = "neutral",
+                         table_size: int = DEFAULT_TABLE_SIZE, time_ms: Optional[float] = None,
+                         workers: int = 1, mode: str = "root", table: Optional[TranspositionTable] = None):
+    """Best pairing for roll and whether to press or park after it, from a single
+    search rooted at the pairing choice."""
+    packed = pack(state)
+    moves = after_roll(packed, roll)
+    if not moves:
+        return {"pairing": None, "note": "No legal pairings; bust."}
+    root_key = node_key('pairing', packed, tuple(sorted({q for _, q in moves})))
+    stats, counters = search(root_key, risk, iters, seed, time_ms, table_size, workers, mode, table)
+    return after_roll_recommendation(moves, lambda s2: (stats[('PAIR', s2)][1], stats[(('PAIR', s2), ('STOP',))][1],
+                                                 stats[(('PAIR', s2), ('ROLL',))][1]), search=counters)
+
+def after_roll_recommendation(moves, values, **extra):
+    """Result of recommend_after_roll from values(s2) -> (value, q_stop, q_press) of the
+    state each legal pairing reaches; the best pairing's entry, plus all of them."""
+    options = []
+    best = None
+    for pairing, s2 in moves:
+        q, q_stop, q_press = values(s2)
+        opt = {
+            "pairing": pairing,
+            "q": q,
+            "q_stop": q_stop,
+            "q_press": q_press,
+            "action": 'press' if q_press > q_stop else 'park',
+            "p_bust": BUST_BY_MASK[playable_mask(s2)],
+        }
+        options.append(opt)
+        # The first best, in engine order
+        if best is None or q > best["q"]:
+            best = opt
+    return dict(best, options=options, **extra)
+
+def tree_value(table: TranspositionTable, key: NodeKey, memo: Optional[Dict[NodeKey, float]] = None) -> float:
+    """Expectimax over the explored part of the DAG below key: best child at decision and
+    pairing nodes, exact outcome probabilities at chance nodes, and the mean reward at
+    terminals and unexpanded nodes. Running means also count exploratory visits, so this
+    is a far less biased estimate of the value of playing on well."""
+    if memo is None:
+        memo = {}
+    v = memo.get(key)
+    if v is not None:
+        return v
+    node = table.nodes.get(key)
+    if node is None or node.N == 0:
+        return 0.0
+    v = node.W / node.N
+    if node.node_type == 'chance':
+        seen = [(prob, k) for (prob, _, k), n in zip(node.outcomes, node.outcome_visits) if n]
+        if seen:
+            v = sum(prob * tree_value(table, k, memo) for prob, k in seen) / sum(prob for prob, _ in seen)
+    elif node.node_type in ('decision', 'pairing'):
+        explored = [k for k in node.children.values() if k in table.nodes and table.nodes[k].N]
+        if explored:
+            v = max(tree_value(table, k, memo) for k in explored)
+    memo[key] = v
+    return v
@@ -1,6 +1,9 @@
 from __future__ import annotations
-from functools import lru_cache
-from typing import Dict, List, Tuple
+from collections import Counter
+from itertools import combinations_with_replacement
+from math import factorial
+from typing import Dict, List, Optional, Tuple
+from .cache import ODDS_CACHE, OddsCache
 from .constants import COLUMN_HEIGHTS, COLUMNS
 from .state import GameState
 from .engine import legal_pairings, pairings_from_roll, turn_key_for_odds, apply_pairing
@@ -8,88 +11,135 @@ from .engine import legal_pairings, pairings_from_roll, turn_key_for_odds, apply
 Roll = Tuple[int,int,int,int]
 ALL_ROLLS: List[Roll] = [(a,b,c,d) for a in range(1,7) for b in range(1,7) for c in range(1,7) for d in range(1,7)]
 
-@lru_cache(maxsize=100000)
-def _bust_prob_cached(key: tuple) -> float:
-    # Reconstruct a minimal pseudo-state from key isn't practical; we instead rely on the caller
-    # to pass through a fresh state each time and only use key for caching outcome.
-    # This function is a placeholder to host the cache; actual computation is injected.
-    return -1.0  # should never be returned
+# Sums are bits: sum s <-> 1 << (s - 2), so a set of columns fits in 11 bits.
+def sum_bit(s: int) -> int:
+    return 1 << (s - 2)
 
-def bust_prob(state: GameState) -> float:
-    try:
-        key = turn_key_for_odds(state)
-        # We can't store state in cache directly; use a local closure over current state.
-        # Implement manual caching by checking lru_cache dict via wrapped function trick.
-        try:
-            value = _bust_prob_cached.cache_get(key)  # type: ignore[attr-defined]
-            if value is not None:
-                return value
-        except Exception:
-            pass
+def _roll_table() -> List[Tuple[Roll, int, Tuple[int, int, int], int]]:
+    # One row per dice multiset (126 of them): the sorted roll, how many of the
+    # 1296 ordered rolls it stands for, the sum mask of each of its 3 pairings,
+    # and the union of those masks.
+    rows = []
+    for roll in combinations_with_replacement(range(1, 7), 4):
+        weight = factorial(4)
+        for face in set(roll):
+            weight //= factorial(roll.count(face))
+        pair_masks = tuple(sum_bit(a) | sum_bit(b) for a, b in pairings_from_roll(roll))
+        rows.append((roll, weight, pair_masks, pair_masks[0] | pair_masks[1] | pair_masks[2]))
+    return rows
 
-        busts = 0
-        for roll in ALL_ROLLS:
-            if not legal_pairings(state, roll):
-                busts += 1
-        p = busts / 1296.0
-        # Save to cache
-        try:
-            _bust_prob_cached.cache_set(key, p)  # type: ignore[attr-defined]
-        except Exception:
-            pass
-        return p
-    except Exception:
-        # Fallback: return a reasonable default if calculation fails
-        return 0.5
+ROLL_TABLE = _roll_table()
 
-# Monkey-patch cache helpers since functools doesn't expose get/set
-def _cache_get(self, key):
-    try:
-        return self.cache[key]
-    except Exception:
-        return None
+def playable_mask(state: GameState) -> int:
+    """Sums that could move a runner right now (engine.can_play_sum for every column)."""
+    free = state.turn.free_runners > 0
+    active = state.turn.active_runners
+    mask = 0
+    for c in COLUMNS:
+        if state.claimed_by[c] is not None:
+            continue
+        if c in active:
+            if active[c] < COLUMN_HEIGHTS[c]:
+                mask |= sum_bit(c)
+        elif free:
+            mask |= sum_bit(c)
+    return mask
+
+# A pairing is legal iff one of its sums is playable before it is applied
+# (engine.legal_pairings only re-checks the second sum after moving the first,
+# which cannot make an unplayable sum playable), so a roll busts exactly when
+# none of its six sums is playable. Bust chance per playable mask, all 2048:
+BUST_BY_MASK: List[float] = [
+    sum(w for _, w, _, sums in ROLL_TABLE if not sums & m) / 1296.0 for m in range(1 << len(COLUMNS))
+]
 
-def _cache_set(self, key, value):
+# Advancing needs the pairings in order, since engine.apply_pairing moves s1
+# first (with one free runner left, only s1 may start a new runner). The 1296
+# rolls group into 321 distinct sets of ordered pairings; (weight, pairings):
+PAIRING_TABLE: List[Tuple[int, Tuple[Tuple[int, int], ...]]] = sorted(
+    (w, pairs) for pairs, w in Counter(tuple(sorted(set(pairings_from_roll(r)))) for r in ALL_ROLLS).items()
+)
+
+# For hot loops: every ordered pairing once, and each group as (weight, i, j, k)
+# indices into it, padded by repeating its last pairing.
+ORDERED_PAIRS: List[Tuple[int, int]] = sorted({pair for _, pairs in PAIRING_TABLE for pair in pairs})
+PAIRING_GROUPS: List[Tuple[int, int, int, int]] = [
+    (w,) + tuple(ORDERED_PAIRS.index(pairs[min(i, len(pairs) - 1)]) for i in range(3)) for w, pairs in PAIRING_TABLE
+]
+
+def bust_prob(state: GameState, cache: Optional[OddsCache] = ODDS_CACHE) -> float:
+    """Chance the next roll busts. Memoized on turn_key_for_odds; pass cache=None to skip."""
     try:
-        self.cache[key] = value
+        if cache is None:
+            return BUST_BY_MASK[playable_mask(state)]
+        return cache.get_or_compute("bust", turn_key_for_odds(state), lambda: BUST_BY_MASK[playable_mask(state)])
     except Exception:
-        pass
+        # Fallback: return a reasonable default if calculation fails
+        return 0.5
 
-# Attach helpers
-_bust_prob_cached.cache_get = _cache_get.__get__(_bust_prob_cached)  # type: ignore[attr-defined]
-_bust_prob_cached.cache_set = _cache_set.__get__(_bust_prob_cached)  # type: ignore[attr-defined]
+def bust_prob_bruteforce(state: GameState) -> float:
+    """Reference: enumerate all 1296 ordered rolls through engine.legal_pairings."""
+    busts = 0
+    for roll in ALL_ROLLS:
+        if not legal_pairings(state, roll):
+            busts += 1
+    return busts / 1296.0
 
-def adv_prob_by_column(state: GameState) -> Dict[int, float]:
-    try:
-        cur = state.current
-        # Snapshot before
-        base_positions = {c: state.players[cur].permanent_pos[c] for c in COLUMNS}
-        active_before = dict(state.turn.active_runners)
+def adv_prob_by_column(state: GameState, cache: Optional[OddsCache] = ODDS_CACHE) -> Dict[int, float]:
+    """Chance the next roll can advance each column. Memoized like bust_prob; returns a fresh dict."""
+    if cache is None:
+        return _adv_prob_by_column(state)
+    return dict(cache.get_or_compute("adv", turn_key_for_odds(state), lambda: _adv_prob_by_column(state)))
 
-        res = {c: 0 for c in COLUMNS}
-        for roll in ALL_ROLLS:
-            legals = legal_pairings(state, roll)
-            cols_that_can_advance = set()
-            for p in legals:
-                # Apply on a temp state copy
-                from copy import deepcopy
-                s2 = state.copy()
-                s2.turn.last_roll = roll
-                # track before
-                before = dict(s2.turn.active_runners)
-                apply_pairing(s2, p)
-                after = s2.turn.active_runners
-                for c in set(list(before.keys()) + list(after.keys())):
-                    prev = before.get(c, base_positions[c])
-                    now = after.get(c, before.get(c, base_positions[c]))
-                    if now > prev:
-                        cols_that_can_advance.add(c)
-            for c in cols_that_can_advance:
-                res[c] += 1
-        # Normalize
-        for c in res:
-            res[c] = res[c] / 1296.0
-        return res
+def _adv_prob_by_column(state: GameState) -> Dict[int, float]:
+    try:
+        active = state.turn.active_runners
+        base = state.players[state.current].permanent_pos
+        playable = playable_mask(state)
+        fresh = playable
+        for c in active:
+            fresh &= ~sum_bit(c)
+        # Sums still playable after one step on s (as engine.apply_sum_once would
+        # take it): s itself drops out when that step reaches the top, and starting
+        # the last free runner closes every column without one.
+        after: Dict[int, int] = {}
+        for c in COLUMNS:
+            bit = sum_bit(c)
+            if not playable & bit:
+                after[c] = playable
+                continue
+            m = playable if c in active or state.turn.free_runners > 1 else playable & ~fresh
+            after[c] = m | bit if active.get(c, base[c]) + 1 < COLUMN_HEIGHTS[c] else m & ~bit
+        # A pairing moves s1 if it is playable, then s2 if it still is
+        moved: Dict[Tuple[int, int], int] = {}
+        by_mask: Dict[int, int] = {}
+        for weight, pairs in PAIRING_TABLE:
+            union = 0
+            for pair in pairs:
+                m = moved.get(pair)
+                if m is None:
+                    s1, s2 = pair
+                    m = moved[pair] = (sum_bit(s1) & playable) | (sum_bit(s2) & after[s1])
+                union |= m
+            by_mask[union] = by_mask.get(union, 0) + weight
+        return {c: sum(w for m, w in by_mask.items() if m & sum_bit(c)) / 1296.0 for c in COLUMNS}
     except Exception:
         # Fallback: return uniform probabilities if calculation fails
         return {c: 1.0 / len(COLUMNS) for c in COLUMNS}
+
+def adv_prob_by_column_bruteforce(state: GameState) -> Dict[int, float]:
+    """Reference: apply every legal pairing of all 1296 rolls to a copy of the state."""
+    base = state.players[state.current].permanent_pos
+    res = {c: 0 for c in COLUMNS}
+    for roll in ALL_ROLLS:
+        advanced = set()
+        for p in legal_pairings(state, roll):
+            s2 = state.copy()
+            before = dict(s2.turn.active_runners)
+            apply_pairing(s2, p)
+            for c, now in s2.turn.active_runners.items():
+                if now > before.get(c, base[c]):
+                    advanced.add(c)
+        for c in advanced:
+            res[c] += 1
+    return {c: res[c] / 1296.0 for c in COLUMNS}
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from typing import List, Tuple
+from .constants import COLUMN_HEIGHTS, COLUMNS
+from .state import GameState
+from .engine import Pairing, Roll, pairings_from_roll
+
+# One turn of Can't Stop packed into a single int, for the search engine.
+#
+#   bits   0..43   position of the current player's marker per column, 4 bits
+#                  each (the runner if one is there, else the banked position)
+#   bits  44..87   banked position per column, same layout
+#   bits  88..98   columns holding an active runner (sum s <-> bit s - 2)
+#   bits  99..109  closed columns (claimed by anyone)
+#   bits 110..120  active runners that reached the top this turn
+#
+# Opponents' progress never matters within a turn, so it is left out; pack()
+# and to_game_state() convert at the GameState boundary. Transitions are pure
+# functions returning a new int, which doubles as a hash/transposition key.
+
+PackedTurn = int
+
+BANK = 44
+ACTIVE = 88
+CLOSED = 99
+TOP = 110
+ALL_COLUMNS = (1 << len(COLUMNS)) - 1
+POS_MASK = (1 << BANK) - 1
+
+BIT = {c: 1 << (c - 2) for c in COLUMNS}
+SHIFT = {c: 4 * (c - 2) for c in COLUMNS}
+
+def pack(state: GameState) -> PackedTurn:
+    """The current player's turn in `state` as a PackedTurn."""
+    me = state.players[state.current]
+    active = state.turn.active_runners
+    p = 0
+    for c in COLUMNS:
+        base = me.permanent_pos[c]
+        at = active.get(c, base)
+        p |= at << SHIFT[c] | base << (BANK + SHIFT[c])
+        if c in active:
+            p |= BIT[c] << ACTIVE
+            if at >= COLUMN_HEIGHTS[c]:
+                p |= BIT[c] << TOP
+        if state.claimed_by[c] is not None:
+            p |= BIT[c] << CLOSED
+    return p
+
+def to_game_state(p: PackedTurn, like: GameState) -> GameState:
+    """A copy of `like` with the current player's positions, claims and runners taken from p."""
+    state = like.copy()
+    cur = state.current
+    me = state.players[cur]
+    active = (p >> ACTIVE) & ALL_COLUMNS
+    closed = (p >> CLOSED) & ALL_COLUMNS
+    state.turn.active_runners.clear()
+    for c in COLUMNS:
+        me.permanent_pos[c] = (p >> (BANK + SHIFT[c])) & 15
+        if active & BIT[c]:
+            state.turn.active_runners[c] = (p >> SHIFT[c]) & 15
+        if closed & BIT[c] and state.claimed_by[c] is None:
+            state.claimed_by[c] = cur
+            me.claimed.add(c)
+    return state
+
+def turn_context(p: PackedTurn) -> int:
+    """What stays fixed for the whole turn: banked positions and closed columns."""
+    return (p >> BANK) & POS_MASK | ((p >> CLOSED) & ALL_COLUMNS) << BANK
+
+def position(p: PackedTurn, c: int) -> int:
+    return (p >> SHIFT[c]) & 15
+
+def banked(p: PackedTurn, c: int) -> int:
+    return (p >> (BANK + SHIFT[c])) & 15
+
+_FREE = [3 - bin(m).count("1") for m in range(ALL_COLUMNS + 1)]
+
+def free_runners(p: PackedTurn) -> int:
+    return _FREE[(p >> ACTIVE) & ALL_COLUMNS]
+
+def playable_mask(p: PackedTurn) -> int:
+    """Sums that could move a runner right now (same as odds.playable_mask)."""
+    active = (p >> ACTIVE) & ALL_COLUMNS
+    mask = active & ~(p >> TOP)
+    if free_runners(p) > 0:
+        mask |= ALL_COLUMNS & ~active & ~(p >> CLOSED)
+    return mask
+
+def apply_sum(p: PackedTurn, s: int) -> PackedTurn:
+    """One step on column s if it is playable (engine.apply_sum_once); p itself otherwise."""
+    bit = BIT[s]
+    if (p >> CLOSED) & bit:
+        return p
+    if (p >> ACTIVE) & bit:
+        if (p >> TOP) & bit:
+            return p
+    elif _FREE[(p >> ACTIVE) & ALL_COLUMNS] <= 0:
+        return p
+    else:
+        p |= bit << ACTIVE
+    # A new runner starts one above the banked position, which is where the marker already is
+    p += 1 << SHIFT[s]
+    if ((p >> SHIFT[s]) & 15) >= COLUMN_HEIGHTS[s]:
+        p |= bit << TOP
+    return p
+
+def apply_pairing(p: PackedTurn, pairing: Pairing) -> PackedTurn:
+    s1, s2 = pairing
+    return apply_sum(apply_sum(p, s1), s2)
+
+def after_roll(p: PackedTurn, roll: Roll) -> List[Tuple[Pairing, PackedTurn]]:
+    """(pairing, resulting turn) for each legal pairing of roll, in engine.legal_pairings
+    order; empty means the roll busts. A pairing is legal exactly when it moves something."""
+    res = []
+    seen = set()
+    for pairing in pairings_from_roll(roll):
+        if pairing in seen:
+            continue
+        seen.add(pairing)
+        q = apply_pairing(p, pairing)
+        if q != p:
+            res.append((pairing, q))
+    return res
+
+def stop(p: PackedTurn) -> PackedTurn:
+    """Bank every runner and close the columns they topped out."""
+    pos = p & POS_MASK
+    closed = ((p >> CLOSED) | (p >> TOP)) & ALL_COLUMNS
+    return pos | pos << BANK | closed << CLOSED
+
+def turn_gain(p: PackedTurn) -> int:
+    """Steps gained this turn (engine.compute_turn_gain)."""
+    active = (p >> ACTIVE) & ALL_COLUMNS
+    return sum(((p >> SHIFT[c]) & 15) - ((p >> (BANK + SHIFT[c])) & 15) for c in COLUMNS if active & BIT[c])
+
+def finished_columns(p: PackedTurn) -> List[int]:
+    """Columns topped out this turn (engine.finished_columns_this_turn)."""
+    top = (p >> TOP) & ALL_COLUMNS
+    return [c for c in COLUMNS if top & BIT[c]]
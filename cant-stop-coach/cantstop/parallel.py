@@ -0,0 +1,120 @@
+from __future__ import annotations
+import atexit
+import hashlib
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from . import mcts
+from .mcts import DEFAULT_TABLE_SIZE, NodeKey, RootStats, TranspositionTable
+
+# Parallel MCTS for the coach.
+#
+# mode="root": independent trees in a persistent process pool, one per worker,
+# each with its own seed derived from (seed, tree index); their root
+# statistics are merged (visits summed, values visit-weighted). With an
+# iteration count the result depends only on the number of trees, never on
+# scheduling; with time_ms every tree searches for that long.
+#
+# mode="tree": threads share one tree with virtual loss. CPython's GIL keeps
+# them on one core, so this spreads search effort rather than adding
+# throughput; it is here for free-threaded builds and for comparison.
+
+def tree_seed(seed: int, index: int) -> int:
+    # Hash-derived so neighbouring base seeds do not share streams
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def merge_root_stats(results: List[RootStats]) -> RootStats:
+    merged: Dict[Tuple, Tuple[int, float]] = {}
+    for stats in results:
+        for action, (n, q) in stats.items():
+            n0, q0 = merged.get(action, (0, 0.0))
+            total = n0 + n
+            merged[action] = (total, (n0 * q0 + n * q) / total if total else q0)
+    return merged
+
+def _search_tree(job: Tuple[NodeKey, str, int, int, Optional[float], int]) -> Tuple[RootStats, Dict[str, int]]:
+    root_key, risk, iters, seed, time_ms, table_size = job
+    return mcts.search(root_key, risk, iters, seed, time_ms, table_size)
+
+def _merge(results: List[Tuple[RootStats, Dict[str, int]]]) -> Tuple[RootStats, Dict[str, int]]:
+    counters: Dict[str, int] = {}
+    for _, c in results:
+        for k, v in c.items():
+            counters[k] = counters.get(k, 0) + v
+    counters["trees"] = len(results)
+    return merge_root_stats([stats for stats, _ in results]), counters
+
+class SearchPool:
+    """Process pool reused across requests; workers=0 runs the trees in-process."""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._executor = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+
+    def search(self, root_key: NodeKey, risk: str = "neutral", iters: int = 2000, seed: int = 0,
+               time_ms: Optional[float] = None, table_size: int = DEFAULT_TABLE_SIZE,
+               trees: Optional[int] = None) -> Tuple[RootStats, Dict[str, int]]:
+        """Root-parallel search: `trees` (default: one per worker) trees splitting `iters`."""
+        trees = max(1, trees or self.workers)
+        if time_ms is not None and self._executor is not None:
+            # Trees beyond the workers would queue behind the others and overrun the budget
+            trees = min(trees, self.workers)
+        jobs = [(root_key, risk, iters // trees + (i < iters % trees), tree_seed(seed, i), time_ms, table_size)
+                for i in range(trees)]
+        if self._executor is None:
+            results = list(map(_search_tree, jobs))
+        else:
+            results = list(self._executor.map(_search_tree, jobs))
+        return _merge(results)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+_POOL: Optional[SearchPool] = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool(workers: Optional[int] = None) -> SearchPool:
+    """Process-wide pool, started on first use and shut down at exit."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = SearchPool(workers)
+            atexit.register(_POOL.close)
+        return _POOL
+
+def tree_parallel_search(root_key: NodeKey, risk: str = "neutral", iters: int = 2000, seed: int = 0,
+                         time_ms: Optional[float] = None, table_size: int = DEFAULT_TABLE_SIZE,
+                         threads: int = 4) -> Tuple[RootStats, Dict[str, int]]:
+    """One shared tree searched by `threads` threads with virtual loss."""
+    table = TranspositionTable(table_size)
+    root = table.node(root_key)
+    mcts.expand_root(root, table)
+    lock = threading.Lock()
+    done = [0] * threads
+
+    def work(i: int) -> None:
+        rng = random.Random(tree_seed(seed, i))
+        done[i] = mcts.run_search(root, table, rng, risk, iters // threads + (i < iters % threads), time_ms, lock)
+
+    pool = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return mcts.root_stats(table, root), dict(table.stats(), simulations=sum(done), threads=threads)
+
+def parallel_search(root_key: NodeKey, risk: str = "neutral", iters: int = 2000, seed: int = 0,
+                    time_ms: Optional[float] = None, table_size: int = DEFAULT_TABLE_SIZE,
+                    workers: Optional[int] = None, mode: str = "root") -> Tuple[RootStats, Dict[str, int]]:
+    """mcts.search across `workers` trees (root) or threads (tree); None = every core."""
+    if mode == "tree":
+        return tree_parallel_search(root_key, risk, iters, seed, time_ms, table_size, workers or os.cpu_count() or 1)
+    if mode != "root":
+        raise ValueError(f"Unknown parallel mode {mode!r}")
+    return get_pool().search(root_key, risk, iters, seed, time_ms, table_size, trees=workers)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, Iterator, Optional, Tuple
+import time
+
+from .state import GameState
+from .mcts import DEFAULT_TABLE_SIZE, TranspositionTable
+from .packed import pack, turn_context
+
+# Search trees kept between coach requests, one per browser session.
+#
+# Consecutive requests in a turn (roll -> pick a pairing -> roll again) walk
+# down the same tree, and since nodes are keyed on the packed state, looking
+# up the new root in the old table *is* the re-rooting: everything learned
+# below it carries over. A tree is only valid for one turn and risk profile,
+# so a session's table is replaced when either changes. Stale sessions are
+# dropped after max_age seconds, and least recently used ones whenever all
+# tables together hold more than max_nodes nodes (~1 KB each, so ~200 MB by
+# default). The check runs when a table is checked out and again when it is
+# checked back in, since a search grows its table.
+#
+# Searches mutate their table (including its own LRU), so a table is only
+# ever used under checkout(), which holds its session's lock for the whole
+# search; a second request from the same session waits for the first.
+
+@dataclass
+class SearchSession:
+    table: TranspositionTable
+    context: Tuple[int, int, str]
+    last_used: float
+    lock: Lock = field(default_factory=Lock)
+
+class SearchStore:
+    def __init__(self, max_age: float = 900.0, max_nodes: int = 200_000, table_size: int = DEFAULT_TABLE_SIZE):
+        self.max_age = max_age
+        self.max_nodes = max_nodes
+        self.table_size = table_size
+        self._sessions: "OrderedDict[str, SearchSession]" = OrderedDict()
+        self._lock = Lock()
+        self.evicted = 0
+
+    @contextmanager
+    def checkout(self, session_id: str, state: GameState, risk: str = "neutral") -> Iterator[TranspositionTable]:
+        """Exclusive use of the session's tree for this turn (a fresh one if it has none
+        for it) until the with block exits."""
+        context = (turn_context(pack(state)), state.current, risk)
+        now = time.monotonic()
+        with self._lock:
+            sess = self._sessions.get(session_id)
+            if sess is None or sess.context != context:
+                sess = self._sessions[session_id] = SearchSession(TranspositionTable(self.table_size), context, now)
+            sess.last_used = now
+            self._sessions.move_to_end(session_id)
+            self._evict(now, keep=session_id)
+        with sess.lock:
+            try:
+                yield sess.table
+            finally:
+                with self._lock:
+                    self._evict(time.monotonic(), keep=session_id)
+
+    def drop(self, session_id: str) -> None:
+        """Forget a session's tree, e.g. when its game is replaced."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _evict(self, now: float, keep: Optional[str] = None) -> None:
+        # Oldest first: by age, then until the node total fits (never the session being served)
+        for sid in list(self._sessions):
+            if sid != keep and now - self._sessions[sid].last_used > self.max_age:
+                del self._sessions[sid]
+                self.evicted += 1
+        total = sum(len(s.table.nodes) for s in self._sessions.values())
+        for sid in list(self._sessions):
+            if total <= self.max_nodes:
+                break
+            if sid != keep:
+                total -= len(self._sessions.pop(sid).table.nodes)
+                self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "nodes": sum(len(s.table.nodes) for s in self._sessions.values()),
+                "evicted": self.evicted,
+            }
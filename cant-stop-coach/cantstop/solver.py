@@ -0,0 +1,159 @@
+from __future__ import annotations
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from .constants import COLUMN_HEIGHTS, COLUMNS
+from .state import GameState
+from .engine import Pairing, Roll
+from .odds import ORDERED_PAIRS, PAIRING_GROUPS, bust_prob
+from .packed import (ACTIVE, ALL_COLUMNS, BIT, CLOSED, PackedTurn, after_roll, apply_sum, banked,
+                     finished_columns, free_runners, pack, position, turn_context, turn_gain)
+from . import mcts
+
+# Exact expectimax over one turn. A turn always ends (every legal pairing
+# moves a runner up), so the value of a decision point is
+#
+#   V(p) = max(utility on stopping, sum over rolls of P(roll) * best V(child))
+#
+# with a bust worth 0, solved by memoized recursion over PackedTurns. Rolls
+# come from odds.PAIRING_GROUPS (the 1296 rolls grouped by ordered pairings)
+# and each distinct pairing's child is evaluated once per state.
+#
+# The number of states grows quickly with free runners (~69k from an empty
+# board, tens of seconds), so the coach solves exactly only when
+# state_space_bound() fits a budget and falls back to MCTS otherwise.
+
+DEFAULT_STATE_BUDGET = 12000
+
+def state_space_bound(p: PackedTurn) -> int:
+    """Upper bound on the decision points reachable from p this turn."""
+    active = (p >> ACTIVE) & ALL_COLUMNS
+    closed = (p >> CLOSED) & ALL_COLUMNS
+    placed = 1
+    # e[k]: ways to start k new runners, summed over their column choices and heights
+    e = [1] + [0] * free_runners(p)
+    for c in COLUMNS:
+        if active & BIT[c]:
+            placed *= COLUMN_HEIGHTS[c] - position(p, c) + 1
+        elif not closed & BIT[c]:
+            steps = COLUMN_HEIGHTS[c] - banked(p, c)
+            for k in range(len(e) - 1, 0, -1):
+                e[k] += e[k - 1] * steps
+    return placed * sum(e)
+
+class TurnSolver:
+    """Memoized values for every decision point of turns sharing one board and risk profile."""
+
+    def __init__(self, risk: str = "neutral"):
+        self.risk = risk
+        self.values: Dict[PackedTurn, float] = {}
+
+    def stop_value(self, p: PackedTurn) -> float:
+        return mcts.utility(turn_gain(p), finished_columns(p), self.risk)
+
+    def roll_value(self, p: PackedTurn) -> float:
+        """Expected utility of rolling once more and playing on optimally."""
+        values = self.values
+        step = {s: apply_sum(p, s) for s in COLUMNS}
+        child = [0.0] * len(ORDERED_PAIRS)
+        for i, (s1, s2) in enumerate(ORDERED_PAIRS):
+            q = step[s1]
+            q = step[s2] if q == p else apply_sum(q, s2)
+            if q == p:
+                # Moves nothing, so never chosen over a legal pairing; a roll of only these busts (worth 0)
+                child[i] = -1.0
+            else:
+                v = values.get(q)
+                child[i] = self.value(q) if v is None else v
+        total = 0.0
+        for w, a, b, c in PAIRING_GROUPS:
+            best = child[a]
+            if child[b] > best:
+                best = child[b]
+            if child[c] > best:
+                best = child[c]
+            if best > 0.0:
+                total += w * best
+        return total / 1296.0
+
+    def value(self, p: PackedTurn) -> float:
+        v = self.values.get(p)
+        if v is None:
+            v = self.values[p] = max(self.stop_value(p), self.roll_value(p))
+        return v
+
+    def best_pairing(self, p: PackedTurn, roll: Roll) -> Tuple[Optional[Pairing], float]:
+        """Best pairing for roll at p and its value; (None, 0.0) on a bust."""
+        best, best_v = None, 0.0
+        for pairing, q in after_roll(p, roll):
+            v = self.value(q)
+            if best is None or v > best_v:
+                best, best_v = pairing, v
+        return best, best_v
+
+# Turns of the same player on the same board share every state, so solvers are
+# kept per (banked positions + closed columns, risk) across coach requests.
+_SOLVERS: "OrderedDict[Tuple[int, str], TurnSolver]" = OrderedDict()
+_SOLVERS_LOCK = Lock()
+MAX_SOLVERS = 8
+
+def solver_for(p: PackedTurn, risk: str = "neutral") -> TurnSolver:
+    key = (turn_context(p), risk)
+    with _SOLVERS_LOCK:
+        solver = _SOLVERS.get(key)
+        if solver is None:
+            solver = _SOLVERS[key] = TurnSolver(risk)
+            while len(_SOLVERS) > MAX_SOLVERS:
+                _SOLVERS.popitem(last=False)
+        _SOLVERS.move_to_end(key)
+        return solver
+
+def _fits(p: PackedTurn, solver: TurnSolver, budget: Optional[int]) -> bool:
+    return budget is None or p in solver.values or state_space_bound(p) <= budget
+
+def recommend_press_or_park(state: GameState, iters: int = 2000, seed: int = 0, risk: str = "neutral",
+                            budget: Optional[int] = DEFAULT_STATE_BUDGET, **search):
+    """Exact press/park call when the turn fits `budget` states (None = always), else
+    mcts.recommend_press_or_park, which gets `search` (time_ms, workers, mode, ...)."""
+    p = pack(state)
+    solver = solver_for(p, risk)
+    if not _fits(p, solver, budget):
+        return dict(mcts.recommend_press_or_park(state, iters=iters, seed=seed, risk=risk, **search), method="mcts")
+    q_stop = solver.stop_value(p)
+    q_press = solver.roll_value(p)
+    return {
+        "action": "press" if q_press > q_stop else "park",
+        "q_stop": q_stop,
+        "q_press": q_press,
+        "p_bust": bust_prob(state),
+        "method": "exact",
+        "states": len(solver.values),
+    }
+
+def recommend_pairing_after_roll(state: GameState, roll: Roll, iters: int = 2000, seed: int = 0, risk: str = "neutral",
+                                 budget: Optional[int] = DEFAULT_STATE_BUDGET, **search):
+    """Exact best pairing for roll when the turn fits `budget` states, else mcts.recommend_pairing_after_roll."""
+    p = pack(state)
+    solver = solver_for(p, risk)
+    if not _fits(p, solver, budget):
+        return dict(mcts.recommend_pairing_after_roll(state, roll, iters=iters, seed=seed, risk=risk, **search), method="mcts")
+    pairing, q = solver.best_pairing(p, tuple(roll))
+    if pairing is None:
+        return {"pairing": None, "note": "No legal pairings; bust.", "method": "exact"}
+    return {"pairing": pairing, "q": q, "method": "exact"}
+
+def recommend_after_roll(state: GameState, roll: Roll, iters: int = 2000, seed: int = 0, risk: str = "neutral",
+                         budget: Optional[int] = DEFAULT_STATE_BUDGET, **search):
+    """Best pairing for roll together with the press/park call that follows it (for every
+    legal pairing under "options"); exact when the turn fits `budget`, else
+    mcts.recommend_after_roll, whose single search covers both decisions."""
+    p = pack(state)
+    solver = solver_for(p, risk)
+    if not _fits(p, solver, budget):
+        return dict(mcts.recommend_after_roll(state, roll, iters=iters, seed=seed, risk=risk, **search), method="mcts")
+    moves = after_roll(p, tuple(roll))
+    if not moves:
+        return {"pairing": None, "note": "No legal pairings; bust.", "method": "exact"}
+    rec = mcts.after_roll_recommendation(moves, lambda q: (solver.value(q), solver.stop_value(q), solver.roll_value(q)))
+    return dict(rec, method="exact", states=len(solver.values))
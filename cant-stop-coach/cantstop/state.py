@@ -15,13 +15,14 @@ class PlayerState:
 class TurnState:
     active_runners: Dict[int, int] = field(default_factory=dict)  # absolute step positions
     last_roll: Optional[Tuple[int, int, int, int]] = None
+    roll_pending: bool = False  # last_roll has not been played yet
 
     @property
     def free_runners(self) -> int:
         return 3 - len(self.active_runners)
 
     def copy(self) -> 'TurnState':
-        return TurnState(active_runners=dict(self.active_runners), last_roll=self.last_roll)
+        return TurnState(active_runners=dict(self.active_runners), last_roll=self.last_roll, roll_pending=self.roll_pending)
 
 @dataclass
 class GameState:
@@ -55,7 +56,8 @@ class GameState:
             "turn": {
                 "active_runners": {str(c): step for c, step in self.turn.active_runners.items()},
                 "free_runners": self.turn.free_runners,
-                "last_roll": list(self.turn.last_roll) if self.turn.last_roll else None
+                "last_roll": list(self.turn.last_roll) if self.turn.last_roll else None,
+                "roll_pending": self.turn.roll_pending,
             }
         }
 
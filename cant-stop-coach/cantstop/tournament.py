@@ -0,0 +1,279 @@
+from __future__ import annotations
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .constants import COLUMN_HEIGHTS, COLUMNS
+from .state import GameState, new_game
+from .engine import Pairing, Roll, apply_pairing, handle_bust, legal_pairings, roll_dice, stop_and_bank
+from .packed import ACTIVE, BIT, after_roll, banked, finished_columns, free_runners, pack, position, turn_gain
+from .parallel import tree_seed
+from .solver import DEFAULT_STATE_BUDGET
+from . import mcts, solver
+
+# Headless self-play for comparing coach policies over complete games.
+#
+# A policy makes one decision per roll that has a legal pairing: which pairing
+# to take and whether to roll again afterwards. Games are played with the
+# engine itself (roll_dice, legal_pairings, apply_pairing, stop_and_bank,
+# handle_bust), so every rule the app enforces holds here too. Each game gets
+# its own hash-derived seed and the lineup is rotated one seat per game, so
+# results depend only on (lineup, games, seed) and every policy moves first
+# equally often. Games run in a process pool; workers=0 plays them in-process.
+
+MAX_TURNS = 2000
+
+class Policy(ABC):
+    @abstractmethod
+    def decide(self, state: GameState, roll: Roll, rng: random.Random) -> Tuple[Pairing, bool]:
+        """(pairing to take, whether to roll again after it) for a roll with at least one legal pairing."""
+
+def _banking_wins(state: GameState, q: int) -> bool:
+    return len(state.players[state.current].claimed) + len(finished_columns(q)) >= 3
+
+def _heuristic_pairing(p: int, roll: Roll) -> Tuple[Pairing, int]:
+    # Fewest new runners, then the most progress as a share of each column's height
+    best, best_q, best_score = None, p, None
+    for pairing, q in after_roll(p, roll):
+        progress = sum((position(q, c) - position(p, c)) / COLUMN_HEIGHTS[c] for c in COLUMNS)
+        score = (free_runners(q) - free_runners(p), progress)
+        if best_score is None or score > best_score:
+            best, best_q, best_score = pairing, q, score
+    return best, best_q
+
+@dataclass
+class RandomPolicy(Policy):
+    """Any legal pairing; rolls again with probability 1 - p_stop."""
+    p_stop: float = 0.3
+
+    def decide(self, state, roll, rng):
+        return rng.choice(legal_pairings(state, roll)), rng.random() >= self.p_stop
+
+@dataclass
+class StepsPolicy(Policy):
+    """Heuristic pairing; stops once the turn has gained `steps` steps or topped a column."""
+    steps: int = 6
+
+    def decide(self, state, roll, rng):
+        pairing, q = _heuristic_pairing(pack(state), roll)
+        press = turn_gain(q) < self.steps and not finished_columns(q)
+        return pairing, press and not _banking_wins(state, q)
+
+# Column weights for Rule28Policy (2 and 12 are worth 6, 7 is worth 1)
+RULE28_WEIGHTS = {c: 1 + abs(7 - c) for c in COLUMNS}
+
+@dataclass
+class Rule28Policy(Policy):
+    """The "Rule of 28" stopping heuristic: each step scores its column's weight,
+    placing a runner scores it twice, with the usual odd/even and high/low
+    adjustments once all three runners are out; stop at `threshold`."""
+    threshold: int = 28
+
+    def decide(self, state, roll, rng):
+        p = pack(state)
+        pairing, q = _heuristic_pairing(p, roll)
+        active = [c for c in COLUMNS if (q >> ACTIVE) & BIT[c]]
+        score = sum(RULE28_WEIGHTS[c] * (position(q, c) - banked(q, c) + 1) for c in active)
+        if len(active) == 3:
+            if all(c % 2 for c in active):
+                score += 2
+            elif not any(c % 2 for c in active):
+                score -= 2
+            if all(c < 7 for c in active) or all(c > 7 for c in active):
+                score += 4
+        return pairing, score < self.threshold and not _banking_wins(state, q)
+
+@dataclass
+class MctsPolicy(Policy):
+    """The coach's MCTS alone (mcts.recommend_after_roll), on iters or a time_ms budget."""
+    iters: int = 500
+    time_ms: Optional[float] = None
+    risk: str = "neutral"
+
+    def decide(self, state, roll, rng):
+        rec = mcts.recommend_after_roll(state, roll, iters=self.iters, seed=rng.getrandbits(32), risk=self.risk,
+                                        time_ms=self.time_ms)
+        return rec["pairing"], rec["action"] == "press"
+
+@dataclass
+class SolverPolicy(Policy):
+    """The coach as served: exact within `budget` states, MCTS (iters / time_ms) beyond."""
+    risk: str = "neutral"
+    budget: Optional[int] = DEFAULT_STATE_BUDGET
+    iters: int = 500
+    time_ms: Optional[float] = None
+
+    def decide(self, state, roll, rng):
+        rec = solver.recommend_after_roll(state, roll, iters=self.iters, seed=rng.getrandbits(32), risk=self.risk,
+                                          budget=self.budget, time_ms=self.time_ms)
+        return rec["pairing"], rec["action"] == "press"
+
+POLICIES = {
+    "random": RandomPolicy,
+    "steps": StepsPolicy,
+    "rule28": Rule28Policy,
+    "mcts": MctsPolicy,
+    "solver": SolverPolicy,
+}
+
+def _parse_value(text: str) -> Any:
+    if text.lower() == "none":
+        return None
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+def make_policy(spec: str) -> Policy:
+    """A policy from "name" or "name:key=value,...", e.g. "mcts:iters=200,risk=averse"."""
+    name, _, args = spec.partition(":")
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy {name!r} (expected one of {', '.join(POLICIES)})")
+    kwargs = {}
+    for item in filter(None, args.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Bad policy argument {item!r} in {spec!r}")
+        kwargs[key.strip()] = _parse_value(value.strip())
+    return POLICIES[name](**kwargs)
+
+@dataclass
+class GameResult:
+    winner: Optional[int]         # seat, None if the game hit max_turns
+    turns: int
+    times: List[List[float]]      # seconds per decision, by seat
+
+def play_game(policies: Sequence[Policy], seed: int = 0, max_turns: int = MAX_TURNS) -> GameResult:
+    """One game with policies[i] in seat i."""
+    dice = random.Random(tree_seed(seed, 0))
+    rng = random.Random(tree_seed(seed, 1))
+    state = new_game(len(policies))
+    times: List[List[float]] = [[] for _ in policies]
+    turns = 0
+    while state.winner is None and turns < max_turns:
+        turns += 1
+        seat = state.current
+        while True:
+            roll = roll_dice(dice)
+            state.turn.last_roll = roll
+            legal = legal_pairings(state, roll)
+            if not legal:
+                handle_bust(state)
+                break
+            t0 = time.perf_counter()
+            pairing, press = policies[seat].decide(state, roll, rng)
+            times[seat].append(time.perf_counter() - t0)
+            if tuple(pairing) not in legal:
+                raise ValueError(f"{policies[seat]!r} chose illegal pairing {pairing} for {roll}")
+            apply_pairing(state, tuple(pairing))
+            if not press:
+                stop_and_bank(state)
+                break
+    return GameResult(state.winner, turns, times)
+
+def _play(job: Tuple[Tuple[Policy, ...], int, int]) -> GameResult:
+    return play_game(*job)
+
+def wilson_interval(wins: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a win rate (95% by default)."""
+    if n == 0:
+        return (0.0, 1.0)
+    phat = wins / n
+    denom = 1 + z * z / n
+    centre = (phat + z * z / (2 * n)) / denom
+    half = z * math.sqrt(phat * (1 - phat) / n + z * z / (4 * n * n)) / denom
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+def _percentile(values: List[float], q: float) -> float:
+    # Nearest rank on sorted values
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+def run_tournament(specs: Sequence[str], games: int = 1000, seed: int = 0, workers: Optional[int] = None,
+                   max_turns: int = MAX_TURNS) -> Dict[str, Any]:
+    """Play `games` games between the policies in `specs`, one seat each, rotating seats
+    every game. workers=None uses every core, 0 plays in-process."""
+    if not 2 <= len(specs) <= 4:
+        raise ValueError("A game needs 2 to 4 policies")
+    names = [spec if specs.index(spec) == i else f"{spec}#{i + 1}" for i, spec in enumerate(specs)]
+    policies = [make_policy(spec) for spec in specs]
+    n = len(policies)
+    jobs = [(tuple(policies[(s + g) % n] for s in range(n)), tree_seed(seed, g), max_turns) for g in range(games)]
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    t0 = time.perf_counter()
+    if workers > 0:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_play, jobs, chunksize=max(1, games // (workers * 8))))
+    else:
+        results = list(map(_play, jobs))
+    seconds = time.perf_counter() - t0
+
+    wins = [0] * n
+    times: List[List[float]] = [[] for _ in range(n)]
+    for g, res in enumerate(results):
+        for seat in range(n):
+            times[(seat + g) % n].extend(res.times[seat])
+        if res.winner is not None:
+            wins[(res.winner + g) % n] += 1
+    decisions = sum(len(t) for t in times)
+    report = {
+        "games": games,
+        "draws": sum(res.winner is None for res in results),
+        "workers": workers,
+        "seconds": seconds,
+        "games_per_sec": games / seconds if seconds else 0.0,
+        "decisions_per_sec": decisions / seconds if seconds else 0.0,
+        "turns_per_game": sum(res.turns for res in results) / games if games else 0.0,
+        "policies": {},
+    }
+    for i, name in enumerate(names):
+        t = sorted(times[i])
+        report["policies"][name] = {
+            "wins": wins[i],
+            "win_rate": wins[i] / games if games else 0.0,
+            "ci95": wilson_interval(wins[i], games),
+            "decisions": len(t),
+            "p50_ms": 1000 * _percentile(t, 0.50),
+            "p99_ms": 1000 * _percentile(t, 0.99),
+        }
+    return report
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{'policy':<32} {'win rate':>8}  {'95% CI':<15} {'decisions':>9} {'p50 ms':>8} {'p99 ms':>8}"]
+    for name, s in report["policies"].items():
+        lo, hi = s["ci95"]
+        lines.append(f"{name:<32} {s['win_rate']:>8.3f}  [{lo:.3f}, {hi:.3f}]  {s['decisions']:>9} "
+                     f"{s['p50_ms']:>8.2f} {s['p99_ms']:>8.2f}")
+    lines.append(f"{report['games']} games ({report['draws']} unfinished) in {report['seconds']:.1f} s on "
+                 f"{report['workers'] or 1} process(es): {report['games_per_sec']:.1f} games/s, "
+                 f"{report['decisions_per_sec']:.0f} decisions/s, {report['turns_per_game']:.1f} turns/game")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Self-play tournament between Can't Stop policies.")
+    parser.add_argument("policies", nargs="+",
+                        help=f"2-4 policy specs, name[:key=value,...] with name one of {', '.join(POLICIES)}")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: every core, 0 = in-process)")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    args = parser.parse_args(argv)
+    try:
+        report = run_tournament(args.policies, args.games, args.seed, args.workers, args.max_turns)
+    except (TypeError, ValueError) as e:
+        parser.error(str(e))
+    print(format_report(report))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
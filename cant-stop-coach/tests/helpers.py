@@ -0,0 +1,22 @@
+import random
+from cantstop.constants import COLUMN_HEIGHTS, COLUMNS
+from cantstop.state import new_game
+
+def random_state(rng: random.Random, num_players: int = 2):
+    """A mid-turn position: some columns claimed, banked progress, 0-3 active runners."""
+    state = new_game(num_players)
+    for c in COLUMNS:
+        if rng.random() < 0.15:
+            owner = rng.randrange(num_players)
+            state.claimed_by[c] = owner
+            state.players[owner].claimed.add(c)
+            state.players[owner].permanent_pos[c] = COLUMN_HEIGHTS[c]
+        else:
+            for p in state.players:
+                p.permanent_pos[c] = rng.randrange(COLUMN_HEIGHTS[c])
+    state.current = rng.randrange(num_players)
+    me = state.players[state.current]
+    open_cols = [c for c in COLUMNS if state.claimed_by[c] is None]
+    for c in rng.sample(open_cols, min(len(open_cols), rng.randrange(4))):
+        state.turn.active_runners[c] = rng.randint(me.permanent_pos[c] + 1, COLUMN_HEIGHTS[c])
+    return state
@@ -0,0 +1,44 @@
+import unittest
+from app import SEARCH_STORE, app
+from cantstop import packed
+from cantstop.solver import TurnSolver
+from cantstop.state import new_game
+
+class TestCoachEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.client.post("/api/new_game", json={"num_players": 2})
+
+    def _set_roll(self, roll):
+        with self.client.session_transaction() as sess:
+            state = sess["state"]
+            state["turn"]["last_roll"] = list(roll)
+            state["turn"]["roll_pending"] = True
+            sess["state"] = state
+
+    def test_advice_after_the_roll_is_played(self):
+        self._set_roll((3, 4, 1, 1))
+        pending = self.client.post("/api/coach/recommend", json={"iters": 100}).get_json()
+        self.assertIn(tuple(pending["pairing"]["pairing"]), [(7, 2), (4, 5)])
+        self.assertTrue(self.client.post("/api/apply_pairing", json={"pairing": [7, 2]}).get_json()["ok"])
+        data = self.client.post("/api/coach/recommend", json={"iters": 100}).get_json()
+        # The used roll is not applied again: press/park is for the board after 7 & 2
+        self.assertIsNone(data["pairing"])
+        state = new_game()
+        state.turn.active_runners.update({7: 1, 2: 1})
+        p = packed.pack(state)
+        rec = data["recommendation"]
+        self.assertEqual(rec["method"], "exact")
+        self.assertAlmostEqual(rec["q_stop"], TurnSolver().stop_value(p), places=12)
+        self.assertAlmostEqual(rec["q_press"], TurnSolver().roll_value(p), places=12)
+
+    def test_new_game_drops_the_search_tree(self):
+        self.client.post("/api/coach/recommend", json={"iters": 100})
+        with self.client.session_transaction() as sess:
+            sid = sess["search_id"]
+        self.assertIn(sid, SEARCH_STORE._sessions)
+        self.client.post("/api/new_game", json={"num_players": 2})
+        self.assertNotIn(sid, SEARCH_STORE._sessions)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import random
+import unittest
+from cantstop.cache import OddsCache
+from cantstop.odds import adv_prob_by_column, bust_prob
+from tests.helpers import random_state
+
+class TestOddsCache(unittest.TestCase):
+    def test_lru_eviction_and_counters(self):
+        cache = OddsCache(maxsize=2)
+        calls = []
+        def compute(v):
+            return lambda: calls.append(v) or v
+        self.assertEqual(cache.get_or_compute("bust", 1, compute(1)), 1)
+        self.assertEqual(cache.get_or_compute("bust", 2, compute(2)), 2)
+        self.assertEqual(cache.get_or_compute("bust", 1, compute(9)), 1)  # hit, 1 is now most recent
+        cache.get_or_compute("adv", 3, compute(3))  # evicts 2
+        cache.get_or_compute("bust", 2, compute(2))
+        self.assertEqual(calls, [1, 2, 3, 2])
+        stats = cache.stats()
+        self.assertEqual((stats["size"], stats["hits"], stats["misses"], stats["evictions"]), (2, 1, 4, 2))
+        self.assertEqual(stats["by_kind"]["adv"], {"hits": 0, "misses": 1, "hit_rate": 0.0})
+        cache.clear()
+        self.assertEqual((len(cache), cache.stats()["hits"]), (0, 0))
+
+    def test_cached_odds_match_uncached(self):
+        # Random states share keys often enough to exercise hits on both kinds
+        rng = random.Random(16)
+        cache = OddsCache(maxsize=64)
+        for _ in range(300):
+            state = random_state(rng)
+            self.assertEqual(bust_prob(state, cache), bust_prob(state, cache=None))
+            self.assertEqual(adv_prob_by_column(state, cache), adv_prob_by_column(state, cache=None))
+        self.assertGreater(cache.stats()["evictions"], 0)
+
+    def test_adv_result_is_a_copy(self):
+        cache = OddsCache()
+        state = random_state(random.Random(1))
+        adv_prob_by_column(state, cache)[7] = -1.0
+        self.assertNotEqual(adv_prob_by_column(state, cache)[7], -1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from cantstop import packed
+import random
+from cantstop.mcts import (TranspositionTable, chance_outcomes, expand_pairing, node_key, recommend_after_roll,
+                           recommend_pairing_after_roll, recommend_press_or_park)
+from cantstop.odds import ALL_ROLLS, bust_prob
+from cantstop.solver import TurnSolver
+from cantstop.state import new_game
+from tests.helpers import random_state
+
+def _two_runners():
+    state = new_game()
+    state.turn.active_runners.update({6: 2, 8: 1})
+    return state
+
+class TestTranspositions(unittest.TestCase):
+    def test_reversed_pairings_share_a_node(self):
+        # (1, 2, 1, 3) offers both (3, 4) and (4, 3), which reach the same runners
+        table = TranspositionTable()
+        p = packed.pack(new_game())
+        moves = dict(packed.after_roll(p, (1, 2, 1, 3)))
+        self.assertEqual(moves[(3, 4)], moves[(4, 3)])
+        root = table.node(node_key('pairing', p, tuple(sorted(set(moves.values())))))
+        expand_pairing(root, table)
+        self.assertEqual(len(root.children), 2)
+        self.assertEqual(len(table.nodes), 3)
+
+    def test_search_merges_duplicates(self):
+        stats = recommend_press_or_park(_two_runners(), iters=1000)["search"]
+        self.assertGreater(stats["merged"], 0)
+        self.assertEqual(stats["nodes"], stats["created"])
+
+    def test_table_size_is_bounded(self):
+        rec = recommend_press_or_park(_two_runners(), iters=1000, table_size=200)
+        self.assertLessEqual(rec["search"]["nodes"], 200)
+        self.assertGreater(rec["search"]["evicted"], 0)
+        self.assertIn(rec["action"], ("press", "park"))
+        res = recommend_pairing_after_roll(_two_runners(), (1, 2, 3, 4), iters=500, table_size=50)
+        self.assertLessEqual(res["search"]["nodes"], 50)
+
+class TestChanceOutcomes(unittest.TestCase):
+    def test_outcomes_group_rolls_by_effect(self):
+        rng = random.Random(21)
+        for _ in range(20):
+            state = random_state(rng)
+            p = packed.pack(state)
+            outcomes = chance_outcomes(p)
+            self.assertAlmostEqual(sum(prob for prob, _ in outcomes), 1.0, places=12)
+            self.assertEqual(len({options for _, options in outcomes}), len(outcomes))
+            self.assertAlmostEqual(dict((o, prob) for prob, o in outcomes).get((), 0.0), bust_prob(state, cache=None), places=12)
+        # Every roll's reachable states are one of the outcomes
+        p = packed.pack(_two_runners())
+        effects = {options for _, options in chance_outcomes(p)}
+        for roll in ALL_ROLLS[::37]:
+            self.assertIn(tuple(sorted({q for _, q in packed.after_roll(p, roll)})), effects)
+
+    def test_small_turn_converges_to_exact_value(self):
+        # Runners one step from the top of 2, 12 and 7: the whole turn fits in the tree
+        state = new_game()
+        state.players[0].permanent_pos.update({2: 1, 12: 1, 7: 10})
+        state.turn.active_runners.update({2: 2, 12: 2, 7: 11})
+        exact = TurnSolver().roll_value(packed.pack(state))
+        self.assertAlmostEqual(recommend_press_or_park(state, iters=1000)["q_press"], exact, places=9)
+
+    def test_after_roll_answers_press_or_park_per_pairing(self):
+        # One search from the pairing root; every pairing's follow-up call comes from its subtree
+        state = new_game()
+        state.players[0].permanent_pos.update({2: 1, 12: 1, 7: 10})
+        state.turn.active_runners.update({2: 2, 7: 11})
+        p = packed.pack(state)
+        solver = TurnSolver()
+        rec = recommend_after_roll(state, (1, 1, 6, 6), iters=3000)
+        self.assertEqual(rec["search"]["simulations"], 3000)
+        self.assertEqual(rec["pairing"], solver.best_pairing(p, (1, 1, 6, 6))[0])
+        for opt in rec["options"]:
+            q = packed.apply_pairing(p, opt["pairing"])
+            self.assertAlmostEqual(opt["q_stop"], solver.stop_value(q), places=9)
+            self.assertEqual(opt["p_bust"], bust_prob(packed.to_game_state(q, state), cache=None))
+        # The chosen pairing's subtree gets the visits, so its continuation is the one that converges
+        q = packed.apply_pairing(p, rec["pairing"])
+        self.assertAlmostEqual(rec["q_press"], solver.roll_value(q), places=9)
+        self.assertEqual(rec["action"], "press" if rec["q_press"] > rec["q_stop"] else "park")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import random
+import unittest
+from cantstop.odds import PAIRING_TABLE, ROLL_TABLE, adv_prob_by_column, adv_prob_by_column_bruteforce, bust_prob, bust_prob_bruteforce
+from cantstop.state import new_game
+from tests.helpers import random_state
+
+class TestRollTable(unittest.TestCase):
+    def test_multisets_cover_all_rolls(self):
+        self.assertEqual(len(ROLL_TABLE), 126)
+        self.assertEqual(sum(w for _, w, _, _ in ROLL_TABLE), 1296)
+        self.assertEqual(sum(w for w, _ in PAIRING_TABLE), 1296)
+
+class TestBustProb(unittest.TestCase):
+    def test_matches_bruteforce_on_random_states(self):
+        rng = random.Random(15)
+        for _ in range(300):
+            state = random_state(rng)
+            self.assertAlmostEqual(bust_prob(state), bust_prob_bruteforce(state), places=12)
+
+    def test_fresh_turn_never_busts(self):
+        self.assertEqual(bust_prob(new_game()), 0.0)
+
+    def test_classic_six_seven_eight(self):
+        state = new_game()
+        state.turn.active_runners.update({6: 1, 7: 1, 8: 1})
+        # The well-known 92% success rate: 104 of 1296 rolls miss 6, 7 and 8
+        self.assertAlmostEqual(bust_prob(state), 104 / 1296, places=12)
+
+class TestAdvProb(unittest.TestCase):
+    def test_matches_bruteforce_on_random_states(self):
+        rng = random.Random(17)
+        for _ in range(60):
+            state = random_state(rng)
+            self.assertEqual(adv_prob_by_column(state, cache=None), adv_prob_by_column_bruteforce(state))
+
+    def test_last_free_runner(self):
+        # With one runner left, a pairing of two new sums only starts the first
+        state = new_game()
+        state.turn.active_runners.update({6: 1, 7: 1})
+        self.assertEqual(adv_prob_by_column(state, cache=None), adv_prob_by_column_bruteforce(state))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import random
+import unittest
+from cantstop import packed
+from cantstop.engine import (apply_pairing, compute_turn_gain, finished_columns_this_turn, legal_pairings,
+                             roll_dice, stop_and_bank)
+from cantstop.mcts import recommend_pairing_after_roll, recommend_press_or_park
+from cantstop.odds import playable_mask
+from tests.helpers import random_state
+
+def _same_turn(test, a, b):
+    # Everything a PackedTurn records: the mover's positions and claims, runners, closed columns
+    test.assertEqual(a.players[a.current].permanent_pos, b.players[b.current].permanent_pos)
+    test.assertEqual(a.players[a.current].claimed, b.players[b.current].claimed)
+    test.assertEqual(a.turn.active_runners, b.turn.active_runners)
+    test.assertEqual(a.claimed_by, b.claimed_by)
+
+class TestPackedTurn(unittest.TestCase):
+    def test_round_trip(self):
+        rng = random.Random(18)
+        for _ in range(100):
+            state = random_state(rng)
+            p = packed.pack(state)
+            _same_turn(self, packed.to_game_state(p, state), state)
+            self.assertEqual(packed.playable_mask(p), playable_mask(state))
+            self.assertEqual(packed.free_runners(p), state.turn.free_runners)
+            self.assertEqual(packed.turn_gain(p), compute_turn_gain(state))
+            self.assertEqual(packed.finished_columns(p), sorted(finished_columns_this_turn(state)))
+
+    def test_transitions_match_engine(self):
+        rng = random.Random(19)
+        for _ in range(300):
+            state = random_state(rng)
+            roll = roll_dice(rng)
+            p = packed.pack(state)
+            moves = packed.after_roll(p, roll)
+            self.assertEqual([m for m, _ in moves], legal_pairings(state, roll))
+            for pairing, q in moves:
+                s2 = state.copy()
+                apply_pairing(s2, pairing)
+                self.assertEqual(q, packed.pack(s2))
+                stop_and_bank(s2)
+                # stop_and_bank hands the turn over; compare from the mover's side
+                s2.current = state.current
+                s2.winner = None
+                _same_turn(self, packed.to_game_state(packed.stop(q), state), s2)
+
+    def test_search_runs_on_packed_nodes(self):
+        state = random_state(random.Random(3))
+        self.assertIn(recommend_press_or_park(state, iters=200)["action"], ("press", "park"))
+        res = recommend_pairing_after_roll(state, (1, 2, 3, 4), iters=200)
+        self.assertTrue(res["pairing"] is None or tuple(res["pairing"]) in legal_pairings(state, (1, 2, 3, 4)))
+
+if __name__ == "__main__":
+    unittest.main()
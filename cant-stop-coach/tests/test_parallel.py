@@ -0,0 +1,58 @@
+import threading
+import time
+import unittest
+from cantstop import mcts, packed
+from cantstop.mcts import node_key
+from cantstop.parallel import SearchPool, get_pool, merge_root_stats, parallel_search, tree_seed
+from cantstop.state import new_game
+
+def _root():
+    state = new_game()
+    state.turn.active_runners.update({6: 2, 8: 1})
+    return node_key('decision', packed.pack(state))
+
+class TestRootParallel(unittest.TestCase):
+    def test_merge_weights_by_visits(self):
+        merged = merge_root_stats([{('ROLL',): (30, 6.0), ('STOP',): (10, 3.0)}, {('ROLL',): (10, 2.0), ('STOP',): (0, 0.0)}])
+        self.assertEqual(merged[('ROLL',)], (40, 5.0))
+        self.assertEqual(merged[('STOP',)], (10, 3.0))
+
+    def test_trees_are_independent_searches(self):
+        stats, counters = SearchPool(workers=0).search(_root(), iters=600, seed=5, trees=3)
+        parts = [mcts.search(_root(), iters=200, seed=tree_seed(5, i)) for i in range(3)]
+        self.assertEqual(stats, merge_root_stats([p[0] for p in parts]))
+        self.assertEqual((counters["simulations"], counters["trees"]), (600, 3))
+
+    def test_process_pool_matches_in_process(self):
+        pool = SearchPool(workers=2)
+        try:
+            self.assertEqual(pool.search(_root(), iters=400, seed=1), SearchPool(workers=0).search(_root(), iters=400, seed=1, trees=2))
+        finally:
+            pool.close()
+
+    def test_time_budget(self):
+        start = time.perf_counter()
+        _, counters = SearchPool(workers=0).search(_root(), time_ms=100, trees=1)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertGreater(counters["simulations"], 0)
+
+    def test_get_pool_is_one_pool_across_threads(self):
+        pools = []
+        threads = [threading.Thread(target=lambda: pools.append(get_pool(0))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len({id(p) for p in pools}), 1)
+
+class TestTreeParallel(unittest.TestCase):
+    def test_virtual_loss_threads_share_one_tree(self):
+        stats, counters = parallel_search(_root(), iters=800, workers=4, mode="tree")
+        self.assertEqual((counters["simulations"], counters["threads"]), (800, 4))
+        # Every simulation passes through exactly one root action
+        self.assertEqual(sum(n for n, _ in stats.values()), 800)
+        with self.assertRaises(ValueError):
+            parallel_search(_root(), iters=10, mode="leaf")
+
+if __name__ == "__main__":
+    unittest.main()
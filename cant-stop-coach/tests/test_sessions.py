@@ -0,0 +1,83 @@
+import threading
+import unittest
+from cantstop.engine import apply_pairing, stop_and_bank
+from cantstop.mcts import recommend_pairing_after_roll, recommend_press_or_park
+from cantstop.sessions import SearchStore
+from cantstop.state import new_game
+
+def _two_runners():
+    state = new_game()
+    state.turn.active_runners.update({6: 2, 8: 1})
+    return state
+
+def _table(store, session_id, state, risk="neutral"):
+    with store.checkout(session_id, state, risk) as table:
+        return table
+
+class TestSearchStore(unittest.TestCase):
+    def test_tree_is_reused_down_the_turn(self):
+        store = SearchStore()
+        state = _two_runners()
+        with store.checkout("a", state) as table:
+            first = recommend_press_or_park(state, iters=1500, table=table)["search"]
+        self.assertEqual((first["reused"], first["simulations"]), (0, 1500))
+        # Roll 3-3-4-4 and take (6, 8): a position the first search has certainly been through
+        roll = (3, 3, 4, 4)
+        with store.checkout("a", state) as t:
+            pick = recommend_pairing_after_roll(state, roll, iters=200, table=t)
+        self.assertGreater(pick["search"]["reused"], 0)
+        apply_pairing(state, pick["pairing"])
+        with store.checkout("a", state) as t:
+            self.assertIs(t, table)
+            again = recommend_press_or_park(state, iters=200, table=t)["search"]
+        self.assertGreater(again["reused"], 0)
+        self.assertGreater(again["nodes"], first["nodes"])
+
+    def test_new_turn_or_risk_gets_a_new_tree(self):
+        store = SearchStore()
+        state = _two_runners()
+        table = _table(store, "a", state)
+        self.assertIsNot(_table(store, "a", state, risk="averse"), table)
+        stop_and_bank(state)
+        self.assertIsNot(_table(store, "a", state, risk="averse"), table)
+
+    def test_checkout_is_exclusive_per_session(self):
+        store = SearchStore()
+        state = _two_runners()
+        entered = threading.Event()
+
+        def second():
+            with store.checkout("a", state):
+                entered.set()
+
+        with store.checkout("a", state):
+            t = threading.Thread(target=second)
+            t.start()
+            self.assertFalse(entered.wait(0.1))
+            # Other sessions are not held up
+            _table(store, "b", state)
+        t.join(5)
+        self.assertTrue(entered.is_set())
+
+    def test_eviction_by_age_and_nodes(self):
+        store = SearchStore(max_age=0.0)
+        _table(store, "old", new_game())
+        _table(store, "new", new_game())
+        self.assertEqual((store.stats()["sessions"], store.evicted), (1, 1))
+        store = SearchStore(max_nodes=100)
+        state = _two_runners()
+        with store.checkout("a", state) as table:
+            recommend_press_or_park(state, iters=300, table=table)
+        with store.checkout("b", state) as table:
+            recommend_press_or_park(state, iters=300, table=table)
+        _table(store, "b", state)
+        self.assertEqual(store.stats()["sessions"], 1)
+        # The cap also holds after a search grows a table
+        store = SearchStore(max_nodes=100)
+        _table(store, "idle", state)
+        with store.checkout("busy", state) as table:
+            recommend_press_or_park(state, iters=300, table=table)
+        self.assertEqual(store.stats()["sessions"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import random
+import unittest
+from cantstop import packed
+from cantstop.engine import apply_pairing, compute_turn_gain, finished_columns_this_turn, legal_pairings
+from cantstop.mcts import utility
+from cantstop.odds import ALL_ROLLS
+from cantstop.solver import TurnSolver, recommend_after_roll, recommend_pairing_after_roll, recommend_press_or_park, state_space_bound
+from cantstop.state import new_game
+from tests.helpers import random_state
+
+def _reference_value(state, risk, memo):
+    # Plain expectimax through the engine over all 1296 ordered rolls
+    key = (tuple(sorted(state.turn.active_runners.items())), risk)
+    if key not in memo:
+        stop = utility(compute_turn_gain(state), finished_columns_this_turn(state), risk)
+        total = 0.0
+        for roll in ALL_ROLLS:
+            best = 0.0
+            for p in legal_pairings(state, roll):
+                s2 = state.copy()
+                apply_pairing(s2, p)
+                best = max(best, _reference_value(s2, risk, memo))
+            total += best
+        memo[key] = max(stop, total / 1296.0)
+    return memo[key]
+
+def _near_the_top():
+    state = new_game()
+    state.players[0].permanent_pos.update({2: 1, 12: 1, 7: 10})
+    state.turn.active_runners.update({2: 2, 12: 2, 7: 11})
+    return state
+
+class TestTurnSolver(unittest.TestCase):
+    def test_matches_engine_expectimax(self):
+        state = _near_the_top()
+        p = packed.pack(state)
+        for risk in ("averse", "neutral", "seeking"):
+            ref = _reference_value(state, risk, {})
+            self.assertAlmostEqual(TurnSolver(risk).value(p), ref, delta=1e-12 * ref)
+
+    def test_bound_covers_solved_states(self):
+        rng = random.Random(19)
+        for _ in range(5):
+            state = random_state(rng)
+            while state.turn.free_runners > 1:
+                state = random_state(rng)
+            p = packed.pack(state)
+            solver = TurnSolver()
+            solver.value(p)
+            self.assertLessEqual(len(solver.values), state_space_bound(p))
+
+    def test_recommendations(self):
+        state = _near_the_top()
+        rec = recommend_press_or_park(state)
+        self.assertEqual(rec["method"], "exact")
+        self.assertEqual(rec["action"], "press" if rec["q_press"] > rec["q_stop"] else "park")
+        self.assertEqual(recommend_press_or_park(new_game(), iters=100, budget=0)["method"], "mcts")
+        res = recommend_pairing_after_roll(state, (1, 1, 6, 6))
+        self.assertIn(res["pairing"], legal_pairings(state, (1, 1, 6, 6)))
+        self.assertIsNone(recommend_pairing_after_roll(state, (2, 2, 2, 2))["pairing"])
+
+    def test_after_roll_continues_each_pairing(self):
+        state = new_game()
+        state.turn.active_runners.update({6: 2, 8: 1})
+        p = packed.pack(state)
+        solver = TurnSolver()
+        rec = recommend_after_roll(state, (1, 2, 3, 4))
+        self.assertEqual(rec["method"], "exact")
+        self.assertEqual(rec["pairing"], solver.best_pairing(p, (1, 2, 3, 4))[0])
+        for opt in rec["options"]:
+            q = packed.apply_pairing(p, opt["pairing"])
+            self.assertAlmostEqual(opt["q_press"], solver.roll_value(q), places=12)
+            self.assertAlmostEqual(opt["q_stop"], solver.stop_value(q), places=12)
+            self.assertEqual(opt["q"], max(opt["q_stop"], opt["q_press"]))
+        self.assertIsNone(recommend_after_roll(_near_the_top(), (2, 2, 2, 2))["pairing"])
+
+if __name__ == "__main__":
+    unittest.main()
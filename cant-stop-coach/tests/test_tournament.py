@@ -0,0 +1,46 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from cantstop.tournament import (MctsPolicy, Policy, RandomPolicy, Rule28Policy, StepsPolicy, main, make_policy, play_game,
+                                 run_tournament, wilson_interval)
+
+class TestTournament(unittest.TestCase):
+    def test_make_policy(self):
+        self.assertEqual(make_policy("mcts:iters=200,risk=averse"), MctsPolicy(iters=200, risk="averse"))
+        self.assertEqual(make_policy("solver:budget=none").budget, None)
+        self.assertEqual(make_policy("random:p_stop=0.5"), RandomPolicy(p_stop=0.5))
+        with self.assertRaises(ValueError):
+            make_policy("greedy")
+        with self.assertRaises(ValueError):
+            make_policy("steps:6")
+        with self.assertRaises(TypeError):
+            Policy()
+
+    def test_games_finish_under_the_rules(self):
+        for seed in range(5):
+            res = play_game([StepsPolicy(), Rule28Policy(), RandomPolicy()], seed=seed)
+            self.assertIn(res.winner, (0, 1, 2))
+            self.assertTrue(all(res.times))
+        res = play_game([MctsPolicy(iters=20), RandomPolicy()], seed=1)
+        self.assertIn(res.winner, (0, 1))
+
+    def test_results_depend_only_on_seed(self):
+        a = run_tournament(["steps", "rule28", "steps:steps=10"], games=30, seed=4, workers=0)
+        b = run_tournament(["steps", "rule28", "steps:steps=10"], games=30, seed=4, workers=2)
+        self.assertEqual({k: v["wins"] for k, v in a["policies"].items()}, {k: v["wins"] for k, v in b["policies"].items()})
+        self.assertEqual(sum(v["wins"] for v in a["policies"].values()) + a["draws"], 30)
+        self.assertEqual(run_tournament(["steps", "steps"], games=4, workers=0)["policies"].keys(), {"steps", "steps#2"})
+
+    def test_main_exit_status(self):
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(main(["steps", "rule28", "--games", "4", "--workers", "0"]), 0)
+        self.assertIn("games/s", out.getvalue())
+
+    def test_wilson_interval(self):
+        lo, hi = wilson_interval(50, 100)
+        self.assertAlmostEqual(lo, 0.4038, places=4)
+        self.assertAlmostEqual(hi, 0.5962, places=4)
+        self.assertEqual(wilson_interval(0, 10)[0], 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,61 @@
 
 from __future__ import annotations
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+import json
+import math
+import os
 import random
+import threading
+import uuid
 
-from trainer.cards import card_from_str, card_to_str, full_deck, RANK_CHARS, SUIT_CHARS
-from trainer.equity import estimate_equity
+from trainer.cards import card_from_str, card_to_str, card_id, card_from_id, canonicalize, class_label, class_representative, N_CLASSES, RANK_CHARS, SUIT_CHARS
+from trainer.equity import estimate_equity, estimate_equity_adaptive, iter_equity
+from dataclasses import asdict
 from trainer.odds import is_pocket_pair, is_suited, rank_gap, flop_set_prob_pocket_pair, flop_pair_or_better_unpaired, flop_flush_stats_suited, river_flush_prob_two_suited, approx_oesd_prob_on_flop
 from trainer.recommend import recommend_action
+from trainer.preflop_table import open_table
+from trainer.draws import open_draw_table
+from trainer.cache import LRUCache
+from trainer.exact import DEFAULT_MAX_OUTCOMES, can_enumerate, enumerate_equity
+from trainer.ranges import parse_range
+from trainer.range_equity import range_equity
+from trainer.variance import estimate_equity_vr
+from trainer.batch import batch_equity
+from trainer.parallel import get_pool
 
 app = Flask(__name__)
+# Heads-up spots with at most this many (runout, villain hand) outcomes are enumerated exactly
+app.config.setdefault('EXACT_MAX_OUTCOMES', DEFAULT_MAX_OUTCOMES)
+
+def _vectorized_engine():
+    # numpy is optional; only needed when a request asks for this engine
+    from trainer.vectorized import estimate_equity_vectorized
+    return estimate_equity_vectorized
+
+ENGINES = {
+    'scalar': lambda: estimate_equity,
+    'vectorized': _vectorized_engine,
+    # EQUITY_POOL is started with the app, below
+    'parallel': lambda: EQUITY_POOL.estimate,
+}
+DEFAULT_ITERS = {'scalar': 3000, 'vectorized': 300000, 'parallel': 1000000}
+ADAPTIVE_MAX_ITERS = 200000
+
+# Memory-mapped once at startup; None when data/preflop_equity.bin is missing or invalid
+# (regenerate with `python -m trainer.preflop_table build`).
+EQUITY_TABLE = open_table()
+
+# Exact flop/turn/river draw odds per hand class; None falls back to the odds.py approximations
+# (regenerate with `python -m trainer.draws build`).
+DRAW_TABLE = open_draw_table()
+
+# Worker processes for engine="parallel", started with the app and reused by every request
+# (EQUITY_WORKERS: config or environment, default all cores, 0 = in-process)
+app.config.setdefault('EQUITY_WORKERS', int(os.environ['EQUITY_WORKERS']) if os.environ.get('EQUITY_WORKERS') else None)
+EQUITY_POOL = get_pool(app.config['EQUITY_WORKERS']).start()
+
+# Live simulations keyed by suit-canonical hand, so repeated drills are free
+EQUITY_CACHE = LRUCache(maxsize=4096)
 
 @app.route('/')
 def index():
@@ -23,6 +70,21 @@ def parse_hand(a_rank, a_suit, b_rank, b_suit):
         raise ValueError("Duplicate card")
     return [c1, c2]
 
+def parse_board(raw):
+    # Accepts ["Qs", "7s", "2d"] or "Qs7s2d"
+    if isinstance(raw, str):
+        compact = raw.replace(' ', '').replace(',', '')
+        raw = [compact[i:i+2] for i in range(0, len(compact), 2)]
+    try:
+        board = [card_from_str(c) for c in raw]
+    except (KeyError, IndexError, ValueError, AttributeError):
+        raise ValueError(f"Invalid board {raw!r}")
+    if len(board) not in (0, 3, 4, 5):
+        raise ValueError("Board must have 0, 3, 4 or 5 cards")
+    if len(set(board)) != len(board):
+        raise ValueError("Duplicate card")
+    return board
+
 @app.post('/api/evaluate')
 def api_evaluate():
     data = request.get_json(force=True) or {}
@@ -31,15 +93,86 @@ def api_evaluate():
     b_rank = data.get('b_rank', 'K')
     b_suit = data.get('b_suit', 'h')
     n_opps = int(data.get('opponents', 1))
-    iters = int(data.get('iters', 3000))
+    engine = data.get('engine', 'scalar')
+    if engine not in ENGINES:
+        return jsonify({'ok': False, 'error': f"Unknown engine {engine!r}; expected one of {sorted(ENGINES)}"}), 400
+    # The vectorized engine is ~100x faster per deal, so its default budget is 100x larger
+    iters = int(data.get('iters', DEFAULT_ITERS[engine]))
     seed = int(data.get('seed', 0))
 
+    exact_limit = int(data.get('exact_limit', app.config['EXACT_MAX_OUTCOMES']))
+    # Adaptive stopping: iters becomes the budget cap
+    target_se = float(data['target_se']) if data.get('target_se') is not None else None
+    confidence = float(data['confidence']) if data.get('confidence') is not None else None
+    adaptive = target_se is not None or confidence is not None
+    if adaptive and 'iters' not in data:
+        iters = ADAPTIVE_MAX_ITERS
+    if confidence is not None and not 0.0 < confidence < 1.0:
+        return jsonify({'ok': False, 'error': 'confidence must be between 0 and 1'}), 400
+    # A standard error needs two samples
+    if adaptive and iters < 2:
+        return jsonify({'ok': False, 'error': 'iters must be at least 2 with target_se or confidence'}), 400
+    # 'reduced' = stratified boards + control variates (trainer.variance), preflop only
+    estimator = data.get('estimator', 'plain')
+    if estimator not in ('plain', 'reduced'):
+        return jsonify({'ok': False, 'error': f"Unknown estimator {estimator!r}; expected 'plain' or 'reduced'"}), 400
+    reduced = estimator == 'reduced'
+
     try:
         hole = parse_hand(a_rank, a_suit, b_rank, b_suit)
+        board = parse_board(data.get('board', []))
+        if set(hole) & set(board):
+            raise ValueError("Duplicate card")
+        if reduced and board:
+            raise ValueError("The reduced estimator only supports preflop spots")
     except ValueError as e:
         return jsonify({'ok': False, 'error': str(e)}), 400
 
-    eq = estimate_equity(hole, n_opponents=n_opps, iters=iters, seed=seed)
+    hole_ids = [card_id(c) for c in hole]
+    board_ids = [card_id(c) for c in board]
+    # Work on the canonical hand itself so every isomorphic hand gets the same answer
+    canon, canon_board = canonicalize(hole_ids, board_ids)
+    exact = None
+    adaptive_info = None
+    reduced_info = None
+    # Default preflop settings are answered from the precomputed table; an explicit
+    # seed or iteration budget asks for a live simulation.
+    if not board and not adaptive and not reduced and EQUITY_TABLE is not None and EQUITY_TABLE.covers(n_opps) and 'seed' not in data and iters == DEFAULT_ITERS[engine]:
+        eq = EQUITY_TABLE.lookup(hole_ids, n_opps)
+        iters = EQUITY_TABLE.iters
+        source = 'table'
+    elif can_enumerate(len(board), n_opps, exact_limit):
+        exact = EQUITY_CACHE.get_or_compute((canon, canon_board, 'exact'), lambda: enumerate_equity(canon, canon_board))
+        eq = exact['equity']
+        iters = exact['outcomes']
+        source = 'exact'
+    elif reduced:
+        key = (canon, n_opps, iters, seed, 'reduced')
+        est = EQUITY_CACHE.get_or_compute(key, lambda: estimate_equity_vr(list(canon), n_opponents=n_opps, iters=iters, seed=seed))
+        reduced_info = asdict(est)
+        eq = est.equity
+        iters = est.deals
+        source = 'reduced'
+    elif adaptive:
+        key = (canon, canon_board, n_opps, iters, seed, 'adaptive', target_se, confidence)
+        est = EQUITY_CACHE.get_or_compute(key, lambda: estimate_equity_adaptive(
+            list(canon), n_opponents=n_opps, max_iters=iters, seed=seed, board=canon_board,
+            target_se=target_se, confidence=confidence))
+        adaptive_info = asdict(est)
+        # JSON has no Infinity; as in /api/evaluate_stream, an unknown stderr is null
+        if not math.isfinite(est.stderr):
+            adaptive_info['stderr'] = None
+        eq = est.equity
+        iters = est.iters
+        source = 'adaptive'
+    else:
+        try:
+            equity_fn = ENGINES[engine]()
+        except ImportError:
+            return jsonify({'ok': False, 'error': 'The vectorized engine requires numpy (pip install numpy)'}), 400
+        key = (canon, canon_board, n_opps, iters, seed, engine)
+        eq = EQUITY_CACHE.get_or_compute(key, lambda: equity_fn(list(canon), n_opponents=n_opps, iters=iters, seed=seed, board=canon_board))
+        source = 'simulation'
 
     # combinatorial odds
     pp = is_pocket_pair(*hole)
@@ -59,25 +192,192 @@ def api_evaluate():
         odds['flush_draw'] = 0.0
         odds['backdoor_flush'] = 0.0
         odds['flush_by_river'] = 0.0
-    # OESD approx if connectors
-    odds['approx_oesd_flop'] = approx_oesd_prob_on_flop(*hole)
+    draws = DRAW_TABLE.row(hole_ids) if DRAW_TABLE is not None else None
+    if draws is not None:
+        odds['oesd_flop'] = draws['flop_oesd']
+        odds['gutshot_flop'] = draws['flop_gutshot']
+    else:
+        # OESD approx if connectors
+        odds['approx_oesd_flop'] = approx_oesd_prob_on_flop(*hole)
 
     rec = recommend_action(eq, n_opponents=n_opps)
 
     return jsonify({
         'ok': True,
         'equity': eq,
+        'engine': engine,
+        'iters': iters,
+        'source': source,
+        'board': [card_to_str(c) for c in board],
+        'exact': exact,
+        'adaptive': adaptive_info,
+        'reduced': reduced_info,
         'recommendation': rec,
-        'odds': odds
+        'odds': odds,
+        'draws': draws
     })
 
+STREAM_MAX_ITERS = 5_000_000
+# Cancel flags for running /api/evaluate_stream responses, by stream id
+STREAMS = {}
+STREAMS_LOCK = threading.Lock()
+
+def sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@app.route('/api/evaluate_stream', methods=['GET', 'POST'])
+def api_evaluate_stream():
+    # Server-Sent Events: 'start' (with the stream id), a 'progress' event every `every`
+    # iterations, then 'done' or 'cancelled'. GET takes query parameters so EventSource works.
+    data = request.get_json(silent=True) if request.method == 'POST' else None
+    data = data or request.args.to_dict()
+    try:
+        hole = parse_hand(data.get('a_rank', 'A'), data.get('a_suit', 's'), data.get('b_rank', 'K'), data.get('b_suit', 'h'))
+        board = parse_board(data.get('board', []))
+        if set(hole) & set(board):
+            raise ValueError("Duplicate card")
+        n_opps = int(data.get('opponents', 1))
+        iters = int(data.get('iters', ADAPTIVE_MAX_ITERS))
+        every = int(data.get('every', 5000))
+        seed = int(data.get('seed', 0))
+        if not 1 <= iters <= STREAM_MAX_ITERS:
+            raise ValueError(f"iters must be between 1 and {STREAM_MAX_ITERS}")
+        if every < 100:
+            raise ValueError("every must be at least 100")
+    except (KeyError, IndexError, ValueError) as e:
+        return jsonify({'ok': False, 'error': str(e)}), 400
+
+    hole_ids = [card_id(c) for c in hole]
+    board_ids = [card_id(c) for c in board]
+    stream_id = uuid.uuid4().hex
+    cancel = threading.Event()
+    with STREAMS_LOCK:
+        STREAMS[stream_id] = cancel
+
+    def generate():
+        updates = iter_equity(hole_ids, n_opponents=n_opps, iters=iters, seed=seed, board=board_ids, every=every)
+        try:
+            yield sse('start', {'stream_id': stream_id, 'iters': iters, 'every': every})
+            for p in updates:
+                update = {'iters': p.iters, 'equity': p.equity, 'stderr': p.stderr if math.isfinite(p.stderr) else None, 'done': p.done}
+                if p.done:
+                    update['recommendation'] = recommend_action(p.equity, n_opponents=n_opps)
+                yield sse('done' if p.done else 'progress', update)
+                # Checked before asking for the next step, so a cancel wastes no sampling
+                if cancel.is_set() and not p.done:
+                    yield sse('cancelled', {'iters': p.iters})
+                    return
+        finally:
+            # Runs on completion, on cancel and when the client disconnects (the server
+            # closes this generator), so no sampling continues after the stream ends
+            updates.close()
+            with STREAMS_LOCK:
+                STREAMS.pop(stream_id, None)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.post('/api/evaluate_stream/<stream_id>/cancel')
+def api_cancel_stream(stream_id):
+    with STREAMS_LOCK:
+        cancel = STREAMS.get(stream_id)
+    if cancel is None:
+        return jsonify({'ok': False, 'error': 'No such stream'}), 404
+    cancel.set()
+    return jsonify({'ok': True})
+
+BATCH_MAX_HANDS = 1000
+CLASS_BY_LABEL = {class_label(i): i for i in range(N_CLASSES)}
+
+def parse_batch_hand(token):
+    # "AsKh" (specific cards) or a class label such as "AKs", "T9o", "77"
+    token = str(token).strip()
+    label = token[:2].upper() + token[2:].lower()
+    if label in CLASS_BY_LABEL:
+        return list(class_representative(CLASS_BY_LABEL[label]))
+    if len(token) != 4:
+        raise ValueError(f"Invalid hand {token!r}")
+    try:
+        hole = parse_hand(token[0], token[1], token[2], token[3])
+    except (KeyError, IndexError, ValueError):
+        raise ValueError(f"Invalid hand {token!r}")
+    return [card_id(c) for c in hole]
+
+@app.post('/api/evaluate_batch')
+def api_evaluate_batch():
+    # Streams one NDJSON line per hand, in request order, then a closing summary line.
+    # Every hand is scored against the same pool of deals (common random numbers).
+    data = request.get_json(force=True) or {}
+    hands = data.get('hands') or []
+    default_opps = int(data.get('opponents', 1))
+    try:
+        iters = int(data.get('iters', DEFAULT_ITERS['scalar']))
+        seed = int(data.get('seed', 0))
+        # Every hand shares the pool of `iters` deals; a standard error needs two
+        if not 2 <= iters <= STREAM_MAX_ITERS:
+            raise ValueError(f"iters must be between 2 and {STREAM_MAX_ITERS}")
+        if not isinstance(hands, list) or not hands:
+            raise ValueError("hands must be a non-empty list")
+        if len(hands) > BATCH_MAX_HANDS:
+            raise ValueError(f"At most {BATCH_MAX_HANDS} hands per batch")
+        spots = []
+        for item in hands:
+            # Either "AKs" or {"hand": "AKs", "opponents": 3}
+            token, n_opps = (item.get('hand', ''), int(item.get('opponents', default_opps))) if isinstance(item, dict) else (item, default_opps)
+            if not 1 <= n_opps <= 9:
+                raise ValueError("opponents must be between 1 and 9")
+            spots.append((token, parse_batch_hand(token), n_opps))
+    except ValueError as e:
+        return jsonify({'ok': False, 'error': str(e)}), 400
+
+    def generate():
+        results = batch_equity([(hole, n) for _, hole, n in spots], iters=iters, seed=seed)
+        for i, ((token, _, n_opps), (eq, se)) in enumerate(zip(spots, results)):
+            yield json.dumps({
+                'index': i,
+                'hand': token,
+                'opponents': n_opps,
+                'equity': eq,
+                'stderr': se,
+                'recommendation': recommend_action(eq, n_opponents=n_opps),
+            }) + '\n'
+        yield json.dumps({'done': True, 'count': len(spots), 'iters': iters, 'seed': seed}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+RANGE_MAX_ITERS = 1_000_000
+
+@app.post('/api/range_equity')
+def api_range_equity():
+    data = request.get_json(force=True) or {}
+    try:
+        iters = int(data.get('iters', 20000))
+        seed = int(data.get('seed', 0))
+        if not 1 <= iters <= RANGE_MAX_ITERS:
+            raise ValueError(f"iters must be between 1 and {RANGE_MAX_ITERS}")
+        hero = parse_range(data.get('hero', ''))
+        villain = parse_range(data.get('villain', ''))
+        board = parse_board(data.get('board', []))
+        if not hero or not villain:
+            raise ValueError("Both hero and villain ranges are required")
+        res = range_equity(hero, villain, board=[card_id(c) for c in board], iters=iters, seed=seed)
+    except ValueError as e:
+        return jsonify({'ok': False, 'error': str(e)}), 400
+    return jsonify(dict(res, ok=True, board=[card_to_str(c) for c in board]))
+
+@app.get('/api/stats')
+def api_stats():
+    table = None
+    if EQUITY_TABLE is not None:
+        table = {'path': EQUITY_TABLE.path, 'iters': EQUITY_TABLE.iters, 'max_opponents': EQUITY_TABLE.max_opponents, 'crc32': f"{EQUITY_TABLE.crc:08x}"}
+    draw_table = {'path': DRAW_TABLE.path, 'fields': DRAW_TABLE.fields} if DRAW_TABLE is not None else None
+    return jsonify({'ok': True, 'equity_cache': EQUITY_CACHE.stats(), 'equity_table': table, 'draw_table': draw_table})
+
 @app.post('/api/random_hand')
 def api_random_hand():
-    deck = full_deck()
     rng = random.Random()
-    a = deck.pop(rng.randrange(len(deck)))
-    b = deck.pop(rng.randrange(len(deck)))
-    return jsonify({'a': card_to_str(a), 'b': card_to_str(b)})
+    a, b = rng.sample(range(52), 2)
+    return jsonify({'a': card_to_str(card_from_id(a)), 'b': card_to_str(card_from_id(b))})
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,37 @@
+import json
+import unittest
+from app import RANGE_MAX_ITERS, STREAM_MAX_ITERS, app
+
+class TestInputValidation(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def assertRejected(self, url, payload):
+        res = self.client.post(url, json=payload)
+        self.assertEqual(res.status_code, 400, payload)
+        self.assertFalse(res.get_json()["ok"])
+
+    def test_range_equity_iters(self):
+        for iters in (0, -5, RANGE_MAX_ITERS + 1, "lots"):
+            self.assertRejected("/api/range_equity", {"hero": "AA", "villain": "KK", "iters": iters})
+        res = self.client.post("/api/range_equity", json={"hero": "AA", "villain": "KK", "iters": 2000})
+        self.assertEqual(res.status_code, 200)
+
+    def test_adaptive_needs_two_samples(self):
+        for iters in (0, 1):
+            self.assertRejected("/api/evaluate", {"iters": iters, "target_se": 0.01})
+            self.assertRejected("/api/evaluate", {"iters": iters, "confidence": 0.9})
+        res = self.client.post("/api/evaluate", json={"iters": 2, "target_se": 0.01})
+        self.assertEqual(res.status_code, 200)
+        # Strict JSON: no Infinity/NaN
+        json.loads(res.get_data(as_text=True), parse_constant=lambda c: self.fail(f"non-JSON constant {c}"))
+
+    def test_batch_iters(self):
+        for iters in (0, 1, STREAM_MAX_ITERS + 1, "lots"):
+            self.assertRejected("/api/evaluate_batch", {"hands": ["AKs"], "iters": iters})
+        res = self.client.post("/api/evaluate_batch", json={"hands": ["AKs"], "iters": 2000})
+        self.assertEqual(res.status_code, 200)
+        self.assertGreater(json.loads(res.get_data(as_text=True).splitlines()[0])["equity"], 0.5)
+
+if __name__ == "__main__":
+    unittest.main()
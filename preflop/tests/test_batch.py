@@ -0,0 +1,40 @@
+import unittest
+from trainer.batch import BoardPool, batch_equity
+from trainer.cards import card_from_str, card_id
+from trainer.evaluator import evaluate
+
+def _ids(*names):
+    return [card_id(card_from_str(n)) for n in names]
+
+class TestBoardPool(unittest.TestCase):
+    def test_shared_scores_match_rereading_each_deal(self):
+        pool = BoardPool(400, max_opponents=2, seed=4)
+        for hole in (_ids("As", "Ah"), _ids("7c", "2d")):
+            for n in (1, 2):
+                won = 0.0
+                for deal in pool.deals:
+                    cards = [c for c in deal if c not in hole]
+                    board = cards[:5]
+                    hero = evaluate(hole + board)
+                    vill = [evaluate(cards[j:j + 2] + board) for j in range(5, 5 + 2 * n, 2)]
+                    if hero >= max(vill):
+                        won += 1.0 / (1 + vill.count(hero))
+                self.assertAlmostEqual(pool.equity(hole, n)[0], won / len(pool.deals), places=12)
+
+    def test_batch_order_and_accuracy(self):
+        spots = [(_ids("Ac", "Ad"), 1), (_ids("Kc", "Kd"), 1), (_ids("7h", "2c"), 1), (_ids("Ac", "Ad"), 3)]
+        res = list(batch_equity(spots, iters=3000, seed=1))
+        self.assertEqual(len(res), 4)
+        aa, kk, trash, aa3 = res
+        self.assertGreater(aa[0], kk[0])
+        self.assertGreater(kk[0], trash[0])
+        self.assertGreater(aa[0], aa3[0])
+        # AA vs one random hand is 85.2%
+        self.assertLess(abs(aa[0] - 0.852), 4 * aa[1])
+
+    def test_too_many_opponents(self):
+        with self.assertRaises(ValueError):
+            BoardPool(10, max_opponents=1).equity(_ids("Ac", "Ad"), 2)
+
+if __name__ == "__main__":
+    unittest.main()
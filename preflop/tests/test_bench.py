@@ -0,0 +1,27 @@
+import unittest
+from trainer.bench import compare, run_benchmarks
+
+def _report(**results):
+    return {"machine": {}, "results": results}
+
+class TestBenchCompare(unittest.TestCase):
+    def test_gates_throughput_and_latency(self):
+        base = _report(evaluate7_evals_per_sec=1000.0, api_warm_ms=1.0, process_max_rss_kib=100.0)
+        rows = {r[0]: r for r in compare(base, _report(evaluate7_evals_per_sec=850.0, api_warm_ms=1.1, process_max_rss_kib=900.0), 0.2)}
+        self.assertFalse(rows["evaluate7_evals_per_sec"][4])
+        self.assertFalse(rows["api_warm_ms"][4])
+        self.assertNotIn("process_max_rss_kib", rows)
+        rows = {r[0]: r for r in compare(base, _report(evaluate7_evals_per_sec=700.0, api_warm_ms=1.5), 0.2)}
+        self.assertTrue(rows["evaluate7_evals_per_sec"][4])
+        self.assertTrue(rows["api_warm_ms"][4])
+
+    def test_quick_run(self):
+        report = run_benchmarks(seconds=0.01, opponents=[1, 2], api=False)
+        res = report["results"]
+        for key in ("rank_five_evals_per_sec", "rank_seven_evals_per_sec", "equity_2opp_iters_per_sec", "equity_peak_alloc_kib"):
+            self.assertGreater(res[key], 0, key)
+        self.assertIn("python", report["machine"])
+        self.assertEqual([r for r in compare(report, report) if r[4]], [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+
+import unittest
+from trainer.cache import LRUCache
+
+class TestLRUCache(unittest.TestCase):
+    def test_hits_misses_and_eviction_order(self):
+        cache = LRUCache(maxsize=2)
+        calls = []
+        def compute(k):
+            return lambda: calls.append(k) or k * 10
+        self.assertEqual(cache.get_or_compute(1, compute(1)), 10)
+        self.assertEqual(cache.get_or_compute(2, compute(2)), 20)
+        self.assertEqual(cache.get_or_compute(1, compute(1)), 10)  # 1 is now most recent
+        cache.get_or_compute(3, compute(3))                        # evicts 2
+        cache.get_or_compute(1, compute(1))
+        cache.get_or_compute(2, compute(2))
+        self.assertEqual(calls, [1, 2, 3, 2])
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['size']), (2, 4, 2, 2))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 6)
+
+if __name__ == '__main__':
+    unittest.main()
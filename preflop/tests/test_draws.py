@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from trainer.cards import card_from_str, card_id
+from trainer.draws import CATEGORY_NAMES, GROUPS, HEADER, DrawTable, build_table, open_draw_table
+from trainer.odds import flop_flush_stats_suited, flop_pair_or_better_unpaired, flop_set_prob_pocket_pair
+
+def _ids(*names):
+    return [card_id(card_from_str(n)) for n in names]
+
+class TestDrawGroups(unittest.TestCase):
+    def test_flop_draws_match_closed_forms(self):
+        suited = GROUPS["flop_draws"][1](_ids("7s", "6s"))
+        self.assertAlmostEqual(suited["flop_flush_draw"], flop_flush_stats_suited()["flush_draw"], places=12)
+        self.assertAlmostEqual(GROUPS["flop_draws"][1](_ids("Ac", "Kd"))["flop_hit"], flop_pair_or_better_unpaired()["pair_or_better"], places=12)
+        self.assertAlmostEqual(GROUPS["flop_draws"][1](_ids("7c", "7d"))["flop_hit"], flop_set_prob_pocket_pair()["set_or_better"], places=12)
+        # Connectors in the middle have more straight draws than at the edge
+        self.assertGreater(suited["flop_oesd"], GROUPS["flop_draws"][1](_ids("Ac", "Kd"))["flop_oesd"])
+
+    def test_made_hands_sum_to_one(self):
+        made = GROUPS["flop_made"][1](_ids("Ah", "Ad"))
+        self.assertAlmostEqual(sum(made.values()), 1.0, places=12)
+        self.assertEqual(made["flop_high_card"], 0.0)
+        # Board trips give AA a full house without flopping a set
+        self.assertGreater(made["flop_trips"] + made["flop_full_house"] + made["flop_quads"],
+                           flop_set_prob_pocket_pair()["set_or_better"])
+
+class TestDrawTable(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "draws.bin")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_build_is_incremental(self):
+        t = build_table(self.path, groups=["flop_made"], workers=1)
+        self.assertEqual(t.fields, [f"flop_{c}" for c in CATEGORY_NAMES])
+        before = t.column("flop_pair")
+        t._mm.close()
+        # Nothing is missing, so no worker pool is started at all
+        with mock.patch("trainer.draws.Pool", side_effect=AssertionError("recomputed")):
+            t = build_table(self.path, groups=["flop_made"])
+        self.assertEqual(t.column("flop_pair"), before)
+        self.assertAlmostEqual(t.lookup(_ids("As", "Kh"), "flop_pair"), t.lookup(_ids("Kc", "Ad"), "flop_pair"))
+        t._mm.close()
+
+    def test_corrupt_files_are_rejected(self):
+        build_table(self.path, groups=["flop_made"], workers=1)._mm.close()
+        with open(self.path, "rb") as f:
+            raw = bytearray(f.read())
+        raw[-3] ^= 0xFF
+        with open(self.path, "wb") as f:
+            f.write(raw)
+        self.assertRaises(ValueError, DrawTable, self.path)
+        raw[-3] ^= 0xFF
+        raw[4] = 99  # format version
+        with open(self.path, "wb") as f:
+            f.write(raw)
+        self.assertIsNone(open_draw_table(self.path))
+
+    def test_shipped_table(self):
+        t = open_draw_table()
+        self.assertIsNotNone(t)
+        for group, (fields, _) in GROUPS.items():
+            self.assertTrue(set(fields) <= set(t.fields), group)
+        self.assertAlmostEqual(t.lookup(_ids("7s", "6s"), "flop_flush_draw"), flop_flush_stats_suited()["flush_draw"], places=6)
+        self.assertAlmostEqual(sum(t.lookup(_ids("9c", "9d"), f"river_{c}") for c in CATEGORY_NAMES), 1.0, places=5)
+        t._mm.close()
+
+if __name__ == "__main__":
+    unittest.main()
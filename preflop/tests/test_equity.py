@@ -0,0 +1,58 @@
+
+import unittest
+from trainer.cards import card_from_str, card_id
+from trainer.equity import EquitySampler, estimate_equity, estimate_equity_adaptive, iter_equity
+from trainer.recommend import cut_lines, recommend_action
+
+def _ids(*names):
+    return [card_id(card_from_str(n)) for n in names]
+
+class TestEquitySampler(unittest.TestCase):
+    def test_resuming_matches_one_run(self):
+        hole = _ids("Jh", "Jd")
+        s = EquitySampler(hole, 2, seed=8)
+        s.run(700)
+        s.run(1300)
+        self.assertEqual(s.n, 2000)
+        self.assertAlmostEqual(s.equity, estimate_equity(hole, 2, iters=2000, seed=8), places=12)
+        self.assertTrue(0 < s.stderr < 0.02)
+
+class TestIterEquity(unittest.TestCase):
+    def test_updates_end_at_the_batch_estimate(self):
+        hole = _ids("Ts", "9s")
+        updates = list(iter_equity(hole, 2, iters=2500, seed=4, every=1000))
+        self.assertEqual([u.iters for u in updates], [1000, 2000, 2500])
+        self.assertEqual([u.done for u in updates], [False, False, True])
+        self.assertAlmostEqual(updates[-1].equity, estimate_equity(hole, 2, iters=2500, seed=4), places=12)
+        self.assertGreater(updates[0].stderr, updates[-1].stderr)
+
+    def test_closing_stops_sampling(self):
+        gen = iter_equity(_ids("Ts", "9s"), 1, iters=10 ** 9, seed=4, every=500)
+        self.assertEqual(next(gen).iters, 500)
+        gen.close()
+        self.assertRaises(StopIteration, next, gen)
+
+class TestAdaptiveEquity(unittest.TestCase):
+    def test_clear_spot_stops_early_on_decision(self):
+        est = estimate_equity_adaptive(_ids("As", "Ah"), 1, max_iters=100000, seed=1, confidence=0.99)
+        self.assertEqual(est.stopped_by, "decision")
+        self.assertLessEqual(est.iters, 2000)
+        call_cut, raise_cut = cut_lines(1)
+        self.assertGreater(est.ci_low, raise_cut)
+        self.assertEqual(recommend_action(est.equity, 1)["action"], "RAISE")
+
+    def test_close_spot_uses_more_samples(self):
+        # A8o vs 2 sits right at the raise cut, so the interval keeps straddling it
+        close = estimate_equity_adaptive(_ids("Ac", "8d"), 2, max_iters=6000, seed=1, confidence=0.95)
+        self.assertEqual(close.stopped_by, "budget")
+        self.assertEqual(close.iters, 6000)
+
+    def test_target_standard_error(self):
+        est = estimate_equity_adaptive(_ids("Kc", "Qd"), 1, max_iters=100000, seed=3, target_se=0.01)
+        self.assertEqual(est.stopped_by, "target_se")
+        self.assertLessEqual(est.stderr, 0.01)
+        self.assertLess(est.iters, 100000)
+        self.assertTrue(est.ci_low < est.equity < est.ci_high)
+
+if __name__ == '__main__':
+    unittest.main()
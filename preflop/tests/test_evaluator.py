@@ -0,0 +1,127 @@
+
+import random
+import unittest
+from itertools import combinations
+from trainer.cards import full_deck, card_from_str, card_id, card_from_id, canonicalize, hand_class, Deck
+from trainer.equity import estimate_equity
+from trainer.eval5 import rank_five, compare_5
+from trainer.eval7 import rank_seven
+from trainer.evaluator import evaluate, encode_rank, category, CARD_KEY, CARD_MASK
+try:
+    import numpy as np
+    from trainer.vectorized import evaluate_batch, deal_batch, estimate_equity_vectorized
+except ImportError:
+    np = None
+
+def _ids(cards):
+    return [card_id(c) for c in cards]
+
+def _rank_multisets(n):
+    # All rank multisets of size n (values 2..14, at most 4 of each)
+    def walk(v, left):
+        if left == 0:
+            yield []
+            return
+        if v > 14:
+            return
+        for c in range(min(4, left), -1, -1):
+            for rest in walk(v + 1, left - c):
+                yield [v] * c + rest
+    return walk(2, n)
+
+class TestEvaluator(unittest.TestCase):
+    def test_every_rank_multiset_matches_reference(self):
+        # Round-robin suits never put 5 cards in one suit, so this covers
+        # every non-flush hand class exhaustively.
+        for n in (5, 7):
+            for values in _rank_multisets(n):
+                cards = [(v, i % 4) for i, v in enumerate(values)]
+                ref = rank_five(cards) if n == 5 else rank_seven(cards)
+                self.assertEqual(evaluate(_ids(cards)), encode_rank(ref), cards)
+
+    def test_every_flush_mask_matches_reference(self):
+        for n in (5, 6, 7):
+            for values in combinations(range(2, 15), n):
+                cards = [(v, 3) for v in values]
+                ref = rank_five(cards) if n == 5 else max(rank_five(list(c)) for c in combinations(cards, 5))
+                self.assertEqual(evaluate(_ids(cards)), encode_rank(ref), cards)
+
+    def test_random_seven_card_hands(self):
+        rng = random.Random(7)
+        deck = full_deck()
+        for _ in range(3000):
+            cards = rng.sample(deck, 7)
+            self.assertEqual(evaluate(_ids(cards)), encode_rank(rank_seven(cards)))
+
+    def test_ordering_and_compare_5(self):
+        royal = [card_from_str(s) for s in ("As", "Ks", "Qs", "Js", "Ts")]
+        wheel = [card_from_str(s) for s in ("5h", "4d", "3c", "2s", "Ah")]
+        six_high = [card_from_str(s) for s in ("6h", "5d", "4c", "3s", "2h")]
+        self.assertEqual(category(evaluate(_ids(royal))), 8)
+        self.assertEqual(compare_5(royal, wheel), 1)
+        self.assertEqual(compare_5(wheel, six_high), -1)
+        self.assertEqual(compare_5(wheel, wheel), 0)
+
+class TestCardIds(unittest.TestCase):
+    def test_round_trip_matches_full_deck_order(self):
+        self.assertEqual([card_from_id(i) for i in range(52)], full_deck())
+        self.assertEqual([card_id(c) for c in full_deck()], list(range(52)))
+
+    def test_deal_prefix_keeps_live_cards(self):
+        hole = _ids([card_from_str("As"), card_from_str("Kh")])
+        deck = Deck(hole)
+        rng = random.Random(3)
+        for _ in range(50):
+            deck.deal_prefix(9, rng.random)
+            self.assertEqual(sorted(deck.cards), [i for i in range(52) if i not in hole])
+
+    def test_canonicalize_merges_suit_isomorphic_hands(self):
+        self.assertEqual(canonicalize(_ids([card_from_str("As"), card_from_str("Kh")])),
+                         canonicalize(_ids([card_from_str("Kc"), card_from_str("Ad")])))
+        self.assertNotEqual(canonicalize(_ids([card_from_str("As"), card_from_str("Ks")])),
+                            canonicalize(_ids([card_from_str("As"), card_from_str("Kh")])))
+        # One canonical form per hand class
+        forms = {}
+        for a, b in combinations(range(52), 2):
+            forms.setdefault(hand_class(a, b), set()).add(canonicalize([a, b]))
+        self.assertEqual(len(forms), 169)
+        self.assertTrue(all(len(f) == 1 for f in forms.values()))
+
+    def test_canonicalize_respects_board(self):
+        flush_draw = canonicalize(_ids([card_from_str("As"), card_from_str("Ks")]), _ids([card_from_str(c) for c in ("2s", "7s", "9d")]))
+        same = canonicalize(_ids([card_from_str("Ah"), card_from_str("Kh")]), _ids([card_from_str(c) for c in ("7h", "2h", "9c")]))
+        backdoor = canonicalize(_ids([card_from_str("As"), card_from_str("Ks")]), _ids([card_from_str(c) for c in ("2s", "7d", "9d")]))
+        self.assertEqual(flush_draw, same)
+        self.assertNotEqual(flush_draw, backdoor)
+
+    def test_equity_sanity(self):
+        aces = _ids([card_from_str("As"), card_from_str("Ah")])
+        self.assertTrue(0.82 < estimate_equity(aces, 1, iters=4000, seed=1) < 0.88)
+        seven_two = _ids([card_from_str("7c"), card_from_str("2d")])
+        self.assertTrue(0.30 < estimate_equity(seven_two, 1, iters=4000, seed=1) < 0.37)
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestVectorized(unittest.TestCase):
+    def test_batch_scores_match_scalar(self):
+        rng = random.Random(11)
+        hands = [rng.sample(range(52), 7) for _ in range(5000)]
+        keys = np.array([sum(CARD_KEY[c] for c in h) for h in hands], dtype=np.int64)
+        masks = np.array([sum(CARD_MASK[c] for c in h) for h in hands], dtype=np.int64)
+        self.assertEqual(evaluate_batch(keys, masks).tolist(), [evaluate(h) for h in hands])
+
+    def test_deal_batch_rows_are_distinct_live_cards(self):
+        live = np.array([c for c in range(52) if c not in (0, 51)], dtype=np.int8)
+        dealt = deal_batch(live, 500, 23, np.random.default_rng(2))
+        for row in dealt.tolist():
+            self.assertEqual(len(set(row)), 23)
+            self.assertFalse({0, 51} & set(row))
+
+    def test_agrees_with_scalar_engine(self):
+        hole = _ids([card_from_str("Qs"), card_from_str("Js")])
+        for opps in (1, 4):
+            fast = estimate_equity_vectorized(hole, opps, iters=200000, seed=5)
+            slow = estimate_equity(hole, opps, iters=20000, seed=5)
+            self.assertAlmostEqual(fast, slow, delta=0.015)
+
+if __name__ == '__main__':
+    unittest.main()
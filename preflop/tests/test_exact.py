@@ -0,0 +1,48 @@
+
+import unittest
+from itertools import combinations
+from trainer.cards import card_from_str, card_id, card_from_id
+from trainer.eval7 import rank_seven
+from trainer.exact import enumerate_equity, outcome_count, can_enumerate
+from trainer.equity import estimate_equity
+
+def _ids(*names):
+    return [card_id(card_from_str(n)) for n in names]
+
+class TestExactEquity(unittest.TestCase):
+    def test_outcome_counts(self):
+        self.assertEqual(outcome_count(3), 1081 * 990)
+        self.assertEqual(outcome_count(4), 46 * 990)
+        self.assertEqual(outcome_count(5), 990)
+        self.assertTrue(can_enumerate(3, 1))
+        self.assertFalse(can_enumerate(0, 1))
+        self.assertFalse(can_enumerate(5, 2))
+        self.assertFalse(can_enumerate(3, 1, max_outcomes=1000))
+
+    def test_river_matches_reference_evaluator(self):
+        hole = _ids("Ah", "Td")
+        board = _ids("Th", "7h", "2c", "Kh", "5s")
+        hero = rank_seven([card_from_id(c) for c in hole + board])
+        wins = ties = 0
+        rest = [c for c in range(52) if c not in hole + board]
+        for v in combinations(rest, 2):
+            r = rank_seven([card_from_id(c) for c in list(v) + board])
+            wins += r < hero
+            ties += r == hero
+        res = enumerate_equity(hole, board)
+        self.assertEqual(res['outcomes'], 990)
+        self.assertAlmostEqual(res['win'], wins / 990)
+        self.assertAlmostEqual(res['tie'], ties / 990)
+        self.assertAlmostEqual(res['win'] + res['tie'] + res['loss'], 1.0)
+
+    def test_turn_agrees_with_sampling(self):
+        hole = _ids("9s", "8s")
+        board = _ids("7s", "6d", "2s", "Kc")
+        exact = enumerate_equity(hole, board)['equity']
+        self.assertAlmostEqual(estimate_equity(hole, 1, iters=20000, seed=4, board=board), exact, delta=0.015)
+
+    def test_rejects_duplicates(self):
+        self.assertRaises(ValueError, enumerate_equity, _ids("As", "Kd"), _ids("As", "7c", "2d"))
+
+if __name__ == '__main__':
+    unittest.main()
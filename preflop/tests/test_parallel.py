@@ -0,0 +1,49 @@
+
+import threading
+import unittest
+from trainer.cards import card_from_str, card_id
+from trainer.equity import estimate_equity
+from trainer.parallel import EquityPool, get_pool, plan_chunks, CHUNK
+
+class TestParallelEquity(unittest.TestCase):
+    def test_chunk_plan_is_fixed(self):
+        plan = plan_chunks(2 * CHUNK + 5, seed=9)
+        self.assertEqual([n for n, _ in plan], [CHUNK, CHUNK, 5])
+        self.assertEqual(plan, plan_chunks(2 * CHUNK + 5, seed=9))
+        self.assertEqual(len({s for _, s in plan}), 3)
+        self.assertNotEqual(plan[0][1], plan_chunks(10, seed=10)[0][1])
+
+    def test_result_independent_of_worker_count(self):
+        hole = [card_id(card_from_str("Ts")), card_id(card_from_str("9s"))]
+        iters = CHUNK + 3000
+        results = []
+        for workers in (0, 2):
+            pool = EquityPool(workers, inner="scalar")
+            try:
+                results.append(pool.estimate(hole, 1, iters=iters, seed=2))
+            finally:
+                pool.close()
+        self.assertEqual(results[0], results[1])
+        (n0, s0), (n1, s1) = plan_chunks(iters, 2)
+        merged = (estimate_equity(hole, 1, n0, s0) * n0 + estimate_equity(hole, 1, n1, s1) * n1) / iters
+        self.assertEqual(results[0], merged)
+
+    def test_start_spawns_workers(self):
+        pool = EquityPool(2, inner="scalar").start()
+        try:
+            self.assertTrue(pool.pids)
+        finally:
+            pool.close()
+        self.assertEqual(EquityPool(0).start().pids, set())
+
+    def test_get_pool_is_one_pool_across_threads(self):
+        pools = []
+        threads = [threading.Thread(target=lambda: pools.append(get_pool(0))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len({id(p) for p in pools}), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+
+import os
+import tempfile
+import unittest
+from itertools import combinations
+from trainer.cards import card_from_str, card_id, hand_class, class_label, class_representative, N_CLASSES
+from trainer.preflop_table import build_table, open_table, EquityTable, HEADER
+
+def _ids(*names):
+    return [card_id(card_from_str(n)) for n in names]
+
+class TestHandClasses(unittest.TestCase):
+    def test_every_hole_maps_to_one_of_169_classes(self):
+        counts = [0] * N_CLASSES
+        for a, b in combinations(range(52), 2):
+            counts[hand_class(a, b)] += 1
+        labels = [class_label(i) for i in range(N_CLASSES)]
+        self.assertEqual(len(set(labels)), N_CLASSES)
+        for i, n in enumerate(counts):
+            expected = 6 if len(labels[i]) == 2 else 4 if labels[i].endswith('s') else 12
+            self.assertEqual(n, expected, labels[i])
+            self.assertEqual(hand_class(*class_representative(i)), i)
+
+    def test_labels(self):
+        self.assertEqual(class_label(hand_class(*_ids("As", "Kh"))), "AKo")
+        self.assertEqual(class_label(hand_class(*_ids("Kd", "Ad"))), "AKs")
+        self.assertEqual(class_label(hand_class(*_ids("7c", "7h"))), "77")
+
+class TestEquityTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "eq.bin")
+        cls.table = build_table(cls.path, iters=300, seed=1, workers=1, max_opponents=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.table._mm.close()
+        cls.tmp.cleanup()
+
+    def test_lookup_is_suit_independent(self):
+        self.assertEqual(self.table.lookup(_ids("As", "Kh"), 2), self.table.lookup(_ids("Kc", "Ad"), 2))
+        self.assertTrue(self.table.covers(2))
+        self.assertFalse(self.table.covers(3))
+        self.assertGreater(self.table.lookup(_ids("As", "Ah"), 1), self.table.lookup(_ids("7c", "2d"), 1))
+
+    def test_corrupt_or_foreign_files_are_rejected(self):
+        with open(self.path, "rb") as f:
+            raw = bytearray(f.read())
+        bad = os.path.join(self.tmp.name, "bad.bin")
+        raw[HEADER.size + 5] ^= 0xFF
+        with open(bad, "wb") as f:
+            f.write(raw)
+        self.assertRaises(ValueError, EquityTable, bad)
+        raw[HEADER.size + 5] ^= 0xFF
+        raw[4] = 99  # format version
+        with open(bad, "wb") as f:
+            f.write(raw)
+        self.assertIsNone(open_table(bad))
+        self.assertIsNone(open_table(os.path.join(self.tmp.name, "missing.bin")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+
+import unittest
+from trainer.cards import card_from_str, card_id
+from trainer.evaluator import evaluate
+from trainer.ranges import parse_range
+from trainer.range_equity import range_equity, compatible_pairs
+
+def _ids(*names):
+    return [card_id(card_from_str(n)) for n in names]
+
+class TestRangeParsing(unittest.TestCase):
+    def test_combo_counts(self):
+        cases = {
+            "TT+": 30, "AQs+": 8, "KQo": 12, "AK": 16, "22-55": 24, "A2s-A5s": 16,
+            "AsKh": 1, "TT+, AQs+, KQo": 50, "aks kq": 20,
+        }
+        for text, n in cases.items():
+            self.assertEqual(len(parse_range(text)), n, text)
+
+    def test_weights_and_overrides(self):
+        r = parse_range("AKs:0.5, AK")
+        self.assertEqual(sorted(set(r.values())), [1.0])
+        r = parse_range("AK, AKs:0.25, KK:0")
+        self.assertEqual(sum(r.values()), 12 + 4 * 0.25)
+        self.assertNotIn(tuple(sorted(_ids("Ks", "Kh"), reverse=True)), r)
+
+    def test_bad_tokens(self):
+        for text in ("AKx", "TTs", "A2s-K5s", "AsAs", "QQ:-1"):
+            self.assertRaises(ValueError, parse_range, text)
+
+class TestRangeEquity(unittest.TestCase):
+    def test_card_removal(self):
+        pairs = compatible_pairs(parse_range("AsAh"), parse_range("AA"))
+        self.assertEqual(len(pairs), 1)
+        pairs = compatible_pairs(parse_range("AK"), parse_range("AA, KK"), board=_ids("Ac", "7d", "2h"))
+        self.assertTrue(all(not set(h) & set(v) for h, v, _ in pairs))
+
+    def test_single_combos_match_river_by_river_count(self):
+        hero, villain = _ids("As", "Ks"), _ids("Qh", "Jh")
+        board = _ids("Qs", "7s", "2d", "9h")
+        won = 0.0
+        rivers = [c for c in range(52) if c not in hero + villain + board]
+        for r in rivers:
+            h, v = evaluate(hero + board + [r]), evaluate(villain + board + [r])
+            won += 1.0 if h > v else 0.5 if h == v else 0.0
+        res = range_equity(parse_range("AsKs"), parse_range("QhJh"), board=board)
+        self.assertEqual(res["method"], "exact")
+        self.assertAlmostEqual(res["equity"], won / len(rivers))
+
+    def test_sampling_matches_exact(self):
+        hero, villain = parse_range("QQ+, AKs"), parse_range("JJ-99, AQs")
+        board = _ids("Kd", "8c", "3h", "2s")
+        exact = range_equity(hero, villain, board=board)
+        sampled = range_equity(hero, villain, board=board, iters=20000, seed=3, max_outcomes=0)
+        self.assertEqual((exact["method"], sampled["method"]), ("exact", "sample"))
+        self.assertAlmostEqual(sampled["equity"], exact["equity"], delta=4 * sampled["stderr"] + 1e-3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import unittest
+from app import STREAMS, app
+
+def _events(chunks):
+    # Parse "event: ...\ndata: ...\n\n" frames as they arrive
+    buf = ""
+    for chunk in chunks:
+        buf += chunk.decode() if isinstance(chunk, bytes) else chunk
+        while "\n\n" in buf:
+            frame, buf = buf.split("\n\n", 1)
+            fields = dict(line.split(": ", 1) for line in frame.splitlines())
+            yield fields["event"], json.loads(fields["data"])
+
+class TestEvaluateStream(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_progress_then_done(self):
+        res = self.client.get("/api/evaluate_stream?a_rank=A&a_suit=s&b_rank=A&b_suit=h&iters=3000&every=1000&seed=2")
+        self.assertEqual(res.mimetype, "text/event-stream")
+        events = list(_events([res.get_data()]))
+        kinds = [kind for kind, _ in events]
+        self.assertEqual(kinds, ["start", "progress", "progress", "done"])
+        self.assertEqual(events[0][1]["iters"], 3000)
+        self.assertEqual([data["iters"] for _, data in events[1:]], [1000, 2000, 3000])
+        done = events[-1][1]
+        self.assertTrue(done["done"])
+        # AA vs one random hand is 85.2%
+        self.assertLess(abs(done["equity"] - 0.852), 4 * done["stderr"])
+        self.assertIn("recommendation", done)
+        self.assertNotIn(events[0][1]["stream_id"], STREAMS)
+
+    def test_cancel_stops_the_stream_early(self):
+        res = self.client.get("/api/evaluate_stream?iters=1000000&every=1000", buffered=False)
+        events = _events(res.response)
+        kind, start = next(events)
+        self.assertEqual(kind, "start")
+        self.assertEqual(next(events)[0], "progress")
+        cancel = self.client.post(f"/api/evaluate_stream/{start['stream_id']}/cancel")
+        self.assertEqual(cancel.status_code, 200)
+        rest = list(events)
+        self.assertEqual(rest[-1][0], "cancelled")
+        self.assertLess(rest[-1][1]["iters"], 1000000)
+        self.assertNotIn("done", [kind for kind, _ in rest])
+        res.close()
+        self.assertNotIn(start["stream_id"], STREAMS)
+
+    def test_cancel_unknown_stream(self):
+        res = self.client.post("/api/evaluate_stream/nosuchstream/cancel")
+        self.assertEqual(res.status_code, 404)
+        self.assertFalse(res.get_json()["ok"])
+
+if __name__ == "__main__":
+    unittest.main()
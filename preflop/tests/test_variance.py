@@ -0,0 +1,54 @@
+import unittest
+from math import comb
+from statistics import pstdev
+from trainer.cards import card_from_str, card_id
+from trainer.equity import estimate_equity
+from trainer.variance import _regress, board_strata, estimate_equity_vr
+
+def _ids(*names):
+    return [card_id(card_from_str(n)) for n in names]
+
+class TestBoardStrata(unittest.TestCase):
+    def test_probabilities_are_exact(self):
+        for hole in (_ids("As", "Ks"), _ids("7c", "7d"), _ids("Jh", "9c")):
+            strata = board_strata(hole)
+            self.assertAlmostEqual(sum(p for cells in strata.values() for _, p in cells), 1.0, places=12)
+        # AKs: no ace or king among five board cards from the 44 non-AK cards
+        strata = board_strata(_ids("As", "Ks"))
+        miss = sum(p for (a, b, _), cells in strata.items() if a == b == 0 for _, p in cells)
+        self.assertAlmostEqual(miss, comb(44, 5) / comb(50, 5), places=12)
+        # Three or more spades among the 11 left: odds.river_flush_prob_two_suited
+        flushy = sum(p for (_, _, f), cells in strata.items() if f for _, p in cells)
+        self.assertAlmostEqual(flushy, sum(comb(11, k) * comb(39, 5 - k) for k in range(3, 6)) / comb(50, 5), places=12)
+
+class TestVarianceReduced(unittest.TestCase):
+    def test_unbiased_against_known_equity(self):
+        # AA vs one random hand is 85.2%
+        est = estimate_equity_vr(_ids("Ah", "Ad"), 1, iters=4000, seed=1)
+        self.assertLess(abs(est.equity - 0.852), 4 * est.stderr)
+        self.assertGreater(est.controls, 0)
+        self.assertEqual(est.evaluations, 2 * est.deals)
+
+    def test_deterministic_per_seed(self):
+        a = estimate_equity_vr(_ids("Qd", "Jd"), 2, iters=600, seed=5)
+        b = estimate_equity_vr(_ids("Qd", "Jd"), 2, iters=600, seed=5)
+        self.assertEqual(a, b)
+
+    def test_spread_beats_plain_sampling(self):
+        hole = _ids("Jh", "9c")
+        plain = [estimate_equity(hole, 1, iters=800, seed=s) for s in range(24)]
+        vr = [estimate_equity_vr(hole, 1, iters=800, seed=s).equity for s in range(24)]
+        self.assertLess(pstdev(vr), pstdev(plain))
+
+    def test_plain_configuration_reports_unit_ess(self):
+        est = estimate_equity_vr(_ids("Kc", "Kd"), 1, iters=1000, seed=2, stratify=False, control=False)
+        self.assertEqual(est.strata, 1)
+        self.assertEqual(est.controls, 0)
+        self.assertAlmostEqual(est.effective_sample_size, est.deals, delta=1.0)
+
+    def test_constant_control_is_dropped(self):
+        rows = [(float(i % 2), [0.5, float(i % 2)]) for i in range(10)]
+        self.assertEqual(_regress([rows]), [0.0, 1.0])
+
+if __name__ == "__main__":
+    unittest.main()
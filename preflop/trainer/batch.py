@@ -0,0 +1,110 @@
+
+from __future__ import annotations
+import random
+from math import sqrt
+from typing import Dict, Iterator, List, Sequence, Tuple
+from .cards import Deck
+from .evaluator import CARD_KEY, CARD_MASK, evaluate_key
+
+# Batch equity over one shared pool of deals (common random numbers).
+#
+# The pool holds `iters` random orderings of the full deck, cut to the deepest
+# prefix any spot needs. A hand reads each ordering with its own two cards
+# skipped: board = first five, villains = next 2n. Skipping fixed cards in a
+# uniform permutation leaves a uniform permutation of the rest, so every hand
+# still gets an ordinary Monte Carlo estimate, but all hands face the same
+# boards and villains wherever their cards allow, which keeps the ordering of
+# a chart far less noisy than independent runs. When a deal's first 5 + 2n
+# cards miss the hand (the usual case) the board and villain scores are shared
+# as well and computed once per deal.
+
+Spot = Tuple[Sequence[int], int]
+
+class BoardPool:
+    """`iters` shared deals for spots with up to max_opponents villains."""
+
+    def __init__(self, iters: int, max_opponents: int = 1, seed: int = 0):
+        rand = random.Random(seed).random
+        deck = Deck()
+        # Two spare cards cover the skipped hole cards
+        depth = 5 + 2 * max_opponents + 2
+        self.deals: List[Tuple[int, ...]] = []
+        for _ in range(iters):
+            deck.deal_prefix(depth, rand)
+            self.deals.append(tuple(deck.cards[:depth]))
+        self.max_opponents = max_opponents
+        self._shared: Dict[int, List[Tuple[int, int, int, int, int]]] = {}
+
+    def _shared_for(self, n_opponents: int) -> List[Tuple[int, int, int, int, int]]:
+        # Per deal: board key/mask, best villain score, how many villains hold it, and used-card bits
+        rows = self._shared.get(n_opponents)
+        if rows is None:
+            rows = []
+            need = 5 + 2 * n_opponents
+            for deal in self.deals:
+                board_key, board_mask = 0, 0
+                for c in deal[:5]:
+                    board_key += CARD_KEY[c]
+                    board_mask |= CARD_MASK[c]
+                best, n_best = -1, 0
+                for j in range(5, need, 2):
+                    a, b = deal[j], deal[j + 1]
+                    r = evaluate_key(CARD_KEY[a] + CARD_KEY[b] + board_key, CARD_MASK[a] | CARD_MASK[b] | board_mask)
+                    if r > best:
+                        best, n_best = r, 1
+                    elif r == best:
+                        n_best += 1
+                used = 0
+                for c in deal[:need]:
+                    used |= 1 << c
+                rows.append((board_key, board_mask, best, n_best, used))
+            self._shared[n_opponents] = rows
+        return rows
+
+    def equity(self, hole: Sequence[int], n_opponents: int = 1) -> Tuple[float, float]:
+        """(equity, standard error) for hole (card ids) over the pooled deals."""
+        if n_opponents > self.max_opponents:
+            raise ValueError(f"Pool was dealt for at most {self.max_opponents} opponents")
+        n = len(self.deals)
+        if n == 0:
+            return 0.0, 0.0
+        h0, h1 = hole
+        hero_key = CARD_KEY[h0] + CARD_KEY[h1]
+        hero_mask = CARD_MASK[h0] | CARD_MASK[h1]
+        held = (1 << h0) | (1 << h1)
+        need = 5 + 2 * n_opponents
+        wins = 0.0
+        wins_sq = 0.0
+        for deal, (board_key, board_mask, best, n_best, used) in zip(self.deals, self._shared_for(n_opponents)):
+            if used & held:
+                # The hand collides with this deal: reread it with the hole cards skipped
+                cards = [c for c in deal if c != h0 and c != h1]
+                board_key, board_mask = 0, 0
+                for c in cards[:5]:
+                    board_key += CARD_KEY[c]
+                    board_mask |= CARD_MASK[c]
+                best, n_best = -1, 0
+                for j in range(5, need, 2):
+                    a, b = cards[j], cards[j + 1]
+                    r = evaluate_key(CARD_KEY[a] + CARD_KEY[b] + board_key, CARD_MASK[a] | CARD_MASK[b] | board_mask)
+                    if r > best:
+                        best, n_best = r, 1
+                    elif r == best:
+                        n_best += 1
+            hero = evaluate_key(hero_key + board_key, hero_mask | board_mask)
+            if hero > best:
+                wins += 1.0
+                wins_sq += 1.0
+            elif hero == best:
+                share = 1.0 / (1 + n_best)
+                wins += share
+                wins_sq += share * share
+        mean = wins / n
+        var = max(0.0, wins_sq / n - mean * mean)
+        return mean, sqrt(var / n)
+
+def batch_equity(spots: Sequence[Spot], iters: int = 3000, seed: int = 0) -> Iterator[Tuple[float, float]]:
+    """(equity, stderr) for each (hole, n_opponents) spot, in order, from one shared pool."""
+    pool = BoardPool(iters, max((n for _, n in spots), default=1), seed)
+    for hole, n_opponents in spots:
+        yield pool.equity(hole, n_opponents)
@@ -0,0 +1,186 @@
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .cards import card_from_id, card_to_str
+from .eval5 import rank_five
+from .eval7 import rank_seven
+from .equity import estimate_equity
+from .evaluator import evaluate
+
+# Throughput/latency benchmarks for the hot paths plus a regression gate.
+#
+#   python -m trainer.bench run --out bench.json
+#   python -m trainer.bench compare benchmarks/baseline.json bench.json --threshold 0.2
+#
+# Metrics ending in _per_sec are higher-is-better and _ms lower-is-better;
+# compare exits non-zero when any of them is worse than the baseline by more
+# than the threshold. Memory figures are reported but not gated.
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "baseline.json")
+
+def machine_info() -> Dict[str, object]:
+    info: Dict[str, object] = {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import numpy
+        info["numpy"] = numpy.__version__
+    except ImportError:
+        info["numpy"] = None
+    return info
+
+def _rate(fn: Callable[[int], None], seconds: float, batch: int) -> float:
+    # Calls fn(batch) until `seconds` elapse; returns operations per second
+    done = 0
+    start = time.perf_counter()
+    while True:
+        fn(batch)
+        done += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return done / elapsed
+
+def _hands(n_cards: int, count: int, seed: int) -> List[List[int]]:
+    rng = random.Random(seed)
+    return [rng.sample(range(52), n_cards) for _ in range(count)]
+
+def bench_evaluators(seconds: float) -> Dict[str, float]:
+    five = [[card_from_id(c) for c in h] for h in _hands(5, 1000, 1)]
+    seven = [[card_from_id(c) for c in h] for h in _hands(7, 1000, 2)]
+    seven_ids = _hands(7, 1000, 2)
+
+    def run(fn: Callable, hands: Sequence) -> Callable[[int], None]:
+        def go(batch: int) -> None:
+            for i in range(batch):
+                fn(hands[i % len(hands)])
+        return go
+
+    return {
+        "rank_five_evals_per_sec": _rate(run(rank_five, five), seconds, 1000),
+        "rank_seven_evals_per_sec": _rate(run(rank_seven, seven), seconds, 100),
+        "evaluate7_evals_per_sec": _rate(run(evaluate, seven_ids), seconds, 1000),
+    }
+
+def bench_equity(seconds: float, opponents: Sequence[int] = range(1, 10)) -> Dict[str, float]:
+    hole = [48, 45]  # AcKd
+    res = {}
+    for n in opponents:
+        res[f"equity_{n}opp_iters_per_sec"] = _rate(lambda k: estimate_equity(hole, n, iters=k, seed=k), seconds, 500)
+    return res
+
+def bench_api(hands: int = 5, warm_repeats: int = 20) -> Dict[str, float]:
+    # Imported lazily: the app module opens the data tables at import time
+    from app import app, EQUITY_CACHE
+    client = app.test_client()
+    rng = random.Random(3)
+    cold: List[float] = []
+    warm: List[float] = []
+    EQUITY_CACHE.clear()
+    for _ in range(hands):
+        a, b = rng.sample(range(52), 2)
+        ca, cb = card_to_str(card_from_id(a)), card_to_str(card_from_id(b))
+        # An explicit seed skips the precomputed table, so the first call simulates
+        payload = {"a_rank": ca[0], "a_suit": ca[1], "b_rank": cb[0], "b_suit": cb[1], "seed": 7}
+        start = time.perf_counter()
+        client.post("/api/evaluate", json=payload)
+        cold.append((time.perf_counter() - start) * 1000)
+        for _ in range(warm_repeats):
+            start = time.perf_counter()
+            client.post("/api/evaluate", json=payload)
+            warm.append((time.perf_counter() - start) * 1000)
+    return {"api_cold_ms": statistics.median(cold), "api_warm_ms": statistics.median(warm)}
+
+def bench_memory(iters: int = 20000) -> Dict[str, float]:
+    tracemalloc.start()
+    estimate_equity([48, 45], 9, iters=iters, seed=1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    res = {"equity_peak_alloc_kib": peak / 1024}
+    try:
+        import resource
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        res["process_max_rss_kib"] = rss / 1024 if sys.platform == "darwin" else float(rss)
+    except ImportError:
+        pass
+    return res
+
+def run_benchmarks(seconds: float = 1.0, opponents: Sequence[int] = range(1, 10), api: bool = True) -> Dict[str, object]:
+    results: Dict[str, float] = {}
+    results.update(bench_evaluators(seconds))
+    results.update(bench_equity(seconds, opponents))
+    if api:
+        results.update(bench_api())
+    results.update(bench_memory())
+    return {"machine": machine_info(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "seconds": seconds, "results": results}
+
+def compare(baseline: Dict[str, object], current: Dict[str, object], threshold: float = 0.2) -> List[Tuple[str, float, float, float, bool]]:
+    """(metric, baseline, current, relative change, regressed) for every gated metric in both runs."""
+    base, cur = baseline["results"], current["results"]
+    rows = []
+    for name in sorted(set(base) & set(cur)):
+        b, c = float(base[name]), float(cur[name])
+        if b <= 0:
+            continue
+        change = (c - b) / b
+        if name.endswith("_per_sec"):
+            regressed = change < -threshold
+        elif name.endswith("_ms"):
+            regressed = change > threshold
+        else:
+            continue
+        rows.append((name, b, c, change, regressed))
+    return rows
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m trainer.bench", description="Benchmark the evaluator/equity hot paths.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="run the benchmarks and write JSON")
+    r.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    r.add_argument("--seconds", type=float, default=1.0, help="time budget per throughput metric")
+    r.add_argument("--no-api", dest="api", action="store_false", help="skip the Flask latency benchmark")
+    c = sub.add_parser("compare", help="fail if throughput/latency regressed vs a baseline")
+    c.add_argument("baseline", nargs="?", default=DEFAULT_BASELINE)
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "run":
+        report = run_benchmarks(args.seconds, api=args.api)
+        text = json.dumps(report, indent=2, sort_keys=True)
+        if args.out == "-":
+            print(text)
+        else:
+            with open(args.out, "w") as f:
+                f.write(text + "\n")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    for name, b, cur, change, regressed in rows:
+        print(f"{'REGRESSED' if regressed else 'ok':>9}  {name:<32} {b:>14.1f} -> {cur:>14.1f}  ({change:+.1%})")
+    failed = [row for row in rows if row[4]]
+    if failed:
+        print(f"{len(failed)} metric(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 
 from __future__ import annotations
 import random
-from typing import List, Tuple
+from typing import Callable, Iterable, List, Sequence, Tuple
 
 RANK_CHARS = "23456789TJQKA"
 SUIT_CHARS = "cdhs"  # clubs, diamonds, hearts, spades
@@ -32,3 +32,84 @@ def deal(deck: List[Tuple[int,int]], n: int, rng: random.Random) -> List[Tuple[i
         i = rng.randrange(len(deck))
         res.append(deck.pop(i))
     return res
+
+# Compact encoding used by the equity hot loops: card id = 4*(value-2) + suit,
+# so ids 0..51 run in the same order as full_deck().
+def card_id(c: Tuple[int,int]) -> int:
+    return (c[0] - 2) * 4 + c[1]
+
+def card_from_id(i: int) -> Tuple[int,int]:
+    return (i // 4 + 2, i % 4)
+
+class Deck:
+    """Preallocated array of live card ids.
+
+    deal_prefix(k) moves a uniform random k-subset into cards[:k] with partial
+    Fisher-Yates swaps. The array stays a permutation of the live cards, so it
+    is reused across iterations without rebuilding or allocating.
+    """
+    __slots__ = ("cards", "size")
+
+    def __init__(self, dead: Iterable[int] = ()):
+        dead = set(dead)
+        self.cards = [i for i in range(52) if i not in dead]
+        self.size = len(self.cards)
+
+    def deal_prefix(self, k: int, rand: Callable[[], float]) -> None:
+        cards = self.cards
+        n = self.size
+        for j in range(k):
+            r = j + int(rand() * (n - j))
+            cards[j], cards[r] = cards[r], cards[j]
+
+# The 169 preflop hand classes on a 13x13 grid of value indices (value-2):
+# pairs on the diagonal, suited at [hi][lo], offsuit at [lo][hi].
+N_CLASSES = 169
+
+def hand_class(a: int, b: int) -> int:
+    ra, rb = a // 4, b // 4
+    hi, lo = max(ra, rb), min(ra, rb)
+    if a % 4 == b % 4:
+        return hi * 13 + lo
+    return lo * 13 + hi
+
+def class_label(idx: int) -> str:
+    i, j = divmod(idx, 13)
+    if i == j:
+        return RANK_CHARS[i] * 2
+    if i > j:
+        return f"{RANK_CHARS[i]}{RANK_CHARS[j]}s"
+    return f"{RANK_CHARS[j]}{RANK_CHARS[i]}o"
+
+def class_representative(idx: int) -> Tuple[int,int]:
+    # Concrete hole-card ids for a class (suited in clubs, others clubs+diamonds)
+    i, j = divmod(idx, 13)
+    if i > j:
+        return (i * 4, j * 4)
+    return (max(i, j) * 4, min(i, j) * 4 + 1)
+
+def canonicalize(hole: Sequence[int], board: Sequence[int] = ()) -> Tuple[Tuple[int,...], Tuple[int,...]]:
+    """Relabel suits so that suit-isomorphic hands (AsKh / AdKc) get identical ids.
+
+    Suits are ordered by their (hole ranks, board ranks) bitmasks, so the
+    mapping also respects the board once one is known. Returns the hole and
+    board as id tuples sorted high to low.
+    """
+    sig = []
+    for s in range(4):
+        hm = 0
+        bm = 0
+        for c in hole:
+            if c % 4 == s:
+                hm |= 1 << (c // 4)
+        for c in board:
+            if c % 4 == s:
+                bm |= 1 << (c // 4)
+        sig.append((hm, bm))
+    order = sorted(range(4), key=lambda s: sig[s], reverse=True)
+    remap = [0] * 4
+    for new, old in enumerate(order):
+        remap[old] = new
+    h = tuple(sorted(((c // 4) * 4 + remap[c % 4] for c in hole), reverse=True))
+    b = tuple(sorted(((c // 4) * 4 + remap[c % 4] for c in board), reverse=True))
+    return h, b
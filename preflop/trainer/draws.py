@@ -0,0 +1,255 @@
+
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from itertools import combinations
+from multiprocessing import Pool
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .cards import N_CLASSES, class_label, class_representative, hand_class
+from .evaluator import CARD_KEY, CARD_MASK, FLUSH_TABLE, RANK_KEY_MASK, RANK_TABLE, STRAIGHT_HIGH, SUIT_SHIFT
+
+# Exact flop/turn/river probabilities for every hand class, by full enumeration
+# of the boards that can come (19,600 flops, 230,300 flop+turns and 2,118,760
+# full boards from the 50 unseen cards).
+#
+# Fields are computed in groups; the file stores one float32[n_classes] column
+# per field plus a directory, so a build only computes the groups whose fields
+# are missing from an existing file and copies the rest.
+#
+# File layout (little endian):
+#   header     magic "PFDR", format version, n_classes, n_fields
+#   directory  n_fields x (field name, 32 bytes NUL padded; payload offset; crc32)
+#   payload    float32[n_classes] per field
+#
+# Bump FORMAT_VERSION whenever the layout or the meaning of a field changes.
+
+MAGIC = b"PFDR"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+ENTRY = struct.Struct("<32sII")
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "draw_odds.bin")
+
+CATEGORY_NAMES = ("high_card", "pair", "two_pair", "trips", "straight", "flush", "full_house", "quads", "straight_flush")
+
+def _score(key: int, mask: int) -> int:
+    flush = ((key >> SUIT_SHIFT) + 0x3333) & 0x8888
+    if flush:
+        return FLUSH_TABLE[(mask >> (13 * ((flush.bit_length() - 4) >> 2))) & 0x1FFF]
+    return RANK_TABLE[key & RANK_KEY_MASK]
+
+def _made_counts(hole: Sequence[int], n_board: int) -> List[int]:
+    # Boards of n_board cards by the category of hero's best hand
+    rest = [c for c in range(52) if c not in hole]
+    hero_key = CARD_KEY[hole[0]] + CARD_KEY[hole[1]]
+    hero_mask = CARD_MASK[hole[0]] | CARD_MASK[hole[1]]
+    counts = [0] * len(CATEGORY_NAMES)
+    if n_board < 5:
+        for board in combinations(rest, n_board):
+            key, mask = hero_key, hero_mask
+            for c in board:
+                key += CARD_KEY[c]
+                mask |= CARD_MASK[c]
+            counts[_score(key, mask) >> 20] += 1
+        return counts
+    # Full boards: nested loops so the key/mask sums are shared by prefix
+    n = len(rest)
+    keys = [CARD_KEY[c] for c in rest]
+    masks = [CARD_MASK[c] for c in rest]
+    for a in range(n):
+        ka, ma = hero_key + keys[a], hero_mask | masks[a]
+        for b in range(a + 1, n):
+            kb, mb = ka + keys[b], ma | masks[b]
+            for c in range(b + 1, n):
+                kc, mc = kb + keys[c], mb | masks[c]
+                for d in range(c + 1, n):
+                    kd, md = kc + keys[d], mc | masks[d]
+                    for e in range(d + 1, n):
+                        key = kd + keys[e]
+                        flush = ((key >> SUIT_SHIFT) + 0x3333) & 0x8888
+                        if flush:
+                            counts[FLUSH_TABLE[((md | masks[e]) >> (13 * ((flush.bit_length() - 4) >> 2))) & 0x1FFF] >> 20] += 1
+                        else:
+                            counts[RANK_TABLE[key & RANK_KEY_MASK] >> 20] += 1
+    return counts
+
+def _made(street: str, n_board: int) -> Callable[[Sequence[int]], Dict[str, float]]:
+    def compute(hole: Sequence[int]) -> Dict[str, float]:
+        counts = _made_counts(hole, n_board)
+        total = sum(counts)
+        return {f"{street}_{name}": n / total for name, n in zip(CATEGORY_NAMES, counts)}
+    return compute
+
+def _flop_draws(hole: Sequence[int]) -> Dict[str, float]:
+    # Draws on the flop for hands that have not already made them:
+    #   flush_draw     four to a flush            backdoor_flush  three to a flush using a hole card
+    #   oesd           2+ ranks complete a straight (open-ended or double gutter)
+    #   gutshot        exactly one rank completes a straight
+    #   hit            a hole card's rank appears on the flop (set or better for pairs)
+    rest = [c for c in range(52) if c not in hole]
+    hole_suits = {c % 4 for c in hole}
+    hole_ranks = {c // 4 for c in hole}
+    hole_bits = 0
+    for c in hole:
+        hole_bits |= 1 << (c // 4)
+    n = {"flush_draw": 0, "backdoor_flush": 0, "oesd": 0, "gutshot": 0, "hit": 0}
+    total = 0
+    for flop in combinations(rest, 3):
+        total += 1
+        suits = [0] * 4
+        for c in list(hole) + list(flop):
+            suits[c % 4] += 1
+        top = max(suits)
+        if top == 4:
+            n["flush_draw"] += 1
+        elif top == 3 and any(suits[s] == 3 for s in hole_suits):
+            n["backdoor_flush"] += 1
+        bits = hole_bits
+        for c in flop:
+            bits |= 1 << (c // 4)
+        if not STRAIGHT_HIGH[bits]:
+            outs = sum(1 for r in range(13) if not bits >> r & 1 and STRAIGHT_HIGH[bits | 1 << r])
+            if outs >= 2:
+                n["oesd"] += 1
+            elif outs == 1:
+                n["gutshot"] += 1
+        if any(c // 4 in hole_ranks for c in flop):
+            n["hit"] += 1
+    return {f"flop_{k}": v / total for k, v in n.items()}
+
+# group name -> (fields, per-class compute)
+GROUPS: Dict[str, Tuple[Tuple[str, ...], Callable[[Sequence[int]], Dict[str, float]]]] = {
+    "flop_made": (tuple(f"flop_{c}" for c in CATEGORY_NAMES), _made("flop", 3)),
+    "flop_draws": (("flop_flush_draw", "flop_backdoor_flush", "flop_oesd", "flop_gutshot", "flop_hit"), _flop_draws),
+    "turn_made": (tuple(f"turn_{c}" for c in CATEGORY_NAMES), _made("turn", 4)),
+    "river_made": (tuple(f"river_{c}" for c in CATEGORY_NAMES), _made("river", 5)),
+}
+
+class DrawTable:
+    """Read-only, memory-mapped view of a draw-odds file; lookups are O(1)."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"{path}: truncated header")
+        magic, version, n_classes, n_fields = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a draw odds table")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: format version {version}, expected {FORMAT_VERSION}")
+        payload = HEADER.size + ENTRY.size * n_fields
+        if n_classes != N_CLASSES or len(self._mm) != payload + 4 * n_classes * n_fields:
+            raise ValueError(f"{path}: unexpected size")
+        self.offsets: Dict[str, int] = {}
+        for i in range(n_fields):
+            raw, offset, crc = ENTRY.unpack_from(self._mm, HEADER.size + i * ENTRY.size)
+            if offset < payload or offset + 4 * n_classes > len(self._mm):
+                raise ValueError(f"{path}: bad offset for field {i}")
+            if zlib.crc32(self._mm[offset:offset + 4 * n_classes]) != crc:
+                raise ValueError(f"{path}: checksum mismatch")
+            self.offsets[raw.rstrip(b"\0").decode()] = offset
+        self.path = path
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.offsets)
+
+    def lookup(self, hole: List[int], field: str) -> float:
+        # hole holds card ids
+        return struct.unpack_from("<f", self._mm, self.offsets[field] + 4 * hand_class(hole[0], hole[1]))[0]
+
+    def row(self, hole: List[int]) -> Dict[str, float]:
+        return {f: self.lookup(hole, f) for f in self.offsets}
+
+    def column(self, field: str) -> List[float]:
+        return list(struct.unpack_from(f"<{N_CLASSES}f", self._mm, self.offsets[field]))
+
+def open_draw_table(path: str = DEFAULT_PATH) -> Optional[DrawTable]:
+    """DrawTable for path, or None if it is missing or fails validation."""
+    try:
+        return DrawTable(path)
+    except (OSError, ValueError):
+        return None
+
+def _build_class(job: Tuple[int, str]) -> Tuple[int, str, Dict[str, float]]:
+    cls, group = job
+    return cls, group, GROUPS[group][1](class_representative(cls))
+
+def write_table(path: str, columns: Dict[str, Sequence[float]]) -> DrawTable:
+    names = list(columns)
+    payload = HEADER.size + ENTRY.size * len(names)
+    directory = b""
+    body = b""
+    for name in names:
+        data = struct.pack(f"<{N_CLASSES}f", *columns[name])
+        directory += ENTRY.pack(name.encode(), payload + len(body), zlib.crc32(data))
+        body += data
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, N_CLASSES, len(names))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header + directory + body)
+    os.replace(tmp, path)
+    return DrawTable(path)
+
+def build_table(path: str = DEFAULT_PATH, groups: Optional[Sequence[str]] = None, force: bool = False,
+                workers: Optional[int] = None, progress: bool = False) -> DrawTable:
+    """Compute the requested groups (default: all) that path does not already hold and rewrite it."""
+    groups = list(GROUPS) if groups is None else list(groups)
+    unknown = [g for g in groups if g not in GROUPS]
+    if unknown:
+        raise ValueError(f"Unknown groups {unknown}; expected some of {sorted(GROUPS)}")
+    columns: Dict[str, List[float]] = {}
+    existing = open_draw_table(path)
+    if existing is not None:
+        columns = {f: existing.column(f) for f in existing.fields}
+        existing._mm.close()
+    todo = [g for g in groups if force or any(f not in columns for f in GROUPS[g][0])]
+    jobs = [(cls, g) for g in todo for cls in range(N_CLASSES)]
+    for g in todo:
+        for f in GROUPS[g][0]:
+            columns[f] = [0.0] * N_CLASSES
+    if jobs:
+        with Pool(workers) as pool:
+            for done, (cls, g, values) in enumerate(pool.imap_unordered(_build_class, jobs), 1):
+                for f, v in values.items():
+                    columns[f][cls] = v
+                if progress:
+                    print(f"\r{done}/{len(jobs)} {g} {class_label(cls):>4}", end="", file=sys.stderr, flush=True)
+        if progress:
+            print(file=sys.stderr)
+    return write_table(path, columns)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m trainer.draws", description="Build or inspect the exact draw-odds table.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="enumerate boards for every class; only missing groups are computed")
+    b.add_argument("--out", default=DEFAULT_PATH)
+    b.add_argument("--group", action="append", choices=sorted(GROUPS), help="group to build (repeatable; default: all)")
+    b.add_argument("--force", action="store_true", help="recompute groups already in the file")
+    b.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    i = sub.add_parser("info", help="validate a table and list its fields")
+    i.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        start = time.perf_counter()
+        t = build_table(args.out, groups=args.group, force=args.force, workers=args.workers, progress=True)
+        print(f"wrote {t.path} ({N_CLASSES} classes x {len(t.fields)} fields) in {time.perf_counter() - start:.1f}s")
+        return 0
+    try:
+        t = DrawTable(args.path)
+    except (OSError, ValueError) as e:
+        print(f"invalid table: {e}", file=sys.stderr)
+        return 1
+    print(f"{t.path}: format v{FORMAT_VERSION}, {N_CLASSES} classes, fields: {', '.join(t.fields)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,149 @@
 
 from __future__ import annotations
-from typing import List, Tuple
+from dataclasses import dataclass
+from math import sqrt
+from statistics import NormalDist
+from typing import Iterator, List, Optional, Sequence, Tuple
 import random
-from .cards import full_deck, remove_cards, deal
-from .eval7 import rank_seven
-
-def estimate_equity(hole: List[Tuple[int,int]], n_opponents: int = 1, iters: int = 2000, seed: int = 0) -> float:
-    rng = random.Random(seed)
-    wins = 0.0
-    total = 0
-    for i in range(iters):
-        deck = full_deck()
-        remove_cards(deck, hole)
-        # deal opponents
-        villains = []
-        for _ in range(n_opponents):
-            villains.append(deal(deck, 2, rng))
-        # deal board
-        board = deal(deck, 5, rng)
-        hero_rank = rank_seven(hole + board)
-        # compare
-        best = 1
-        winners = 1
-        for v in villains:
-            r = rank_seven(v + board)
-            if r > hero_rank:
-                best = -1
-                winners = 0
-                break
-            elif r == hero_rank:
-                winners += 1
-        if best == 1:
-            wins += 1.0 / winners
-        total += 1
-    return wins / total if total else 0.0
+from .cards import Deck
+from .evaluator import CARD_KEY, CARD_MASK, evaluate_key
+from .recommend import cut_lines
+
+class EquitySampler:
+    """Monte Carlo state for one spot that can be advanced in batches.
+
+    hole and the known board cards are card ids (see cards.card_id). The
+    running sums survive between run() calls, so a sampler can be stopped
+    and resumed without changing the random stream.
+    """
+
+    def __init__(self, hole: Sequence[int], n_opponents: int = 1, seed: int = 0, board: Sequence[int] = ()):
+        self.rand = random.Random(seed).random
+        self.deck = Deck(list(hole) + list(board))
+        h0, h1 = hole
+        self.hero_key = CARD_KEY[h0] + CARD_KEY[h1]
+        self.hero_mask = CARD_MASK[h0] | CARD_MASK[h1]
+        self.known_key = 0
+        self.known_mask = 0
+        for c in board:
+            self.known_key += CARD_KEY[c]
+            self.known_mask |= CARD_MASK[c]
+        self.nv = 2 * n_opponents
+        self.need = self.nv + 5 - len(board)
+        self.n = 0
+        self.wins = 0.0
+        self.wins_sq = 0.0
+
+    def run(self, iters: int) -> None:
+        deck = self.deck
+        cards = deck.cards
+        rand = self.rand
+        hero_key, hero_mask = self.hero_key, self.hero_mask
+        known_key, known_mask = self.known_key, self.known_mask
+        nv, need = self.nv, self.need
+        wins = 0.0
+        wins_sq = 0.0
+        for i in range(iters):
+            # villains in cards[:nv], rest of the board in cards[nv:need]
+            deck.deal_prefix(need, rand)
+            board_key = known_key
+            board_mask = known_mask
+            for j in range(nv, need):
+                c = cards[j]
+                board_key += CARD_KEY[c]
+                board_mask |= CARD_MASK[c]
+            hero_rank = evaluate_key(hero_key + board_key, hero_mask | board_mask)
+            # compare
+            winners = 1
+            for j in range(0, nv, 2):
+                a = cards[j]
+                b = cards[j + 1]
+                r = evaluate_key(CARD_KEY[a] + CARD_KEY[b] + board_key, CARD_MASK[a] | CARD_MASK[b] | board_mask)
+                if r > hero_rank:
+                    winners = 0
+                    break
+                elif r == hero_rank:
+                    winners += 1
+            if winners:
+                share = 1.0 / winners
+                wins += share
+                wins_sq += share * share
+        self.n += iters
+        self.wins += wins
+        self.wins_sq += wins_sq
+
+    @property
+    def equity(self) -> float:
+        return self.wins / self.n if self.n else 0.0
+
+    @property
+    def stderr(self) -> float:
+        n = self.n
+        if n < 2:
+            return float("inf")
+        mean = self.wins / n
+        var = max(0.0, (self.wins_sq / n - mean * mean) * n / (n - 1))
+        return sqrt(var / n)
+
+@dataclass
+class EquityProgress:
+    iters: int
+    equity: float
+    stderr: float
+    done: bool
+
+def iter_equity(hole: List[int], n_opponents: int = 1, iters: int = 2000, seed: int = 0, board: Sequence[int] = (),
+                every: int = 1000) -> Iterator[EquityProgress]:
+    """Run the simulation in steps of `every` iterations, yielding the running
+    estimate after each; the last update has done=True. Sampling only happens
+    while the consumer asks for the next update, so closing the generator (or
+    just dropping it) stops the work at the current step.
+    """
+    sampler = EquitySampler(hole, n_opponents, seed, board)
+    while sampler.n < iters:
+        sampler.run(min(every, iters - sampler.n))
+        yield EquityProgress(sampler.n, sampler.equity, sampler.stderr, sampler.n >= iters)
+
+def estimate_equity(hole: List[int], n_opponents: int = 1, iters: int = 2000, seed: int = 0, board: Sequence[int] = ()) -> float:
+    # hole and the known board cards are card ids (see cards.card_id)
+    if iters <= 0:
+        return 0.0
+    for progress in iter_equity(hole, n_opponents, iters, seed, board, every=iters):
+        pass
+    return progress.equity
+
+@dataclass
+class AdaptiveEstimate:
+    equity: float
+    stderr: float
+    ci_low: float
+    ci_high: float
+    iters: int
+    stopped_by: str  # 'target_se', 'decision', or 'budget'
+
+def estimate_equity_adaptive(hole: List[int], n_opponents: int = 1, max_iters: int = 200000, seed: int = 0,
+                             board: Sequence[int] = (), target_se: Optional[float] = None,
+                             confidence: Optional[float] = None, batch: int = 500) -> AdaptiveEstimate:
+    """Sample in batches until the standard error reaches target_se, or until the
+    confidence interval sits entirely between two of recommend.cut_lines (so more
+    samples cannot change the action), or until max_iters is spent.
+    """
+    z = NormalDist().inv_cdf(0.5 + (confidence if confidence is not None else 0.95) / 2)
+    cuts: Tuple[float, ...] = cut_lines(n_opponents)
+    sampler = EquitySampler(hole, n_opponents, seed, board)
+    stopped_by = "budget"
+    while sampler.n < max_iters:
+        sampler.run(min(batch, max_iters - sampler.n))
+        se = sampler.stderr
+        # A zero-variance first batch (e.g. all wins) says little; wait for two
+        if sampler.n < 2 * batch:
+            continue
+        if target_se is not None and se <= target_se:
+            stopped_by = "target_se"
+            break
+        lo, hi = sampler.equity - z * se, sampler.equity + z * se
+        if confidence is not None and not any(lo <= cut <= hi for cut in cuts):
+            stopped_by = "decision"
+            break
+    eq, se = sampler.equity, sampler.stderr
+    return AdaptiveEstimate(eq, se, max(0.0, eq - z * se), min(1.0, eq + z * se), sampler.n, stopped_by)
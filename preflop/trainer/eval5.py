@@ -1,6 +1,8 @@
 
 from __future__ import annotations
 from typing import List, Tuple
+from .cards import card_id
+from .evaluator import evaluate
 
 # Hand categories
 # 8 = Straight Flush, 7 = Four of a Kind, 6 = Full House, 5 = Flush, 4 = Straight,
@@ -61,12 +63,9 @@ def rank_five(cards: List[Tuple[int,int]]) -> Tuple[int, List[int]]:
     return (0, sorted(vs, reverse=True))
 
 def compare_5(a: List[Tuple[int,int]], b: List[Tuple[int,int]]) -> int:
-    ra = rank_five(a)
-    rb = rank_five(b)
-    if ra[0] != rb[0]:
-        return 1 if ra[0] > rb[0] else -1
-    # compare tiebreakers lexicographically
-    for x,y in zip(ra[1], rb[1]):
-        if x != y:
-            return 1 if x > y else -1
+    # Table lookup; scores order exactly like rank_five tuples
+    ra = evaluate([card_id(c) for c in a])
+    rb = evaluate([card_id(c) for c in b])
+    if ra != rb:
+        return 1 if ra > rb else -1
     return 0
@@ -5,7 +5,8 @@ from itertools import combinations
 from .eval5 import rank_five
 
 def rank_seven(cards: List[Tuple[int,int]]) -> Tuple[int, List[int]]:
-    # Return best 5-card rank tuple among 7 cards
+    # Return best 5-card rank tuple among 7 cards.
+    # Reference implementation; hot paths use evaluator.evaluate instead.
     best = None
     for combo in combinations(cards, 5):
         r = rank_five(list(combo))
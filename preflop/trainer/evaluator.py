@@ -0,0 +1,146 @@
+
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+from .cards import card_id
+
+# Table-driven evaluator for 5-, 6- and 7-card hands.
+#
+# A hand's score is a single int that orders exactly like the
+# (category, tiebreakers) tuples returned by eval5.rank_five:
+#     category << 20 | t0 << 16 | t1 << 12 | t2 << 8 | t3 << 4 | t4
+#
+# Cards are ids from cards.card_id. Each card contributes 5**(value-2) to the
+# low 32 bits of its key (a perfect hash of the rank multiset, since no rank
+# appears more than 4 times) and 1 to its suit's nibble above bit 32; its mask
+# bit sits at 13*suit + value-2.  Keys add and masks OR, so callers can build
+# shared board state once and extend it per player.  Non-flush hands are one
+# dict lookup on the rank key; flushes are one list lookup on the 13-bit
+# slice of the mask for the flush suit.
+
+SUIT_SHIFT = 32
+RANK_KEY_MASK = (1 << SUIT_SHIFT) - 1
+WHEEL = (1 << 12) | 0xF  # A,5,4,3,2
+
+def encode_rank(rank: Tuple[int, List[int]]) -> int:
+    cat, tiebreak = rank
+    v = cat
+    for i in range(5):
+        v = (v << 4) | (tiebreak[i] if i < len(tiebreak) else 0)
+    return v
+
+def _straight_high(mask: int) -> int:
+    for high in range(14, 5, -1):
+        window = 0x1F << (high - 6)
+        if mask & window == window:
+            return high
+    if mask & WHEEL == WHEEL:
+        return 5
+    return 0
+
+def _top_values(mask: int, n: int) -> List[int]:
+    res = []
+    for v in range(14, 1, -1):
+        if mask & (1 << (v - 2)):
+            res.append(v)
+            if len(res) == n:
+                break
+    return res
+
+def _best_from_counts(counts: Sequence[int]) -> int:
+    # Best non-flush hand for a rank multiset; counts[i] is the count of value i+2.
+    desc: List[int] = []
+    quads: List[int] = []
+    trips: List[int] = []
+    pairs: List[int] = []
+    mask = 0
+    for v in range(14, 1, -1):
+        n = counts[v - 2]
+        if not n:
+            continue
+        desc.append(v)
+        mask |= 1 << (v - 2)
+        if n == 4:
+            quads.append(v)
+        elif n == 3:
+            trips.append(v)
+        elif n == 2:
+            pairs.append(v)
+    if quads:
+        q = quads[0]
+        return encode_rank((7, [q, max(v for v in desc if v != q)]))
+    if trips and (len(trips) > 1 or pairs):
+        t = trips[0]
+        return encode_rank((6, [t, max(trips[1:] + pairs)]))
+    high = STRAIGHT_HIGH[mask]
+    if high:
+        return encode_rank((4, [high]))
+    if trips:
+        t = trips[0]
+        return encode_rank((3, [t] + [v for v in desc if v != t][:2]))
+    if len(pairs) >= 2:
+        p1, p2 = pairs[0], pairs[1]
+        return encode_rank((2, [p1, p2, max(v for v in desc if v != p1 and v != p2)]))
+    if pairs:
+        p = pairs[0]
+        return encode_rank((1, [p] + [v for v in desc if v != p][:3]))
+    return encode_rank((0, desc[:5]))
+
+def _build_flush_table() -> List[int]:
+    table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count("1") < 5:
+            continue
+        high = STRAIGHT_HIGH[mask]
+        if high:
+            table[mask] = encode_rank((8, [high]))
+        else:
+            table[mask] = encode_rank((5, _top_values(mask, 5)))
+    return table
+
+def _build_rank_table() -> Dict[int, int]:
+    table: Dict[int, int] = {}
+    counts = [0] * 13
+    pow5 = [5 ** i for i in range(13)]
+
+    def walk(i: int, n: int, key: int) -> None:
+        if i == 13:
+            if n >= 5:
+                table[key] = _best_from_counts(counts)
+            return
+        for c in range(min(4, 7 - n) + 1):
+            counts[i] = c
+            walk(i + 1, n + c, key + c * pow5[i])
+        counts[i] = 0
+
+    walk(0, 0, 0)
+    return table
+
+STRAIGHT_HIGH: List[int] = [_straight_high(m) for m in range(1 << 13)]
+FLUSH_TABLE: List[int] = _build_flush_table()
+RANK_TABLE: Dict[int, int] = _build_rank_table()
+CARD_KEY: List[int] = [0] * 52
+CARD_MASK: List[int] = [0] * 52
+for _v in range(2, 15):
+    for _u in range(4):
+        CARD_KEY[card_id((_v, _u))] = 5 ** (_v - 2) + (1 << (SUIT_SHIFT + 4 * _u))
+        CARD_MASK[card_id((_v, _u))] = 1 << (13 * _u + _v - 2)
+
+def evaluate_key(key: int, mask: int) -> int:
+    """Score from a summed CARD_KEY and OR-ed CARD_MASK of 5 to 7 cards."""
+    flush = ((key >> SUIT_SHIFT) + 0x3333) & 0x8888
+    if flush:
+        suit = (flush.bit_length() - 4) >> 2
+        return FLUSH_TABLE[(mask >> (13 * suit)) & 0x1FFF]
+    return RANK_TABLE[key & RANK_KEY_MASK]
+
+def evaluate(cards: Sequence[int]) -> int:
+    """Score 5 to 7 card ids; a higher int is a stronger hand."""
+    key = 0
+    mask = 0
+    for c in cards:
+        key += CARD_KEY[c]
+        mask |= CARD_MASK[c]
+    return evaluate_key(key, mask)
+
+def category(score: int) -> int:
+    return score >> 20
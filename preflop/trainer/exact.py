@@ -0,0 +1,99 @@
+
+from __future__ import annotations
+from math import comb
+from typing import Dict, List, Sequence
+from .evaluator import CARD_KEY, CARD_MASK, FLUSH_TABLE, RANK_TABLE, RANK_KEY_MASK, SUIT_SHIFT, evaluate_key
+
+# Exact heads-up equity by walking every (runout, villain hand) pair.
+# Board/runout state is summed once per runout and the villain's first card
+# once per inner loop, so the innermost step is a key add plus one table
+# lookup (the flush test is skipped entirely when no suit can reach five).
+
+DEFAULT_MAX_OUTCOMES = 1_200_000  # a known flop is 1081 runouts x 990 villain hands
+
+def outcome_count(n_board: int, n_opponents: int = 1) -> int:
+    """Number of equally likely (runout, villain hands) outcomes to enumerate."""
+    unseen = 52 - 2 - n_board
+    total = comb(unseen, 5 - n_board)
+    unseen -= 5 - n_board
+    for _ in range(n_opponents):
+        total *= comb(unseen, 2)
+        unseen -= 2
+    return total
+
+def can_enumerate(n_board: int, n_opponents: int, max_outcomes: int = DEFAULT_MAX_OUTCOMES) -> bool:
+    return n_opponents == 1 and outcome_count(n_board, n_opponents) <= max_outcomes
+
+def _max_suit_count(cards: Sequence[int]) -> int:
+    counts = [0] * 4
+    for c in cards:
+        counts[c % 4] += 1
+    return max(counts)
+
+def enumerate_equity(hole: Sequence[int], board: Sequence[int] = ()) -> Dict[str, float]:
+    """Exact heads-up win/tie/loss fractions for hole (card ids) on a partial board."""
+    if len(board) > 5:
+        raise ValueError("board has more than 5 cards")
+    dead = set(hole) | set(board)
+    if len(dead) != len(hole) + len(board):
+        raise ValueError("duplicate cards")
+    rest = [c for c in range(52) if c not in dead]
+    hero_key = sum(CARD_KEY[c] for c in hole)
+    hero_mask = 0
+    for c in hole:
+        hero_mask |= CARD_MASK[c]
+    board_key = sum(CARD_KEY[c] for c in board)
+    board_mask = 0
+    for c in board:
+        board_mask |= CARD_MASK[c]
+    rank_table = RANK_TABLE
+    flush_table = FLUSH_TABLE
+    ck = CARD_KEY
+    cm = CARD_MASK
+    wins = ties = losses = 0
+
+    def runouts(start: int, need: int, key: int, mask: int, used: List[int]):
+        if need == 0:
+            yield key, mask, used
+            return
+        for i in range(start, len(rest)):
+            c = rest[i]
+            used.append(c)
+            yield from runouts(i + 1, need - 1, key + ck[c], mask | cm[c], used)
+            used.pop()
+
+    for bkey, bmask, used in runouts(0, 5 - len(board), board_key, board_mask, []):
+        hero = evaluate_key(hero_key + bkey, hero_mask | bmask)
+        live = [c for c in rest if c not in used]
+        # A villain flush needs at least three board cards of one suit
+        flush_possible = _max_suit_count(list(board) + used) >= 3
+        n = len(live)
+        for i in range(n - 1):
+            a = live[i]
+            akey = bkey + ck[a]
+            amask = bmask | cm[a]
+            for j in range(i + 1, n):
+                b = live[j]
+                key = akey + ck[b]
+                if flush_possible:
+                    f = ((key >> SUIT_SHIFT) + 0x3333) & 0x8888
+                    if f:
+                        v = flush_table[((amask | cm[b]) >> (13 * ((f.bit_length() - 4) >> 2))) & 0x1FFF]
+                    else:
+                        v = rank_table[key & RANK_KEY_MASK]
+                else:
+                    v = rank_table[key & RANK_KEY_MASK]
+                if v < hero:
+                    wins += 1
+                elif v == hero:
+                    ties += 1
+                else:
+                    losses += 1
+    total = wins + ties + losses
+    return {
+        "win": wins / total,
+        "tie": ties / total,
+        "loss": losses / total,
+        "equity": (wins + ties / 2) / total,
+        "outcomes": total,
+    }
@@ -0,0 +1,94 @@
+
+from __future__ import annotations
+import atexit
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from .equity import estimate_equity
+
+# Parallel Monte Carlo over a persistent process pool.
+#
+# Iterations are cut into fixed CHUNK-sized pieces and chunk i always uses the
+# seed derived from (base seed, i), so the merged result depends only on
+# (hand, opponents, iters, seed, inner engine) -- never on the worker count.
+
+CHUNK = 65536
+
+def chunk_seed(seed: int, index: int) -> int:
+    # Hash-derived so neighbouring base seeds do not share chunk streams
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def plan_chunks(iters: int, seed: int) -> List[Tuple[int, int]]:
+    """(iterations, seed) per chunk."""
+    return [(min(CHUNK, iters - start), chunk_seed(seed, i)) for i, start in enumerate(range(0, iters, CHUNK))]
+
+def _inner_fn(inner: str):
+    if inner == "scalar":
+        return estimate_equity
+    from .vectorized import estimate_equity_vectorized
+    return estimate_equity_vectorized
+
+def resolve_inner(inner: str = "auto") -> str:
+    if inner != "auto":
+        return inner
+    try:
+        import numpy  # noqa: F401
+        return "vectorized"
+    except ImportError:
+        return "scalar"
+
+def _run_chunk(job: Tuple[Tuple[int, ...], int, int, int, Tuple[int, ...], str]) -> float:
+    hole, n_opponents, iters, seed, board, inner = job
+    # Win share (not the fraction) so chunks of different sizes merge exactly
+    return _inner_fn(inner)(list(hole), n_opponents=n_opponents, iters=iters, seed=seed, board=board) * iters
+
+class EquityPool:
+    """Process pool reused across requests; workers=0 runs chunks in-process."""
+
+    def __init__(self, workers: Optional[int] = None, inner: str = "auto"):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.inner = resolve_inner(inner)
+        self._executor = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+        self.pids: set = set()  # worker processes seen by start()
+
+    def estimate(self, hole: Sequence[int], n_opponents: int = 1, iters: int = 1_000_000, seed: int = 0,
+                 board: Sequence[int] = ()) -> float:
+        if iters <= 0:
+            return 0.0
+        jobs = [(tuple(hole), n_opponents, n, s, tuple(board), self.inner) for n, s in plan_chunks(iters, seed)]
+        if self._executor is None:
+            shares = list(map(_run_chunk, jobs))
+        else:
+            shares = list(self._executor.map(_run_chunk, jobs))
+        # map() preserves chunk order, so the float sum is identical for any worker count
+        return sum(shares) / iters
+
+    def start(self) -> "EquityPool":
+        """Spawn the worker processes now rather than on the first estimate."""
+        if self._executor is not None:
+            self.pids = set(self._executor.map(_ready, range(self.workers)))
+        return self
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+def _ready(_: int) -> int:
+    return os.getpid()
+
+_POOL: Optional[EquityPool] = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool(workers: Optional[int] = None) -> EquityPool:
+    """Process-wide pool, created on first use and shut down at exit."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = EquityPool(workers)
+            atexit.register(_POOL.close)
+        return _POOL
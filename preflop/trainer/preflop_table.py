@@ -0,0 +1,136 @@
+
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+from .cards import N_CLASSES, hand_class, class_label, class_representative
+from .equity import estimate_equity
+
+# Precomputed preflop equity for every hand class vs 1..MAX_OPPONENTS random hands.
+#
+# File layout (little endian):
+#   header  magic "PFEQ", format version, n_classes, max_opponents, reserved,
+#           iters per cell, base seed, crc32 of the payload
+#   payload float32[n_classes][max_opponents]
+#
+# Bump FORMAT_VERSION whenever the layout or the meaning of a cell changes;
+# readers reject files with another version rather than misread them.
+
+MAGIC = b"PFEQ"
+FORMAT_VERSION = 1
+MAX_OPPONENTS = 9
+HEADER = struct.Struct("<4sHHHHIII")
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "preflop_equity.bin")
+
+class EquityTable:
+    """Read-only, memory-mapped view of a table file; lookups are O(1)."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"{path}: truncated header")
+        magic, version, n_classes, max_opps, _, iters, seed, crc = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a preflop equity table")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: format version {version}, expected {FORMAT_VERSION}")
+        if n_classes != N_CLASSES or len(self._mm) != HEADER.size + 4 * n_classes * max_opps:
+            raise ValueError(f"{path}: unexpected size")
+        if zlib.crc32(self._mm[HEADER.size:]) != crc:
+            raise ValueError(f"{path}: checksum mismatch")
+        self.path = path
+        self.max_opponents = max_opps
+        self.iters = iters
+        self.seed = seed
+        self.crc = crc
+
+    def covers(self, n_opponents: int) -> bool:
+        return 1 <= n_opponents <= self.max_opponents
+
+    def lookup(self, hole: List[int], n_opponents: int) -> float:
+        # hole holds card ids
+        cls = hand_class(hole[0], hole[1])
+        offset = HEADER.size + 4 * (cls * self.max_opponents + n_opponents - 1)
+        return struct.unpack_from("<f", self._mm, offset)[0]
+
+def open_table(path: str = DEFAULT_PATH) -> Optional[EquityTable]:
+    """EquityTable for path, or None if it is missing or fails validation."""
+    try:
+        return EquityTable(path)
+    except (OSError, ValueError):
+        return None
+
+def _equity_fn():
+    try:
+        from .vectorized import estimate_equity_vectorized
+        return estimate_equity_vectorized
+    except ImportError:
+        return estimate_equity
+
+def _cell_seed(seed: int, cls: int, n_opponents: int) -> int:
+    # Fixed per cell, so a table is reproducible whatever the worker count
+    return (seed << 16) | (cls << 4) | n_opponents
+
+def _build_class(job: Tuple[int, int, int, int]) -> Tuple[int, List[float]]:
+    cls, max_opps, iters, seed = job
+    fn = _equity_fn()
+    hole = list(class_representative(cls))
+    return cls, [fn(hole, n, iters=iters, seed=_cell_seed(seed, cls, n)) for n in range(1, max_opps + 1)]
+
+def build_table(path: str = DEFAULT_PATH, iters: int = 100000, seed: int = 0, workers: Optional[int] = None,
+                max_opponents: int = MAX_OPPONENTS, progress: bool = False) -> EquityTable:
+    jobs = [(cls, max_opponents, iters, seed) for cls in range(N_CLASSES)]
+    cells = [0.0] * (N_CLASSES * max_opponents)
+    with Pool(workers) as pool:
+        for done, (cls, values) in enumerate(pool.imap_unordered(_build_class, jobs), 1):
+            cells[cls * max_opponents:(cls + 1) * max_opponents] = values
+            if progress:
+                print(f"\r{done}/{N_CLASSES} {class_label(cls):>4}", end="", file=sys.stderr, flush=True)
+    if progress:
+        print(file=sys.stderr)
+    payload = struct.pack(f"<{len(cells)}f", *cells)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, N_CLASSES, max_opponents, 0, iters, seed, zlib.crc32(payload))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header + payload)
+    os.replace(tmp, path)
+    return EquityTable(path)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m trainer.preflop_table", description="Build or inspect the precomputed preflop equity table.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="simulate every class x opponent count and write the table")
+    b.add_argument("--out", default=DEFAULT_PATH)
+    b.add_argument("--iters", type=int, default=100000, help="deals per cell")
+    b.add_argument("--seed", type=int, default=0)
+    b.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    b.add_argument("--max-opponents", type=int, default=MAX_OPPONENTS)
+    i = sub.add_parser("info", help="validate a table and print its header")
+    i.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        start = time.perf_counter()
+        t = build_table(args.out, iters=args.iters, seed=args.seed, workers=args.workers,
+                        max_opponents=args.max_opponents, progress=True)
+        print(f"wrote {t.path} ({N_CLASSES}x{t.max_opponents}, {t.iters} iters/cell, crc32 {t.crc:08x}) in {time.perf_counter() - start:.1f}s")
+        return 0
+    try:
+        t = EquityTable(args.path)
+    except (OSError, ValueError) as e:
+        print(f"invalid table: {e}", file=sys.stderr)
+        return 1
+    print(f"{t.path}: format v{FORMAT_VERSION}, {N_CLASSES}x{t.max_opponents}, {t.iters} iters/cell, seed {t.seed}, crc32 {t.crc:08x}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+
+from __future__ import annotations
+import random
+from bisect import bisect_right
+from itertools import accumulate, combinations
+from math import comb, sqrt
+from typing import Dict, List, Sequence, Tuple
+from .evaluator import CARD_KEY, CARD_MASK, evaluate_key
+from .ranges import Combo
+
+# Range-vs-range equity. The joint law of (hero combo, villain combo) is
+#     P(h, v) ~ w_h * w_v * [h, v and the board share no card]
+# so card removal is handled by building the compatible pair list once and
+# sampling pairs from its cumulative weights (no rejection), then dealing the
+# rest of the board from the cards neither player holds. Small spaces (e.g. a
+# known turn or river) are enumerated exactly instead.
+
+DEFAULT_MAX_OUTCOMES = 500_000
+
+def compatible_pairs(hero: Dict[Combo, float], villain: Dict[Combo, float],
+                     board: Sequence[int] = ()) -> List[Tuple[Combo, Combo, float]]:
+    dead = 0
+    for c in board:
+        dead |= 1 << c
+    h_live = [(h, w, (1 << h[0]) | (1 << h[1])) for h, w in hero.items() if not dead >> h[0] & 1 and not dead >> h[1] & 1]
+    v_live = [(v, w, (1 << v[0]) | (1 << v[1])) for v, w in villain.items() if not dead >> v[0] & 1 and not dead >> v[1] & 1]
+    return [(h, v, hw * vw) for h, hw, hb in h_live for v, vw, vb in v_live if not hb & vb]
+
+def _showdown(h: Combo, v: Combo, key: int, mask: int) -> float:
+    hero = evaluate_key(key + CARD_KEY[h[0]] + CARD_KEY[h[1]], mask | CARD_MASK[h[0]] | CARD_MASK[h[1]])
+    vill = evaluate_key(key + CARD_KEY[v[0]] + CARD_KEY[v[1]], mask | CARD_MASK[v[0]] | CARD_MASK[v[1]])
+    return 1.0 if hero > vill else 0.5 if hero == vill else 0.0
+
+def range_equity(hero: Dict[Combo, float], villain: Dict[Combo, float], board: Sequence[int] = (),
+                 iters: int = 20000, seed: int = 0, max_outcomes: int = DEFAULT_MAX_OUTCOMES) -> Dict[str, float]:
+    """Hero's equity share vs villain; exact when pairs x runouts <= max_outcomes."""
+    pairs = compatible_pairs(hero, villain, board)
+    if not pairs:
+        raise ValueError("No compatible hero/villain combos")
+    known_key = sum(CARD_KEY[c] for c in board)
+    known_mask = 0
+    for c in board:
+        known_mask |= CARD_MASK[c]
+    need = 5 - len(board)
+    runouts = comb(52 - len(board) - 4, need)
+    base = {
+        "hero_combos": len({h for h, _, _ in pairs}),
+        "villain_combos": len({v for _, v, _ in pairs}),
+        "pairs": len(pairs),
+    }
+
+    if len(pairs) * runouts <= max_outcomes:
+        total_w = 0.0
+        won = 0.0
+        for h, v, w in pairs:
+            used = set(h) | set(v) | set(board)
+            rest = [c for c in range(52) if c not in used]
+            for run in combinations(rest, need):
+                key = known_key
+                mask = known_mask
+                for c in run:
+                    key += CARD_KEY[c]
+                    mask |= CARD_MASK[c]
+                won += w * _showdown(h, v, key, mask)
+            total_w += w * runouts
+        return dict(base, equity=won / total_w, stderr=0.0, method="exact", iters=len(pairs) * runouts)
+
+    rand = random.Random(seed).random
+    cum = list(accumulate(w for _, _, w in pairs))
+    total = cum[-1]
+    cards = [c for c in range(52) if c not in set(board)]
+    n = len(cards)
+    won = won_sq = 0.0
+    for _ in range(iters):
+        h, v, _ = pairs[min(bisect_right(cum, rand() * total), len(pairs) - 1)]
+        held = (1 << h[0]) | (1 << h[1]) | (1 << v[0]) | (1 << v[1])
+        key = known_key
+        mask = known_mask
+        dealt = 0
+        # Partial Fisher-Yates over the non-board cards, skipping the four held cards
+        while dealt < need:
+            j = dealt + int(rand() * (n - dealt))
+            c = cards[j]
+            cards[dealt], cards[j] = c, cards[dealt]
+            if held >> c & 1:
+                continue
+            key += CARD_KEY[c]
+            mask |= CARD_MASK[c]
+            dealt += 1
+        s = _showdown(h, v, key, mask)
+        won += s
+        won_sq += s * s
+    mean = won / iters
+    var = max(0.0, won_sq / iters - mean * mean)
+    return dict(base, equity=mean, stderr=sqrt(var / iters), method="sample", iters=iters)
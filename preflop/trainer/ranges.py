@@ -0,0 +1,89 @@
+
+from __future__ import annotations
+import re
+from typing import Dict, List, Tuple
+from .cards import RANK_CHARS, SUIT_CHARS, card_id
+
+# Range notation -> weighted combo dict.
+#
+#   "TT+"       pairs TT..AA          "22-55"      pairs 22..55
+#   "AQs+"      AQs, AKs              "A2s-A5s"    A2s..A5s
+#   "AK"        AKs and AKo           "AsKh"       one specific combo
+#   "KQo:0.5"   any token with a weight (default 1.0); later tokens override
+#
+# Combos are (high id, low id) tuples of card ids.
+
+Combo = Tuple[int, int]
+
+_TOKEN = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)(\+?)$", re.I)
+_SPAN = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)-([2-9TJQKA])([2-9TJQKA])([so]?)$", re.I)
+_EXACT = re.compile(r"^([2-9TJQKA][cdhs])([2-9TJQKA][cdhs])$", re.I)
+
+def _combo(a: int, b: int) -> Combo:
+    return (a, b) if a > b else (b, a)
+
+def class_combos(hi: int, lo: int, kind: str) -> List[Combo]:
+    """Concrete combos for value indices hi >= lo (0 = deuce); kind is 's', 'o' or ''."""
+    if hi == lo:
+        return [_combo(hi * 4 + s1, hi * 4 + s2) for s1 in range(4) for s2 in range(s1 + 1, 4)]
+    res = []
+    for s1 in range(4):
+        for s2 in range(4):
+            if (s1 == s2 and kind != 'o') or (s1 != s2 and kind != 's'):
+                res.append(_combo(hi * 4 + s1, lo * 4 + s2))
+    return res
+
+def _ranks(a: str, b: str) -> Tuple[int, int]:
+    ia, ib = RANK_CHARS.index(a.upper()), RANK_CHARS.index(b.upper())
+    return max(ia, ib), min(ia, ib)
+
+def _expand(token: str) -> List[Combo]:
+    m = _EXACT.match(token)
+    if m:
+        a, b = (card_id((RANK_CHARS.index(x[0].upper()) + 2, SUIT_CHARS.index(x[1].lower()))) for x in m.groups())
+        if a == b:
+            raise ValueError(f"Duplicate card in {token!r}")
+        return [_combo(a, b)]
+    m = _SPAN.match(token)
+    if m:
+        hi1, lo1 = _ranks(m.group(1), m.group(2))
+        hi2, lo2 = _ranks(m.group(4), m.group(5))
+        kind = m.group(3).lower()
+        if kind != m.group(6).lower():
+            raise ValueError(f"Mismatched suitedness in {token!r}")
+        res: List[Combo] = []
+        if hi1 == lo1 and hi2 == lo2:
+            for r in range(min(hi1, hi2), max(hi1, hi2) + 1):
+                res += class_combos(r, r, '')
+            return res
+        if hi1 != hi2 or hi1 == lo1 or hi2 == lo2:
+            raise ValueError(f"Span {token!r} must keep the top card fixed")
+        for lo in range(min(lo1, lo2), max(lo1, lo2) + 1):
+            res += class_combos(hi1, lo, kind)
+        return res
+    m = _TOKEN.match(token)
+    if not m:
+        raise ValueError(f"Cannot parse range token {token!r}")
+    hi, lo = _ranks(m.group(1), m.group(2))
+    kind, plus = m.group(3).lower(), m.group(4)
+    if hi == lo:
+        if kind:
+            raise ValueError(f"Pairs take no suitedness: {token!r}")
+        tops = range(hi, 13) if plus else [hi]
+        return [c for r in tops for c in class_combos(r, r, '')]
+    los = range(lo, hi) if plus else [lo]
+    return [c for l in los for c in class_combos(hi, l, kind)]
+
+def parse_range(text: str) -> Dict[Combo, float]:
+    """Weighted combos for a comma/space separated range string."""
+    combos: Dict[Combo, float] = {}
+    for raw in re.split(r"[,\s]+", text.strip()):
+        if not raw:
+            continue
+        token, _, weight = raw.partition(":")
+        w = float(weight) if weight else 1.0
+        if w < 0:
+            raise ValueError(f"Negative weight in {raw!r}")
+        for c in _expand(token):
+            combos[c] = w
+    return {c: w for c, w in combos.items() if w > 0}
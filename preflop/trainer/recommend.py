@@ -1,12 +1,17 @@
 
 from __future__ import annotations
-from typing import Dict
-def recommend_action(equity: float, n_opponents: int) -> Dict[str, str]:
+from typing import Dict, Tuple
+
+def cut_lines(n_opponents: int) -> Tuple[float, float]:
+    """(call_cut, raise_cut) equity thresholds used by recommend_action."""
     # Baseline all-in break-even equity ~ 1/(n+1).
     thresh = 1.0 / (n_opponents + 1)
     # Add margins since we're not modeling position/stack/bets; give 5% cushion
-    raise_cut = thresh + 0.06
-    call_cut = thresh - 0.02
+    return thresh - 0.02, thresh + 0.06
+
+def recommend_action(equity: float, n_opponents: int) -> Dict[str, str]:
+    thresh = 1.0 / (n_opponents + 1)
+    call_cut, raise_cut = cut_lines(n_opponents)
     if equity >= raise_cut:
         action = "RAISE"
         note = f"Equity {equity:.1%} ≥ raise-cut {raise_cut:.1%} vs {n_opponents} opponents"
@@ -0,0 +1,288 @@
+
+from __future__ import annotations
+import argparse
+import random
+import sys
+from dataclasses import dataclass
+from math import comb, sqrt
+from statistics import pstdev, variance
+from typing import Dict, List, Optional, Sequence, Tuple
+from .cards import card_from_str, card_id
+from .equity import estimate_equity
+from .evaluator import CARD_KEY, CARD_MASK, evaluate_key
+from .odds import flop_set_prob_pocket_pair, flop_pair_or_better_unpaired, river_flush_prob_two_suited
+
+# Variance-reduced preflop equity (hero vs n random hands, no known board).
+#
+# Stratified boards: unseen cards split into the hero's high rank, low rank,
+# suit (suited hands only; disjoint from the ranks) and the rest. A board's
+# cell is its count vector over those groups and has an exact multivariate
+# hypergeometric probability; cells are grouped into strata by texture relative
+# to the hero (pairs hit per hole card, capped at 2; 3+ to the flush or not).
+# Samples are allocated proportionally, boards drawn inside a stratum by first
+# picking a cell by weight, and villains dealt uniformly from what is left.
+#
+# Control variates, all with exact means:
+#   * hero flops a pair/set and hero has a flush by river (odds.py), or their
+#     per-cell means when stratified;
+#   * given the board, villain pairs held, board pairs hit and flushes made,
+#     since each villain hand is a uniform 2-card draw from the 45 left.
+# Their deviations are regressed out of the showdown result (pooled within
+# strata).
+#
+# Antithetic deals pair each deal with its image under a cycle of the suits the
+# hero does not hold. It is exact but rarely changes the result, so it mostly
+# costs a second showdown; it is off by default and kept for the benchmark.
+
+Stratum = Tuple[int, int, int]
+Cell = Tuple[int, int, int, int]
+
+def _groups(hole: Sequence[int]) -> List[List[int]]:
+    hi, lo = max(hole) // 4, min(hole) // 4
+    suit = hole[0] % 4 if hole[0] % 4 == hole[1] % 4 else None
+    groups: List[List[int]] = [[], [], [], []]
+    for c in range(52):
+        if c in hole:
+            continue
+        if c // 4 == hi:
+            groups[0].append(c)
+        elif c // 4 == lo:
+            groups[1].append(c)
+        elif c % 4 == suit:
+            groups[2].append(c)
+        else:
+            groups[3].append(c)
+    return groups
+
+def _stratum_of(cell: Cell) -> Stratum:
+    return (min(cell[0], 2), min(cell[1], 2), int(cell[2] >= 3))
+
+def board_strata(hole: Sequence[int]) -> Dict[Stratum, List[Tuple[Cell, float]]]:
+    """Board textures relative to hole with their cells and exact probabilities."""
+    sizes = [len(g) for g in _groups(hole)]
+    total = comb(50, 5)
+    strata: Dict[Stratum, List[Tuple[Cell, float]]] = {}
+    for a in range(min(5, sizes[0]) + 1):
+        for b in range(min(5 - a, sizes[1]) + 1):
+            for s in range(min(5 - a - b, sizes[2]) + 1):
+                o = 5 - a - b - s
+                if o > sizes[3]:
+                    continue
+                p = comb(sizes[0], a) * comb(sizes[1], b) * comb(sizes[2], s) * comb(sizes[3], o) / total
+                strata.setdefault(_stratum_of((a, b, s, o)), []).append(((a, b, s, o), p))
+    return strata
+
+@dataclass
+class VarianceReducedEstimate:
+    equity: float
+    stderr: float
+    deals: int
+    evaluations: int
+    effective_sample_size: float  # plain-MC deals giving the same variance
+    strata: int
+    controls: int
+
+def estimate_equity_vr(hole: List[int], n_opponents: int = 1, iters: int = 2000, seed: int = 0,
+                       stratify: bool = True, control: bool = True, antithetic: bool = False) -> VarianceReducedEstimate:
+    """Equity for hole (card ids) from about `iters` deals, with the chosen variance reductions."""
+    rng = random.Random(seed)
+    groups = _groups(hole)
+    unseen = [c for g in groups for c in g]
+    paired = hole[0] // 4 == hole[1] // 4
+    suited = hole[0] % 4 == hole[1] % 4
+    hero_ranks = {c // 4 for c in hole}
+    hero_key = CARD_KEY[hole[0]] + CARD_KEY[hole[1]]
+    hero_mask = CARD_MASK[hole[0]] | CARD_MASK[hole[1]]
+    nv = 2 * n_opponents
+    pairs45 = comb(45, 2)
+
+    free = [s for s in range(4) if s not in {c % 4 for c in hole}]
+    perm = list(range(4))
+    for i, s in enumerate(free):
+        perm[s] = free[(i + 1) % len(free)]
+    mirror = [(c // 4) * 4 + perm[c % 4] for c in range(52)]
+
+    flop_hit = flop_set_prob_pocket_pair()["set_or_better"] if paired else flop_pair_or_better_unpaired()["pair_or_better"]
+    flush_by_river = river_flush_prob_two_suited() if suited else 0.0
+
+    def showdown(board: List[int], villains: List[int]) -> float:
+        board_key = 0
+        board_mask = 0
+        for c in board:
+            board_key += CARD_KEY[c]
+            board_mask |= CARD_MASK[c]
+        hero = evaluate_key(hero_key + board_key, hero_mask | board_mask)
+        winners = 1
+        for j in range(0, nv, 2):
+            a, b = villains[j], villains[j + 1]
+            r = evaluate_key(CARD_KEY[a] + CARD_KEY[b] + board_key, CARD_MASK[a] | CARD_MASK[b] | board_mask)
+            if r > hero:
+                return 0.0
+            if r == hero:
+                winners += 1
+        return 1.0 / winners
+
+    def controls(board: List[int], villains: List[int], cell: Optional[Cell]) -> List[float]:
+        # Each entry is (observed - exact mean), so every control has mean zero
+        r = sum(1 for c in board[:3] if c // 4 in hero_ranks)
+        if cell is None:
+            x = [float(r > 0) - flop_hit]
+            if suited:
+                x.append(float(sum(1 for c in board if c % 4 == hole[0] % 4) >= 3) - flush_by_river)
+        else:
+            # The cell's hero-rank cards sit in uniformly random board slots
+            x = [float(r > 0) - (1.0 - comb(5 - cell[0] - cell[1], 3) / comb(5, 3))]
+        rank_left = [4] * 13
+        suit_left = [13] * 4
+        for c in list(board) + list(hole):
+            rank_left[c // 4] -= 1
+            suit_left[c % 4] -= 1
+        board_ranks = {c // 4 for c in board}
+        suit_on_board = [0] * 4
+        for c in board:
+            suit_on_board[c % 4] += 1
+        m = sum(rank_left[v] for v in board_ranks)
+        p_pocket = sum(comb(n, 2) for n in rank_left) / pairs45
+        p_flush = 0.0
+        for s in range(4):
+            if suit_on_board[s] == 3:
+                p_flush = comb(suit_left[s], 2) / pairs45
+            elif suit_on_board[s] == 4:
+                p_flush = 1.0 - comb(45 - suit_left[s], 2) / pairs45
+        hits = pockets = flushes = 0
+        for j in range(0, nv, 2):
+            a, b = villains[j], villains[j + 1]
+            hits += (a // 4 in board_ranks) + (b // 4 in board_ranks)
+            pockets += a // 4 == b // 4
+            for s in range(4):
+                if 3 <= suit_on_board[s] < 5:
+                    flushes += suit_on_board[s] + (a % 4 == s) + (b % 4 == s) >= 5
+        x.append(hits - n_opponents * 2 * m / 45)
+        x.append(pockets - n_opponents * p_pocket)
+        x.append(flushes - n_opponents * p_flush)
+        return x
+
+    if stratify:
+        strata: List[List[Tuple[Optional[Cell], float]]] = list(board_strata(hole).values())
+    else:
+        strata = [[(None, 1.0)]]
+    weights = [sum(p for _, p in cells) for cells in strata]
+    budget = max(1, iters // 2 if antithetic else iters)
+    alloc = [max(2, round(w * budget)) for w in weights]
+
+    samples: List[List[Tuple[float, List[float]]]] = []
+    raw: List[float] = []
+    for cells, w, n in zip(strata, weights, alloc):
+        rows = []
+        for _ in range(n):
+            cell = None
+            if stratify:
+                u = rng.random() * w
+                for cell, p in cells:
+                    u -= p
+                    if u < 0:
+                        break
+                board = [c for g, k in zip(groups, cell) for c in rng.sample(g, k)]
+                rng.shuffle(board)
+                used = set(board)
+                villains = rng.sample([c for c in unseen if c not in used], nv)
+            else:
+                dealt = rng.sample(unseen, 5 + nv)
+                board, villains = dealt[:5], dealt[5:]
+            y = showdown(board, villains)
+            raw.append(y)
+            if antithetic:
+                y2 = showdown([mirror[c] for c in board], [mirror[c] for c in villains])
+                raw.append(y2)
+                y = (y + y2) / 2
+            rows.append((y, controls(board, villains, cell) if control else []))
+        samples.append(rows)
+
+    beta = _regress(samples)
+    equity = 0.0
+    var = 0.0
+    for rows, w in zip(samples, weights):
+        adj = [y - sum(b * xi for b, xi in zip(beta, x)) for y, x in rows]
+        m = sum(adj) / len(adj)
+        equity += w * m
+        var += w * w * (sum((a - m) ** 2 for a in adj) / (len(adj) - 1)) / len(adj)
+    deals = len(raw)
+    plain_var = variance(raw)
+    ess = plain_var / var if var > 0 else float(deals)
+    return VarianceReducedEstimate(equity, sqrt(var), deals, deals * (1 + n_opponents), ess, len(strata),
+                                   sum(1 for b in beta if b != 0.0))
+
+def _regress(samples: List[List[Tuple[float, List[float]]]]) -> List[float]:
+    # Pooled within-stratum least squares of y on the controls. Controls that
+    # carry no new information (constant, or collinear with earlier ones) get a
+    # zero coefficient instead of breaking the solve.
+    k = len(samples[0][0][1])
+    if k == 0:
+        return []
+    a = [[0.0] * (k + 1) for _ in range(k)]
+    for rows in samples:
+        ybar = sum(y for y, _ in rows) / len(rows)
+        xbar = [sum(x[i] for _, x in rows) / len(rows) for i in range(k)]
+        for y, x in rows:
+            d = [x[i] - xbar[i] for i in range(k)]
+            for i in range(k):
+                for j in range(k):
+                    a[i][j] += d[i] * d[j]
+                a[i][k] += d[i] * (y - ybar)
+    # Gauss-Jordan on the normal equations, skipping columns without a pivot
+    scale = [a[i][i] for i in range(k)]
+    pivot_of: Dict[int, int] = {}
+    for col in range(k):
+        free_rows = [r for r in range(k) if r not in pivot_of.values()]
+        row = max(free_rows, key=lambda r: abs(a[r][col]))
+        if scale[col] <= 1e-12 or abs(a[row][col]) <= 1e-9 * scale[col]:
+            continue
+        pivot_of[col] = row
+        piv = a[row][col]
+        a[row] = [v / piv for v in a[row]]
+        for r in range(k):
+            if r != row and a[r][col] != 0.0:
+                f = a[r][col]
+                a[r] = [v - f * p for v, p in zip(a[r], a[row])]
+    beta = [0.0] * k
+    for col, row in pivot_of.items():
+        beta[col] = a[row][k]
+    return beta
+
+def benchmark(hands: Sequence[str] = ("AsKs", "7c7d", "Jh9c", "5h4h"), n_opponents: int = 1, iters: int = 2000,
+              repeats: int = 40, **options: bool) -> List[Dict[str, float]]:
+    """Spread of repeated estimates at equal deal budgets: plain MC vs variance-reduced."""
+    rows = []
+    for text in hands:
+        hole = [card_id(card_from_str(text[:2])), card_id(card_from_str(text[2:]))]
+        plain = [estimate_equity(hole, n_opponents, iters=iters, seed=s) for s in range(repeats)]
+        vr = [estimate_equity_vr(hole, n_opponents, iters=iters, seed=s, **options).equity for s in range(repeats)]
+        sd_plain, sd_vr = pstdev(plain), pstdev(vr)
+        rows.append({
+            "hand": text,
+            "sd_plain": sd_plain,
+            "sd_vr": sd_vr,
+            # How many times more deals plain MC needs for the same spread
+            "deal_savings": (sd_plain / sd_vr) ** 2 if sd_vr > 0 else float("inf"),
+        })
+    return rows
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m trainer.variance",
+                                     description="Compare plain vs variance-reduced equity at equal deal budgets.")
+    parser.add_argument("--iters", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=40)
+    parser.add_argument("--opponents", type=int, default=1)
+    parser.add_argument("--no-stratify", dest="stratify", action="store_false")
+    parser.add_argument("--no-control", dest="control", action="store_false")
+    parser.add_argument("--antithetic", action="store_true")
+    parser.add_argument("hands", nargs="*", default=["AsKs", "7c7d", "Jh9c", "5h4h"])
+    args = parser.parse_args(argv)
+    options = dict(stratify=args.stratify, control=args.control, antithetic=args.antithetic)
+    print(f"{'hand':>6} {'sd plain':>9} {'sd vr':>9} {'savings':>8}")
+    for row in benchmark(args.hands, args.opponents, args.iters, args.repeats, **options):
+        print(f"{row['hand']:>6} {row['sd_plain']:9.5f} {row['sd_vr']:9.5f} {row['deal_savings']:7.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+
+from __future__ import annotations
+from typing import List, Sequence
+import numpy as np
+from .evaluator import RANK_TABLE, FLUSH_TABLE, CARD_KEY, CARD_MASK, SUIT_SHIFT, RANK_KEY_MASK
+
+# NumPy batch engine: deals a whole batch of boards/villain hands as arrays and
+# scores them with the same tables as evaluator.evaluate_key. The rank table is
+# a dict keyed by a sparse 5-adic hash, so here it becomes a sorted key array
+# probed with searchsorted.
+
+BATCH = 65536
+
+_RANK_KEYS = np.array(sorted(RANK_TABLE), dtype=np.int64)
+_RANK_VALS = np.array([RANK_TABLE[k] for k in _RANK_KEYS.tolist()], dtype=np.int32)
+_FLUSH = np.array(FLUSH_TABLE, dtype=np.int32)
+_CARD_KEY = np.array(CARD_KEY, dtype=np.int64)
+_CARD_MASK = np.array(CARD_MASK, dtype=np.int64)
+
+def evaluate_batch(keys: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    """Vectorized evaluator.evaluate_key over arrays of summed keys / OR-ed masks."""
+    scores = _RANK_VALS[np.searchsorted(_RANK_KEYS, keys & RANK_KEY_MASK)]
+    flush = ((keys >> SUIT_SHIFT) + 0x3333) & 0x8888
+    hit = flush != 0
+    if hit.any():
+        f = flush[hit]
+        # At most one suit can hold 5 of 7 cards, so f has a single bit set
+        suit = (f >= 0x80).astype(np.int64) + (f >= 0x800) + (f >= 0x8000)
+        scores[hit] = _FLUSH[(masks[hit] >> (13 * suit)) & 0x1FFF]
+    return scores
+
+def deal_batch(live: np.ndarray, n: int, m: int, rng: np.random.Generator) -> np.ndarray:
+    """n rows of m distinct cards drawn from live, via column-wise partial Fisher-Yates."""
+    idx = np.tile(live, (n, 1))
+    rows = np.arange(n)
+    u = rng.random((n, m))
+    size = live.shape[0]
+    for j in range(m):
+        r = j + (u[:, j] * (size - j)).astype(np.intp)
+        held = idx[:, j].copy()
+        idx[:, j] = idx[rows, r]
+        idx[rows, r] = held
+    return idx[:, :m]
+
+def estimate_equity_vectorized(hole: List[int], n_opponents: int = 1, iters: int = 2000, seed: int = 0,
+                               board: Sequence[int] = (), batch: int = BATCH) -> float:
+    # Same contract as equity.estimate_equity (card ids, split pots shared)
+    # but a different random stream, so results differ by sampling noise.
+    if iters <= 0:
+        return 0.0
+    rng = np.random.default_rng(seed)
+    dead = list(hole) + list(board)
+    live = np.array([c for c in range(52) if c not in dead], dtype=np.int8)
+    hero_key = int(_CARD_KEY[list(hole)].sum())
+    hero_mask = int(np.bitwise_or.reduce(_CARD_MASK[list(hole)]))
+    known_key = sum(CARD_KEY[c] for c in board)
+    known_mask = 0
+    for c in board:
+        known_mask |= CARD_MASK[c]
+    nv = 2 * n_opponents
+    need = nv + 5 - len(board)
+    wins = 0.0
+    done = 0
+    while done < iters:
+        n = min(batch, iters - done)
+        dealt = deal_batch(live, n, need, rng)
+        keys = _CARD_KEY[dealt]
+        masks = _CARD_MASK[dealt]
+        board_key = keys[:, nv:].sum(axis=1) + known_key
+        board_mask = np.bitwise_or.reduce(masks[:, nv:], axis=1) | known_mask
+        hero = evaluate_batch(board_key + hero_key, board_mask | hero_mask)
+        villains = evaluate_batch(
+            keys[:, 0:nv:2] + keys[:, 1:nv:2] + board_key[:, None],
+            masks[:, 0:nv:2] | masks[:, 1:nv:2] | board_mask[:, None],
+        )
+        best = villains.max(axis=1)
+        ties = (villains == hero[:, None]).sum(axis=1)
+        wins += float(np.where(hero >= best, 1.0 / (1 + ties), 0.0).sum())
+        done += n
+    return wins / iters